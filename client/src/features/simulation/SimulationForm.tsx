@@ -1,6 +1,7 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { useForm } from 'react-hook-form';
 import { api } from '../../lib/api';
+import { useLiveSimulation } from '../../lib/live';
 import { Loader2, Zap } from 'lucide-react';
 
 interface SimulationInput {
@@ -11,10 +12,23 @@ interface SimulationInput {
 
 export const SimulationForm = ({ onResult }: { onResult: (data: any) => void }) => {
   const [isLoading, setIsLoading] = useState(false);
-  const { register, handleSubmit } = useForm<SimulationInput>({
+  const { register, handleSubmit, watch } = useForm<SimulationInput>({
     defaultValues: { acTemp: 24, reductionPercent: 10, incentives: false }
   });
 
+  // Live preview while inputs change; "Run Simulation" still records a logged run
+  const sendLive = useLiveSimulation(onResult);
+  useEffect(() => {
+    const subscription = watch((values) => {
+      sendLive({
+        acTemp: Number(values.acTemp),
+        reductionPercent: Number(values.reductionPercent),
+        incentives: Boolean(values.incentives)
+      });
+    });
+    return () => subscription.unsubscribe();
+  }, [watch, sendLive]);
+
   const onSubmit = async (data: SimulationInput) => {
     try {
       setIsLoading(true);
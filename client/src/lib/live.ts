@@ -0,0 +1,66 @@
+import { useCallback, useEffect, useRef } from 'react';
+
+export interface LiveParams {
+  acTemp: number;
+  reductionPercent: number;
+  incentives: boolean;
+}
+
+const LIVE_URL =
+  (import.meta.env.VITE_API_URL || 'http://localhost:5000/api/v1').replace(/^http/, 'ws') + '/simulation/live';
+
+const RECONNECT_MS = 2000;
+
+/**
+ * Persistent WebSocket for live what-if updates.
+ *
+ * Returns a `send` function; call it on every parameter change. The server
+ * only scores the newest update, and replies for anything older than the
+ * last update sent are ignored here as well.
+ */
+export function useLiveSimulation(onResult: (data: any) => void) {
+  const socketRef = useRef<WebSocket | null>(null);
+  const seqRef = useRef(0);
+  const queuedRef = useRef<string | null>(null);
+  const onResultRef = useRef(onResult);
+  onResultRef.current = onResult;
+
+  useEffect(() => {
+    let closed = false;
+    let retry: ReturnType<typeof setTimeout>;
+
+    const connect = () => {
+      const socket = new WebSocket(LIVE_URL);
+      socketRef.current = socket;
+      socket.onopen = () => {
+        if (queuedRef.current) socket.send(queuedRef.current);
+        queuedRef.current = null;
+      };
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.result && message.seq === seqRef.current) onResultRef.current(message.result);
+      };
+      socket.onclose = () => {
+        if (!closed) retry = setTimeout(connect, RECONNECT_MS);
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      socketRef.current?.close();
+    };
+  }, []);
+
+  return useCallback((params: LiveParams) => {
+    const message = JSON.stringify({ ...params, seq: ++seqRef.current });
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(message);
+    } else {
+      // Only the latest change matters once the socket (re)opens
+      queuedRef.current = message;
+    }
+  }, []);
+}
@@ -0,0 +1,159 @@
+"""Facility baselines derived from interval-data history files.
+
+History files are Arrow IPC files (Feather v2, uncompressed), one per
+facility, named <facility_id>.arrow. Each has two columns:
+
+    timestamp  timestamp[any unit], local facility wall-clock time
+    kwh        float64, energy consumed in the interval starting at timestamp
+
+Files are opened with pa.memory_map, so record batches are views of the OS
+page cache and opening even a multi-year 15-minute history is instant. The
+computation copies the mapped batches once into two compact columns (int64
+minutes and float64 kWh, 16 bytes per reading), so that is the memory a
+history costs; everything after that is bincount and one lexsort. Readings
+with a null timestamp or a missing or non-finite kWh value are dropped.
+
+write_history() produces files in this layout.
+"""
+import os
+import re
+from typing import Dict, Optional
+
+import numpy as np
+
+PERCENTILES = (10.0, 50.0, 90.0)
+
+_FACILITY_FILE = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]*$")
+
+
+def history_path(directory: str, facility_id: str) -> str:
+    """Path of a facility's history file; rejects ids that could escape `directory`."""
+    if not _FACILITY_FILE.match(facility_id):
+        raise ValueError(f"Invalid facility_id for a history file: {facility_id!r}")
+    return os.path.join(directory, f"{facility_id}.arrow")
+
+
+def file_stamp(path: str) -> tuple:
+    """Cache key that changes whenever the file is replaced or rewritten."""
+    st = os.stat(path)
+    return (path, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def write_history(path: str, timestamps: np.ndarray, kwh: np.ndarray, batch_rows: int = 65_536) -> None:
+    """Write a history file (uncompressed so readers can memory-map it)."""
+    import pyarrow as pa
+
+    schema = pa.schema([("timestamp", pa.timestamp("s")), ("kwh", pa.float64())])
+    timestamps = np.asarray(timestamps, dtype="datetime64[s]")
+    kwh = np.asarray(kwh, dtype=np.float64)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for start in range(0, len(kwh), batch_rows):
+            stop = start + batch_rows
+            writer.write_batch(pa.record_batch([timestamps[start:stop], kwh[start:stop]], schema=schema))
+
+
+def _grouped_percentiles(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """(len(PERCENTILES), n_groups) linear-interpolated percentiles; NaN for empty groups."""
+    order = np.lexsort((values, groups))
+    ranked = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    out = np.full((len(PERCENTILES), n_groups), np.nan)
+    filled = counts > 0
+    for i, q in enumerate(PERCENTILES):
+        # Same interpolation as np.percentile(method="linear")
+        position = (q / 100.0) * (counts[filled] - 1)
+        low = np.floor(position).astype(np.intp)
+        high = np.minimum(low + 1, counts[filled] - 1)
+        frac = position - low
+        base = starts[filled]
+        out[i, filled] = ranked[base + low] * (1.0 - frac) + ranked[base + high] * frac
+    return out
+
+
+def _profile(groups: np.ndarray, values: np.ndarray, sums: np.ndarray, counts: np.ndarray) -> Dict[str, np.ndarray]:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / counts
+    p10, p50, p90 = _grouped_percentiles(groups, values, sums.size)
+    return {"mean": mean, "p10": p10, "p50": p50, "p90": p90}
+
+
+def compute_baseline(path: str) -> dict:
+    """Typical-day load curves (weekday/weekend) and daily-energy percentiles.
+
+    The interval is the most common spacing between consecutive readings.
+    Daily statistics only use complete days, i.e. days with one reading for
+    every slot. Plain data in and out, so the compute pool can run it in a
+    child process.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        if reader.num_record_batches == 0:
+            raise ValueError("History file has no rows")
+        rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        minutes = np.empty(rows, dtype=np.int64)
+        kwh = np.empty(rows)
+        stamped = np.empty(rows, dtype=bool)
+
+        # Minute timestamps and loads, batch by batch from the mapped buffers
+        offset = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            stamps = batch.column("timestamp").to_numpy(zero_copy_only=False).astype("datetime64[m]")
+            minutes[offset:offset + batch.num_rows] = stamps.astype(np.int64)
+            # Nulls come through as NaT, whose int64 value would wreck the day buckets
+            stamped[offset:offset + batch.num_rows] = ~np.isnat(stamps)
+            kwh[offset:offset + batch.num_rows] = batch.column("kwh").to_numpy(zero_copy_only=False)
+            offset += batch.num_rows
+
+    valid = stamped & np.isfinite(kwh)
+    minutes, kwh = minutes[valid], kwh[valid]
+    if minutes.size < 2:
+        raise ValueError("History file needs at least two valid readings")
+    if np.any(np.diff(minutes) < 0):
+        order = np.argsort(minutes, kind="stable")
+        minutes, kwh = minutes[order], kwh[order]
+
+    steps = np.diff(minutes)
+    steps = steps[steps > 0]
+    spacings, occurrences = np.unique(steps, return_counts=True)
+    interval = int(spacings[np.argmax(occurrences)])
+    if interval > 1440 or 1440 % interval:
+        raise ValueError(f"Interval of {interval} minutes does not divide a day")
+    slots = 1440 // interval
+
+    day = minutes // 1440
+    slot = (minutes % 1440) // interval
+    # 1970-01-01 was a Thursday; weekday 0 is Monday
+    weekend = (day + 3) % 7 >= 5
+    groups = slot + slots * weekend
+
+    sums = np.bincount(groups, weights=kwh, minlength=2 * slots)
+    counts = np.bincount(groups, minlength=2 * slots)
+    profile = _profile(groups, kwh, sums, counts)
+
+    day_index = day - day[0]
+    readings = np.bincount(day_index, minlength=day_index[-1] + 1)
+    totals = np.bincount(day_index, weights=kwh, minlength=day_index[-1] + 1)[readings == slots]
+
+    daily: Dict[str, Optional[float]] = {"days": int(totals.size)}
+    if totals.size:
+        daily["mean"] = float(totals.mean())
+        daily.update(zip(("p10", "p50", "p90"), map(float, np.percentile(totals, PERCENTILES))))
+
+    start = np.datetime64(int(minutes[0]), "m")
+    end = np.datetime64(int(minutes[-1]), "m")
+    return {
+        "rows": int(rows),
+        "start": str(start),
+        "end": str(end),
+        "interval_minutes": interval,
+        "daily_kwh": daily,
+        "typical_day": {
+            "slot_start": [f"{m // 60:02d}:{m % 60:02d}" for m in range(0, 1440, interval)],
+            "weekday": {name: column[:slots] for name, column in profile.items()},
+            "weekend": {name: column[slots:] for name, column in profile.items()},
+        },
+    }
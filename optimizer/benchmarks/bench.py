@@ -0,0 +1,438 @@
+"""GridOps optimizer benchmark suite.
+
+Measures the physics kernel (engine.py) and the HTTP layer (main.app driven
+in-process over ASGI, so no sockets or client library are involved) at
+several input sizes. Every run is appended to a JSON-lines history file,
+and the run fails when a case regresses against the stored baseline.
+
+    python benchmarks/bench.py                      # run, record, compare
+    python benchmarks/bench.py --save-baseline      # accept this run as the baseline
+    python benchmarks/bench.py --quick -k calculate # smaller sizes, filtered cases
+
+Run from the optimizer/ directory (or anywhere; the path is set up below).
+Exit status is 1 when any case's throughput drops or its p99 latency rises
+by more than the configured threshold.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import numpy as np  # noqa: E402
+
+import engine  # noqa: E402
+
+RESULTS_DIR = os.path.join(HERE, "results")
+DEFAULT_HISTORY = os.path.join(RESULTS_DIR, "history.jsonl")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+
+
+# --- ASGI driver ---
+
+class AsgiClient:
+    """Minimal in-process ASGI client: one event loop, no network stack."""
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+
+    async def _call(self, method: str, path: str, body: bytes, content_type: str) -> bytes:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())],
+            "client": ("bench", 0),
+            "server": ("bench", 80),
+        }
+        sent = False
+        status = None
+        chunks = []
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                # Only reached by handlers that wait for a disconnect
+                await asyncio.sleep(3600)
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        if status != 200:
+            raise RuntimeError(f"{method} {path} returned {status}: {b''.join(chunks)[:200]!r}")
+        return b"".join(chunks)
+
+    def post(self, path: str, body: bytes, content_type: str = "application/json") -> bytes:
+        return self.loop.run_until_complete(self._call("POST", path, body, content_type))
+
+
+# --- Cases ---
+
+class Case:
+    """One benchmark: `setup(size)` returns a zero-arg callable that processes `size` items."""
+
+    def __init__(self, name: str, sizes: List[int], quick_sizes: List[int], setup: Callable[[int], Callable[[], object]]):
+        self.name = name
+        self.sizes = sizes
+        self.quick_sizes = quick_sizes
+        self.setup = setup
+
+
+def _scenario_arrays(size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(16.0, 32.0, size), rng.uniform(0.0, 1.0, size), rng.random(size) < 0.5
+
+
+def build_cases(client: AsgiClient) -> List[Case]:
+    import main
+
+    def kernel_scalar(size):
+        setpoints, reductions, incentives = (a.tolist() for a in _scenario_arrays(size))
+
+        def run():
+            for args in zip(setpoints, reductions, incentives):
+                engine.calculate(*args)
+        return run
+
+    def kernel_batch(size):
+        arrays = _scenario_arrays(size)
+        return lambda: engine.calculate_batch(*arrays)
+
+    def kernel_rules(size):
+        import rules
+
+        # One rule per protection feature; every row is tested against all of them
+        pipeline = rules.RulePipeline([
+            {"name": "frequency", "priority": 1, "when": [{"field": "frequency_hz", "op": "lt", "value": 49.7}],
+             "then": [{"target": "reduction_factor", "op": "at_least", "value": 0.3}]},
+            {"name": "voltage", "priority": 2, "when": [{"field": "voltage_pu", "op": "lt", "value": 0.9}],
+             "then": [{"target": "reduction_factor", "op": "set", "value": 0.6}]},
+            {"name": "carbon", "when": [{"field": "carbon_intensity", "op": "gt", "value": 0.9}],
+             "then": [{"target": "reduction_factor", "op": "at_least", "value": 0.2}]},
+            {"name": "maintenance", "priority": 3, "when": [{"field": "maintenance", "op": "eq", "value": 1.0}],
+             "then": [{"target": "reduction_factor", "op": "set", "value": 1.0}, {"target": "comfort_index", "op": "set", "value": 0.1}]},
+            {"name": "power_factor", "when": [{"field": "power_factor", "op": "lt", "value": 0.9}],
+             "then": [{"target": "tariff", "op": "scale", "value": 1.1}]},
+        ])
+        setpoints, reductions, incentives = _scenario_arrays(size)
+        rng = np.random.default_rng(1)
+        signals = {
+            "frequency_hz": rng.normal(50.0, 0.2, size),
+            "voltage_pu": rng.normal(1.0, 0.05, size),
+            "power_factor": rng.uniform(0.8, 1.0, size),
+            "maintenance": rng.random(size) < 0.01,
+        }
+        arrays = {"ac_setpoint": setpoints, "reduction_factor": reductions, "enable_incentives": incentives}
+        return lambda: rules.evaluate(pipeline, arrays, signals)
+
+    def kernel_tariff(size):
+        import tariffs
+
+        plan = tariffs.TariffPlan({
+            "name": "bench", "default_rate": 6.0,
+            "bands": [{"days": "weekday", "start": "10:00", "end": "22:00", "rate": 12.0}],
+            "seasons": [{"name": "summer", "months": [4, 5, 6], "bands": [{"days": "all", "start": "14:00", "end": "18:00", "rate": 15.0}]}],
+            "holidays": ["2025-01-26", "2025-08-15", "2025-10-02"],
+        })
+        # Minute-resolution timestamps from New Year on
+        timestamps = np.datetime64("2025-01-01T00:00") + np.arange(size)
+        return lambda: plan.rates(timestamps)
+
+    def kernel_telemetry(size):
+        import telemetry
+
+        # One reading per second per signal, so every window is full and expiring
+        timestamps = np.arange(size, dtype=np.float64)
+        values = 50.0 + np.random.default_rng(1).normal(0.0, 0.05, size)
+        readings = [("frequency_hz", t, v) for t, v in zip(timestamps.tolist(), values.tolist())]
+
+        def run():
+            store = telemetry.TelemetryStore()
+            store.ingest(readings, now=float(timestamps[-1]))
+            store.summary(now=float(timestamps[-1]))
+        return run
+
+    def kernel_thermal(size):
+        import thermal
+
+        # `size` 15-minute steps through a 36-zone chain of floors
+        rng = np.random.default_rng(1)
+        zones = 36
+        building = thermal.Building({
+            "name": "bench", "cop": 3.2, "other_load_kw": 300.0,
+            "zones": [
+                {"name": f"z{i}", "capacitance_kwh_per_c": float(rng.uniform(20, 200)), "ua_outdoor_kw_per_c": float(rng.uniform(0, 5)),
+                 "cooling_capacity_kw": float(rng.uniform(50, 200)), "internal_gain_kw": float(rng.uniform(5, 40))}
+                for i in range(zones)
+            ],
+            "links": [{"zones": [f"z{i}", f"z{i + 1}"], "ua_kw_per_c": 5.0} for i in range(zones - 1)],
+        })
+        outdoor = 30.0 + 5.0 * np.sin(np.arange(size) / 96 * 2 * np.pi)
+        building.discretize(0.25)
+        return lambda: thermal.simulate(building, outdoor, 24.0, 0.1)
+
+    def http_calculate(cached: bool):
+        def setup(size):
+            setpoints, reductions, incentives = (a.tolist() for a in _scenario_arrays(size))
+            bodies = [
+                json.dumps({"ac_setpoint": a, "reduction_factor": r, "enable_incentives": i}).encode()
+                for a, r, i in zip(setpoints, reductions, incentives)
+            ]
+
+            def run():
+                if not cached:
+                    main.result_cache.clear()
+                for body in bodies:
+                    client.post("/calculate", body)
+            if cached:
+                run()  # prime the cache
+            return run
+        return setup
+
+    def http_batch(size):
+        setpoints, reductions, incentives = (a.tolist() for a in _scenario_arrays(size))
+        body = json.dumps({"scenarios": [
+            {"ac_setpoint": a, "reduction_factor": r, "enable_incentives": i}
+            for a, r, i in zip(setpoints, reductions, incentives)
+        ]}).encode()
+        return lambda: client.post("/calculate/batch", body)
+
+    def http_columnar(size):
+        setpoints, reductions, incentives = _scenario_arrays(size)
+        body = np.concatenate([setpoints, reductions, incentives.astype(np.float64)]).astype("<f8").tobytes()
+        return lambda: client.post("/calculate/batch/columnar", body, "application/x-gridops-f64")
+
+    def http_stream(size):
+        setpoints, reductions, incentives = (a.tolist() for a in _scenario_arrays(size))
+        body = "".join(
+            json.dumps({"ac_setpoint": a, "reduction_factor": r, "enable_incentives": i}) + "\n"
+            for a, r, i in zip(setpoints, reductions, incentives)
+        ).encode()
+        return lambda: client.post("/calculate/stream", body, "application/x-ndjson")
+
+    def http_sweep(size):
+        # Square-ish grid with `size` points
+        side = max(1, int(round(size ** 0.5)))
+        body = json.dumps({
+            "ac_setpoint": {"start": 16.0, "stop": 32.0, "step": 16.0 / max(side - 1, 1)},
+            "reduction_factor": {"start": 0.0, "stop": 1.0, "step": 1.0 / max(side - 1, 1)},
+        }).encode()
+        return lambda: client.post("/sweep", body)
+
+    def http_annual(size):
+        hours = np.datetime64("2025-01-01T00", "h") + np.arange(size)
+        body = json.dumps({
+            "timestamps": np.datetime_as_string(hours, unit="m").tolist(),
+            "ac_setpoint": (24.0 + 2.0 * np.sin(np.arange(size) * 2 * np.pi / 24)).round(2).tolist(),
+            "reduction_factor": 0.1,
+        }).encode()
+        return lambda: client.post("/simulate/annual", body)
+
+    def http_schedule(size):
+        # TOU day: peak 10:00-22:00
+        hour = np.arange(size) * 24 // size
+        body = json.dumps({
+            "tariff_inr_per_kwh": np.where((hour >= 10) & (hour < 22), 12.5, 8.5).tolist(),
+            "min_comfort_index": 0.8,
+        }).encode()
+        return lambda: client.post("/schedule/day-ahead", body)
+
+    def http_uncertainty(size):
+        body = json.dumps({
+            "ac_setpoint": {"dist": "normal", "mean": 25.0, "std": 1.0},
+            "base_load_kwh": {"dist": "uniform", "low": 25_000.0, "high": 31_000.0},
+            "carbon_intensity": {"dist": "triangular", "low": 0.7, "mode": 0.82, "high": 0.95},
+            "samples": size,
+            "seed": 0,
+        }).encode()
+        return lambda: client.post("/simulate/uncertainty", body)
+
+    def http_portfolio(size):
+        main.facility_registry = main.FacilityRegistry()
+        rng = np.random.default_rng(0)
+        main.facility_registry.upsert(
+            {
+                "facility_id": f"site-{i}",
+                "base_load": base_load,
+                "thermal_coeff": engine.THERMAL_COEFF,
+                "carbon_intensity": engine.CARBON_INTENSITY,
+                "tariff_plan": "blended",
+            }
+            for i, base_load in enumerate(rng.uniform(5_000.0, 60_000.0, size).tolist())
+        )
+        body = json.dumps({"ac_setpoint": 26.0, "reduction_factor": 0.1}).encode()
+        return lambda: client.post("/portfolio/calculate", body)
+
+    def http_jacobian(size):
+        setpoints, reductions, incentives = (a.tolist() for a in _scenario_arrays(size))
+        body = json.dumps({"points": [
+            {"ac_setpoint": a, "reduction_factor": r, "enable_incentives": i}
+            for a, r, i in zip(setpoints, reductions, incentives)
+        ]}).encode()
+        return lambda: client.post("/calculate/jacobian", body)
+
+    return [
+        Case("kernel.calculate", [1_000], [100], kernel_scalar),
+        Case("kernel.calculate_batch", [1, 1_000, 100_000, 1_000_000], [1, 1_000, 100_000], kernel_batch),
+        Case("kernel.rules_evaluate", [1_000, 100_000, 1_000_000], [1_000, 100_000], kernel_rules),
+        Case("kernel.tariff_rates", [8_760, 525_600], [8_760], kernel_tariff),
+        Case("kernel.telemetry_ingest", [1_000, 10_000], [1_000], kernel_telemetry),
+        Case("kernel.thermal_simulate", [96, 35_040], [96], kernel_thermal),
+        Case("http.calculate.uncached", [200], [50], http_calculate(cached=False)),
+        Case("http.calculate.cached", [200], [50], http_calculate(cached=True)),
+        Case("http.calculate_batch", [10, 1_000, 10_000], [10, 1_000], http_batch),
+        Case("http.calculate_columnar", [1_000, 100_000, 1_000_000], [1_000, 100_000], http_columnar),
+        Case("http.calculate_stream", [1_000, 20_000], [1_000], http_stream),
+        Case("http.sweep", [1_000, 100_000], [1_000], http_sweep),
+        Case("http.simulate_annual", [24, 8_760], [8_760], http_annual),
+        Case("http.schedule_day_ahead", [24, 96], [24], http_schedule),
+        Case("http.simulate_uncertainty", [10_000, 1_000_000], [10_000], http_uncertainty),
+        Case("http.portfolio_calculate", [100, 5_000], [100], http_portfolio),
+        Case("http.calculate_jacobian", [10, 1_000], [10], http_jacobian),
+    ]
+
+
+# --- Measurement ---
+
+def measure(run: Callable[[], object], size: int, min_time: float, min_iters: int, max_iters: int) -> Dict[str, float]:
+    run()  # warmup
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_iters and (len(samples) < min_iters or time.perf_counter() < deadline):
+        start = time.perf_counter_ns()
+        run()
+        samples.append(time.perf_counter_ns() - start)
+
+    lat = np.asarray(samples, dtype=np.float64) / 1e3  # microseconds per iteration
+    mean = float(lat.mean())
+    return {
+        "size": size,
+        "iterations": len(samples),
+        "mean_us": round(mean, 2),
+        "p50_us": round(float(np.percentile(lat, 50)), 2),
+        "p99_us": round(float(np.percentile(lat, 99)), 2),
+        "throughput_per_s": round(size / (mean / 1e6), 1),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], throughput_threshold: float, p99_threshold: float) -> List[str]:
+    """Describe every case that regressed beyond the thresholds."""
+    failures = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        floor = reference["throughput_per_s"] * (1.0 - throughput_threshold)
+        if current["throughput_per_s"] < floor:
+            failures.append(
+                f"{key}: throughput {current['throughput_per_s']:.1f}/s < {floor:.1f}/s "
+                f"(baseline {reference['throughput_per_s']:.1f}/s, -{throughput_threshold:.0%} allowed)"
+            )
+        ceiling = reference["p99_us"] * (1.0 + p99_threshold)
+        if current["p99_us"] > ceiling:
+            failures.append(
+                f"{key}: p99 {current['p99_us']:.1f}us > {ceiling:.1f}us "
+                f"(baseline {reference['p99_us']:.1f}us, +{p99_threshold:.0%} allowed)"
+            )
+    return failures
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this substring")
+    parser.add_argument("--quick", action="store_true", help="Use the reduced size list for each case")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to sample each case/size (default 1.0)")
+    parser.add_argument("--min-iters", type=int, default=5)
+    parser.add_argument("--max-iters", type=int, default=10_000)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines file each run is appended to")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the new baseline")
+    parser.add_argument("--throughput-threshold", type=float, default=float(os.getenv("BENCH_THROUGHPUT_THRESHOLD", "0.15")),
+                        help="Allowed fractional throughput drop (default 0.15)")
+    parser.add_argument("--p99-threshold", type=float, default=float(os.getenv("BENCH_P99_THRESHOLD", "0.25")),
+                        help="Allowed fractional p99 latency increase (default 0.25)")
+    args = parser.parse_args(argv)
+
+    # Request logging would dominate the HTTP cases
+    logging.disable(logging.CRITICAL)
+    import main as app_module
+
+    client = AsgiClient(app_module.app)
+    results: Dict[str, dict] = {}
+    print(f"{'case':<40} {'size':>9} {'iters':>6} {'p50 us':>12} {'p99 us':>12} {'items/s':>14}")
+    for case in build_cases(client):
+        if args.filter not in case.name:
+            continue
+        for size in case.quick_sizes if args.quick else case.sizes:
+            stats = measure(case.setup(size), size, args.min_time, args.min_iters, args.max_iters)
+            results[f"{case.name}[{size}]"] = stats
+            print(f"{case.name:<40} {size:>9} {stats['iterations']:>6} {stats['p50_us']:>12.1f} "
+                  f"{stats['p99_us']:>12.1f} {stats['throughput_per_s']:>14.1f}")
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(record, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    failures = compare(results, baseline, args.throughput_threshold, args.p99_threshold)
+    if failures:
+        print(f"\n{len(failures)} regression(s) against {args.baseline}:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"\nNo regressions against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Binary column codecs for batch simulation I/O.
+
+Two wire formats skip JSON parsing and float formatting entirely:
+
+RAW_F64 (application/x-gridops-f64)
+    Little-endian float64, column-major, no header. A request is three
+    columns of N values (ac_setpoint, reduction_factor, enable_incentives
+    as 0.0/1.0); a response is the five SimulationResponse columns in
+    engine.RESPONSE_PRECISION order. N is implied by the body length.
+
+ARROW_STREAM (application/vnd.apache.arrow.stream)
+    Arrow IPC stream with float64 columns `ac_setpoint` and
+    `reduction_factor` plus an optional boolean `enable_incentives`; the
+    response is a single record batch with the five result columns.
+
+Request columns are decoded as zero-copy views over the body where the
+layout allows it, and response columns are written straight from the
+result arrays. Results are full-precision float64, not rounded.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+import engine
+
+RAW_F64 = "application/x-gridops-f64"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+CONTENT_TYPES = (RAW_F64, ARROW_STREAM)
+
+INPUT_COLUMNS = ("ac_setpoint", "reduction_factor", "enable_incentives")
+OUTPUT_COLUMNS = tuple(engine.RESPONSE_PRECISION)
+
+Columns = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def validate(ac_setpoint: np.ndarray, reduction_factor: np.ndarray, enable_incentives: np.ndarray) -> None:
+    """Apply the SimulationRequest bounds to whole columns at once."""
+    if ac_setpoint.size == 0:
+        raise ValueError("Batch is empty")
+    # NaN fails every comparison, so it is rejected here too
+    if not np.all((ac_setpoint >= 16.0) & (ac_setpoint <= 32.0)):
+        raise ValueError("ac_setpoint values must be within 16-32")
+    if not np.all((reduction_factor >= 0.0) & (reduction_factor <= 1.0)):
+        raise ValueError("reduction_factor values must be within 0-1")
+    if enable_incentives.dtype != bool and not np.all((enable_incentives == 0.0) | (enable_incentives == 1.0)):
+        raise ValueError("enable_incentives values must be 0 or 1")
+
+
+def decode_f64(body: bytes) -> Columns:
+    if len(body) % (8 * len(INPUT_COLUMNS)):
+        raise ValueError(f"Body length must be a multiple of {8 * len(INPUT_COLUMNS)} bytes")
+    ac_setpoint, reduction_factor, enable_incentives = np.frombuffer(body, dtype="<f8").reshape(len(INPUT_COLUMNS), -1)
+    validate(ac_setpoint, reduction_factor, enable_incentives)
+    return ac_setpoint, reduction_factor, enable_incentives != 0.0
+
+
+def encode_f64(columns: Dict[str, np.ndarray]) -> bytes:
+    out = np.empty((len(OUTPUT_COLUMNS), len(columns[OUTPUT_COLUMNS[0]])), dtype="<f8")
+    for i, name in enumerate(OUTPUT_COLUMNS):
+        out[i] = columns[name]
+    return out.tobytes()
+
+
+def decode_arrow(body: bytes) -> Columns:
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid Arrow IPC stream: {e}")
+
+    def column(name: str, required: bool = True) -> np.ndarray:
+        if name not in table.column_names:
+            if required:
+                raise ValueError(f"Missing column '{name}'")
+            return np.zeros(table.num_rows, dtype=bool)
+        chunked = table.column(name)
+        if chunked.null_count:
+            raise ValueError(f"Column '{name}' contains nulls")
+        if name == "enable_incentives":
+            return chunked.to_numpy().astype(bool, copy=False)
+        # A single float64 chunk converts without copying
+        return chunked.cast(pa.float64()).to_numpy()
+
+    ac_setpoint = column("ac_setpoint")
+    reduction_factor = column("reduction_factor")
+    enable_incentives = column("enable_incentives", required=False)
+    validate(ac_setpoint, reduction_factor, enable_incentives)
+    return ac_setpoint, reduction_factor, enable_incentives
+
+
+def encode_arrow(columns: Dict[str, np.ndarray]) -> bytes:
+    import pyarrow as pa
+
+    batch = pa.record_batch([pa.array(columns[name]) for name in OUTPUT_COLUMNS], names=list(OUTPUT_COLUMNS))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+DECODERS = {RAW_F64: decode_f64, ARROW_STREAM: decode_arrow}
+ENCODERS = {RAW_F64: encode_f64, ARROW_STREAM: encode_arrow}
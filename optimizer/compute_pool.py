@@ -0,0 +1,133 @@
+"""Process pool for CPU-heavy model runs.
+
+Large batches, sweeps and long time series are moved off the event loop so
+one big job cannot stall /health or small interactive requests. Each
+uvicorn worker owns one pool (sized by HEAVY_POOL_WORKERS, by default the
+CPU count divided across WORKERS). The pool starts on first use.
+
+calculate_batch() does not pickle arrays. The parent copies the inputs
+into one SharedMemory block, which also has room for the five result
+columns. The child attaches to the block by name, runs
+engine.calculate_batch on views of it, and writes the results back in
+place. Only the block name, shape and scalar kwargs cross the process
+boundary.
+
+multiprocessing and the executor are imported on first use, so workers
+that never offload a job do not pay for them at startup.
+"""
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+import numpy as np
+
+import engine
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+OUTPUT_COLUMNS = tuple(engine.RESPONSE_PRECISION)
+
+# Below this many rows the IPC round trip costs more than it frees up
+OFFLOAD_MIN_ROWS = int(os.getenv("OFFLOAD_MIN_ROWS", "50000"))
+
+
+def _default_pool_size() -> int:
+    workers = max(1, int(os.getenv("WORKERS", "1")))
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _kernel_worker(block_name: str, rows: int, input_names: tuple, kwargs: Dict[str, Any]) -> None:
+    """Child side of calculate_batch: read inputs from and write results to shared memory."""
+    from multiprocessing.shared_memory import SharedMemory
+
+    block = SharedMemory(name=block_name)
+    table = inputs = None
+    try:
+        table = np.ndarray((len(input_names) + len(OUTPUT_COLUMNS), rows), dtype=np.float64, buffer=block.buf)
+        inputs = {name: table[i] for i, name in enumerate(input_names)}
+        if "enable_incentives" in inputs:
+            inputs["enable_incentives"] = inputs["enable_incentives"] != 0.0
+        columns = engine.calculate_batch(**inputs, **kwargs)
+        for j, name in enumerate(OUTPUT_COLUMNS):
+            table[len(input_names) + j] = columns[name]
+    finally:
+        # Views must be gone before the mapping can be closed
+        table = inputs = None
+        block.close()
+
+
+class ComputePool:
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = _default_pool_size() if max_workers is None else max_workers
+        self._executor: Optional["ProcessPoolExecutor"] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def _get_executor(self) -> "ProcessPoolExecutor":
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # forkserver: children never inherit the event loop or logging threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._executor
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run a picklable, module-level function in the pool (inline when disabled)."""
+        if not self.enabled:
+            return fn(*args)
+        from concurrent.futures.process import BrokenProcessPool
+
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A child died (e.g. OOM-killed); start a fresh pool for the next job
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    async def calculate_batch(
+        self,
+        arrays: Dict[str, np.ndarray],
+        observe_stage: Optional[engine.StageObserver] = None,
+        **kwargs,
+    ) -> Dict[str, np.ndarray]:
+        """engine.calculate_batch over equal-length 1-D `arrays`, executed in the pool.
+
+        `arrays` holds the row-aligned inputs (ac_setpoint, reduction_factor and
+        optionally enable_incentives, base_load, tariff); `kwargs` must be
+        scalars. Small inputs, or a disabled pool, run inline. Stage timings
+        are only reported for inline runs; a child's clock is not ours.
+        """
+        rows = len(next(iter(arrays.values())))
+        if not self.enabled or rows < OFFLOAD_MIN_ROWS:
+            return engine.calculate_batch(**arrays, observe_stage=observe_stage, **kwargs)
+
+        from multiprocessing.shared_memory import SharedMemory
+
+        names = tuple(arrays)
+        block = SharedMemory(create=True, size=8 * rows * (len(names) + len(OUTPUT_COLUMNS)))
+        table = None
+        try:
+            table = np.ndarray((len(names) + len(OUTPUT_COLUMNS), rows), dtype=np.float64, buffer=block.buf)
+            for i, name in enumerate(names):
+                table[i] = arrays[name]
+            await self.run(_kernel_worker, block.name, rows, names, kwargs)
+            return {name: table[len(names) + j].copy() for j, name in enumerate(OUTPUT_COLUMNS)}
+        finally:
+            table = None
+            block.close()
+            block.unlink()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
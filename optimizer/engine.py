@@ -0,0 +1,221 @@
+"""GridOps physics engine.
+
+Plain-Python/NumPy entry points for the facility model behind /calculate.
+Analytics jobs and notebooks can import this module directly and get the
+same numbers as the HTTP API without FastAPI or Pydantic in the loop:
+
+    import engine
+    engine.calculate(26.0, 0.1)                         # one scenario -> dict
+    engine.calculate_batch(setpoints, reductions)       # N scenarios -> dict of arrays
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# --- Physics Constants (Delhi NCR Region) ---
+# Baseline assumes a 50,000 sqft commercial facility
+BASE_LOAD_KWH = 28500.0
+THERMAL_COEFF = 0.085    # ~8.5% energy delta per degree C (ASHRAE approximation)
+CARBON_INTENSITY = 0.82  # kgCO2/kWh (Grid India average)
+PEAK_TARIFF = 12.50      # INR/kWh
+OFF_PEAK_TARIFF = 8.50   # INR/kWh
+DR_REBATE_INR = 5000.0   # DISCOM demand response rebate per snapshot
+
+# Decimal places per response field, as returned by /calculate
+RESPONSE_PRECISION = {
+    "projected_kwh": 2,
+    "cost_estimate": 2,
+    "carbon_footprint": 2,
+    "comfort_index": 3,
+    "grid_stability_score": 3,
+}
+
+
+# Optional per-stage timing hook: called as observe_stage(stage_name, seconds)
+StageObserver = Callable[[str, float], None]
+
+
+class _StageClock:
+    """Times consecutive model stages and reports each one to an observer."""
+
+    __slots__ = ("observe", "last")
+
+    def __init__(self, observe: StageObserver):
+        self.observe = observe
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.observe(stage, now - self.last)
+        self.last = now
+
+
+class _NoClock:
+    __slots__ = ()
+
+    def lap(self, stage: str) -> None:
+        pass
+
+
+_NO_CLOCK = _NoClock()
+
+
+def _clock(observe_stage: Optional[StageObserver]):
+    return _StageClock(observe_stage) if observe_stage is not None else _NO_CLOCK
+
+
+def model_fingerprint() -> tuple:
+    """Current values of every constant that affects results (cache version key)."""
+    return (
+        BASE_LOAD_KWH,
+        THERMAL_COEFF,
+        CARBON_INTENSITY,
+        PEAK_TARIFF,
+        OFF_PEAK_TARIFF,
+        DR_REBATE_INR,
+    )
+
+
+def calculate(
+    ac_setpoint: float,
+    reduction_factor: float,
+    enable_incentives: bool = False,
+    observe_stage: Optional[StageObserver] = None,
+) -> Dict[str, float]:
+    """Score one scenario; returns the SimulationResponse fields, rounded."""
+    clock = _clock(observe_stage)
+
+    # 1. Thermal Load Calculation
+    # Using simplified Degree-Day method. Baseline assumed at 22C.
+    # Physics: Q = U * A * Delta T
+    delta_t = max(0, ac_setpoint - 22.0)
+
+    # Non-linear savings curve (diminishing returns > 26C)
+    # Using numpy for efficient calculation
+    thermal_savings_pct = np.tanh(delta_t * THERMAL_COEFF)
+    clock.lap("thermal")
+
+    # 2. Load Shedding Impact
+    shedding_savings = BASE_LOAD_KWH * reduction_factor
+    thermal_savings = BASE_LOAD_KWH * thermal_savings_pct
+
+    total_savings_kwh = thermal_savings + shedding_savings
+    final_load = max(0, BASE_LOAD_KWH - total_savings_kwh)
+    clock.lap("shedding")
+
+    # 3. Financial Modeling
+    # Blended rate assumption (60% peak / 40% off-peak)
+    blended_rate = (PEAK_TARIFF * 0.6) + (OFF_PEAK_TARIFF * 0.4)
+    base_cost = final_load * blended_rate
+
+    dr_rebate = DR_REBATE_INR if enable_incentives else 0.0
+    final_cost = max(0, base_cost - dr_rebate)
+    clock.lap("financial")
+
+    # 4. Comfort Index Calculation (ASHRAE 55 simplified)
+    # 1.0 = Perfect, 0.0 = Uninhabitable
+    comfort_penalty = 0.0
+
+    if ac_setpoint > 24.0:
+        # Exponential penalty for high temps
+        comfort_penalty += ((ac_setpoint - 24.0) ** 1.5) * 0.08
+
+    if reduction_factor > 0.15:
+        # Linear penalty for aggressive shedding
+        comfort_penalty += (reduction_factor - 0.15) * 2.5
+
+    comfort_score = max(0.1, 1.0 - comfort_penalty)
+    clock.lap("comfort")
+
+    return {
+        "projected_kwh": round(float(final_load), 2),
+        "cost_estimate": round(float(final_cost), 2),
+        "carbon_footprint": round(float(final_load * CARBON_INTENSITY), 2),
+        "comfort_index": round(float(comfort_score), 3),
+        "grid_stability_score": round(0.85 + (reduction_factor * 0.15), 3)
+    }
+
+
+def calculate_batch(
+    ac_setpoint,
+    reduction_factor,
+    enable_incentives=False,
+    base_load=None,
+    tariff=None,
+    dr_rebate=None,
+    thermal_coeff=None,
+    carbon_intensity=None,
+    observe_stage: Optional[StageObserver] = None,
+) -> Dict[str, np.ndarray]:
+    """Array form of calculate(): every stage runs once over all N scenarios.
+
+    Inputs are array-likes that broadcast against each other, so time-series
+    callers can pass per-hour base_load, tariff and dr_rebate, and sampling
+    or per-facility callers per-row thermal_coeff and carbon_intensity. The
+    defaults (None) reproduce the /calculate snapshot from the current module
+    constants (blended tariff, full rebate). Results are unrounded float64
+    arrays; see to_rows() for response formatting.
+    """
+    clock = _clock(observe_stage)
+    if base_load is None:
+        base_load = BASE_LOAD_KWH
+    if dr_rebate is None:
+        dr_rebate = DR_REBATE_INR
+    if thermal_coeff is None:
+        thermal_coeff = THERMAL_COEFF
+    if carbon_intensity is None:
+        carbon_intensity = CARBON_INTENSITY
+    ac_setpoint, reduction_factor, base_load = np.broadcast_arrays(
+        np.asarray(ac_setpoint, dtype=np.float64),
+        np.asarray(reduction_factor, dtype=np.float64),
+        np.asarray(base_load, dtype=np.float64),
+    )
+
+    # 1. Thermal Load Calculation
+    delta_t = np.maximum(0.0, ac_setpoint - 22.0)
+    thermal_savings_pct = np.tanh(delta_t * thermal_coeff)
+    clock.lap("thermal")
+
+    # 2. Load Shedding Impact
+    shedding_savings = base_load * reduction_factor
+    thermal_savings = base_load * thermal_savings_pct
+    final_load = np.maximum(0.0, base_load - (thermal_savings + shedding_savings))
+    clock.lap("shedding")
+
+    # 3. Financial Modeling
+    if tariff is None:
+        tariff = (PEAK_TARIFF * 0.6) + (OFF_PEAK_TARIFF * 0.4)
+    rebate = np.where(enable_incentives, dr_rebate, 0.0)
+    final_cost = np.maximum(0.0, final_load * tariff - rebate)
+    clock.lap("financial")
+
+    # 4. Comfort Index Calculation
+    # Clamping before the power keeps the masked-out rows finite
+    heat_excess = np.maximum(0.0, ac_setpoint - 24.0)
+    comfort_penalty = np.where(ac_setpoint > 24.0, (heat_excess ** 1.5) * 0.08, 0.0)
+    comfort_penalty += np.where(reduction_factor > 0.15, (reduction_factor - 0.15) * 2.5, 0.0)
+    comfort_score = np.maximum(0.1, 1.0 - comfort_penalty)
+    clock.lap("comfort")
+
+    # 5. Grid Stability
+    stability = 0.85 + (reduction_factor * 0.15)
+
+    return {
+        "projected_kwh": final_load,
+        "cost_estimate": final_cost,
+        "carbon_footprint": final_load * carbon_intensity,
+        "comfort_index": comfort_score,
+        "grid_stability_score": stability,
+    }
+
+
+def to_rows(columns: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+    """Turn calculate_batch() columns into SimulationResponse-shaped rows.
+
+    Python's round() is used instead of np.round so that ties (e.g. 0.8815)
+    resolve exactly as they do in calculate().
+    """
+    names = list(RESPONSE_PRECISION)
+    rounded = [[round(v, RESPONSE_PRECISION[name]) for v in columns[name].tolist()] for name in names]
+    return [dict(zip(names, row)) for row in zip(*rounded)]
@@ -0,0 +1,129 @@
+"""Facility registry: per-site model parameters stored as columns.
+
+Thousands of sites are held as a handful of contiguous NumPy arrays (one
+per parameter) plus an id -> row index, instead of one dict per site. A
+portfolio run can then pass the columns straight to
+engine.calculate_batch as per-row inputs.
+
+Rows are kept dense: capacity doubles as sites are added, and a delete
+moves the last row into the freed slot. `tariff_plan` names a plan in the
+tariff calendar (tariffs.py). Names are stored as small integer codes, so
+pricing a run resolves each distinct plan once and the per-site rate is one
+np.take.
+"""
+import threading
+from typing import Callable, Container, Dict, Iterable, List, Optional
+
+import numpy as np
+
+PARAMETERS = ("base_load", "thermal_coeff", "carbon_intensity")
+
+
+class FacilityRegistry:
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._size = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._plans: List[str] = []
+        self._columns = {name: np.empty(capacity) for name in PARAMETERS}
+        self._tariff_code = np.empty(capacity, dtype=np.int16)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._tariff_code.size
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            self._columns[name] = np.resize(column, capacity)
+        self._tariff_code = np.resize(self._tariff_code, capacity)
+
+    def _plan_code(self, plan: str) -> int:
+        try:
+            return self._plans.index(plan)
+        except ValueError:
+            self._plans.append(plan)
+            return len(self._plans) - 1
+
+    def upsert(self, facilities: Iterable[dict], plans: Optional[Container[str]] = None) -> int:
+        """Add or replace sites given as dicts with facility_id, the PARAMETERS and tariff_plan.
+
+        With `plans`, every tariff_plan must be in it.
+        """
+        facilities = list(facilities)
+        for site in facilities:
+            if plans is not None and site["tariff_plan"] not in plans:
+                raise ValueError(f"Unknown tariff_plan {site['tariff_plan']!r} for {site['facility_id']}")
+        with self._lock:
+            self._grow(self._size + len(facilities))
+            for site in facilities:
+                row = self._rows.get(site["facility_id"])
+                if row is None:
+                    row = self._rows[site["facility_id"]] = self._size
+                    self._ids.append(site["facility_id"])
+                    self._size += 1
+                for name in PARAMETERS:
+                    self._columns[name][row] = site[name]
+                self._tariff_code[row] = self._plan_code(site["tariff_plan"])
+        return len(facilities)
+
+    def remove(self, facility_id: str) -> bool:
+        with self._lock:
+            row = self._rows.pop(facility_id, None)
+            if row is None:
+                return False
+            last = self._size - 1
+            if row != last:
+                # Keep rows dense: move the last site into the hole
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+                for column in self._columns.values():
+                    column[row] = column[last]
+                self._tariff_code[row] = self._tariff_code[last]
+            self._ids.pop()
+            self._size = last
+            return True
+
+    def get(self, facility_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._rows.get(facility_id)
+            if row is None:
+                return None
+            return self._row(row)
+
+    def _row(self, row: int) -> dict:
+        site = {"facility_id": self._ids[row]}
+        site.update((name, float(self._columns[name][row])) for name in PARAMETERS)
+        site["tariff_plan"] = self._plans[self._tariff_code[row]]
+        return site
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return [self._row(row) for row in range(self._size)]
+
+    def columns(self, plan_rate: Callable[[str], float], facility_ids: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Copies of the engine input columns (PARAMETERS plus tariff) and the matching ids.
+
+        `plan_rate` prices a tariff plan name; it is called once per plan in
+        use. With `facility_ids`, only those sites are returned, in that
+        order; unknown ids raise KeyError.
+        """
+        with self._lock:
+            if facility_ids is None:
+                rows = slice(0, self._size)
+                ids = list(self._ids)
+            else:
+                rows = np.fromiter((self._rows[i] for i in facility_ids), dtype=np.intp, count=len(facility_ids))
+                ids = list(facility_ids)
+            codes = self._tariff_code[rows]
+            rates = np.zeros(len(self._plans))
+            for code in np.unique(codes):
+                rates[code] = plan_rate(self._plans[code])
+            selected = {name: column[rows].copy() for name, column in self._columns.items()}
+            selected["tariff"] = rates[codes]
+        return {"facility_id": ids, **selected}
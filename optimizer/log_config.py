@@ -0,0 +1,149 @@
+"""Asynchronous, sampled, structured logging for the optimizer.
+
+Request handlers only build a LogRecord and push it onto a bounded queue.
+Message interpolation, JSON encoding and the stdout write all happen on a
+background QueueListener thread. INFO/DEBUG records can be sampled per
+route, while WARNING and above always pass and are never dropped.
+
+Environment:
+    LOG_LEVEL          minimum level (default INFO)
+    LOG_SAMPLE_RATE    default keep-probability for INFO/DEBUG records (default 1.0)
+    LOG_SAMPLE_RATES   per-route overrides, e.g. "/calculate=0.01,/sweep=1"
+    LOG_QUEUE_SIZE     records buffered before low-severity records are dropped (default 10000)
+
+Pass the route with `extra={"route": "/calculate"}` so the sampler can
+apply the matching rate; any other `extra` keys become JSON fields.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, extras, exc_info."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread.
+
+    The stock QueueHandler.prepare() interpolates the message on the
+    caller's thread; records here stay in-process, so they are enqueued
+    untouched. A full queue drops INFO/DEBUG records (counted in `dropped`)
+    but blocks for WARNING and above so errors are never lost.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+            else:
+                self.dropped += 1
+
+
+class RouteSampler(logging.Filter):
+    """Keep INFO/DEBUG records with a per-route probability; never sample WARNING+."""
+
+    def __init__(self, default_rate: float = 1.0, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = rates or {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "route", None), self.default_rate)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0 or random.random() >= rate:
+            return False
+        # Lets log consumers re-weight sampled counts
+        record.sample_rate = rate
+        return True
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """Parse "route=rate,route=rate" into a dict, ignoring blank entries."""
+    rates = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        route, _, rate = item.rpartition("=")
+        if not route:
+            raise ValueError(f"Invalid LOG_SAMPLE_RATES entry: {item!r}")
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[DeferredQueueHandler] = None
+
+
+def configure_logging(name: str = "gridops-optimizer") -> logging.Logger:
+    """Attach the queue handler and sampler to `name` and start the listener (idempotent)."""
+    global _listener, _handler
+    logger = logging.getLogger(name)
+    if _handler is not None:
+        return logger
+
+    _handler = DeferredQueueHandler(queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    _listener = QueueListener(_handler.queue, stream)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    logger.addFilter(RouteSampler(
+        default_rate=float(os.getenv("LOG_SAMPLE_RATE", "1.0")),
+        rates=parse_rates(os.getenv("LOG_SAMPLE_RATES", "")),
+    ))
+    logger.addHandler(_handler)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+    return logger
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
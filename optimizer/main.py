@@ -1,15 +1,42 @@
-import logging
+# Imported first so the startup clock covers every import below
+import startup
+
+import asyncio
+import datetime
+import email.message
+import json
 import os
-from fastapi import FastAPI, HTTPException, status
-from pydantic import BaseModel, Field
+import time
+import warnings
+from typing import Annotated, AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
+from fastapi import FastAPI, HTTPException, Request, WebSocket, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, confloat, conint, model_validator
 import numpy as np
+import orjson
 
-# Configure structured logging for container observability
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger("gridops-optimizer")
+import baselines
+import columnar
+import engine
+import metrics
+from cache import ResultCache
+from compute_pool import OFFLOAD_MIN_ROWS, ComputePool
+from log_config import configure_logging, dropped_records
+from facilities import FacilityRegistry
+from pareto import sweep_frontier
+import rules
+import schedule
+import sensitivity
+import tariffs
+import telemetry
+import thermal
+import uncertainty
+
+startup.PROFILE.mark("imports")
+
+# Structured JSON logs, written off the request path (see log_config.py)
+logger = configure_logging("gridops-optimizer")
 
 app = FastAPI(
     title="GridOps Optimization Engine",
@@ -17,12 +44,77 @@ app = FastAPI(
     docs_url="/docs"
 )
 
+app.add_middleware(
+    metrics.PrometheusMiddleware,
+    routes=lambda: app.routes,
+)
+
+# Override rules applied around every model evaluation (see rules.py).
+# Optional seed file: a JSON array of rule specs, loaded by every worker;
+# PUT /rules replaces the set in the worker that receives it.
+policy_rules = rules.RulePipeline()
+if os.getenv("POLICY_RULES_PATH"):
+    with open(os.environ["POLICY_RULES_PATH"], "rb") as f:
+        policy_rules = rules.RulePipeline(orjson.loads(f.read()))
+
+# Latest grid readings pushed to POST /telemetry; each worker keeps its own
+telemetry_store = telemetry.TelemetryStore(
+    capacity=int(os.getenv("TELEMETRY_CAPACITY", str(telemetry.DEFAULT_CAPACITY))),
+    windows=[float(span) for span in os.getenv("TELEMETRY_WINDOWS", "60,300,900").split(",")],
+)
+
+# Memoizes /calculate; dashboard traffic repeats a few dozen input combinations
+result_cache = ResultCache(
+    max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", "300")),
+    version=lambda: (engine.model_fingerprint(), policy_rules.fingerprint),
+)
+
+CACHE_HITS = metrics.REGISTRY.register(metrics.Counter(
+    "gridops_result_cache_hits_total", "Lookups answered from the /calculate result cache."))
+CACHE_MISSES = metrics.REGISTRY.register(metrics.Counter(
+    "gridops_result_cache_misses_total", "Lookups that missed the /calculate result cache."))
+CACHE_EVICTIONS = metrics.REGISTRY.register(metrics.Counter(
+    "gridops_result_cache_evictions_total", "Entries evicted from the /calculate result cache by the size bound."))
+CACHE_SIZE = metrics.REGISTRY.register(metrics.Gauge(
+    "gridops_result_cache_entries", "Entries currently held in the /calculate result cache."))
+
+LOG_RECORDS_DROPPED = metrics.REGISTRY.register(metrics.Counter(
+    "gridops_log_records_dropped_total", "INFO/DEBUG log records dropped because the log queue was full."))
+
+def _collect_cache_stats() -> None:
+    stats = result_cache.stats()
+    CACHE_HITS.sync(stats["hits"])
+    CACHE_MISSES.sync(stats["misses"])
+    CACHE_EVICTIONS.sync(stats["evictions"])
+    CACHE_SIZE.set(stats["size"])
+
+metrics.REGISTRY.on_collect(_collect_cache_stats)
+metrics.REGISTRY.on_collect(lambda: LOG_RECORDS_DROPPED.sync(dropped_records()))
+
+# Large batches, sweeps and time series run here instead of on the event loop
+compute_pool = ComputePool(
+    int(os.environ["HEAVY_POOL_WORKERS"]) if os.getenv("HEAVY_POOL_WORKERS") else None
+)
+
+@app.on_event("shutdown")
+def shutdown_compute_pool():
+    compute_pool.shutdown()
+
 # --- Domain Models ---
 
+class GridConditions(BaseModel):
+    frequency_hz: float = Field(default=rules.SIGNALS["frequency_hz"], gt=0.0, description="Grid frequency in Hz")
+    voltage_pu: float = Field(default=rules.SIGNALS["voltage_pu"], ge=0.0, description="Supply voltage, per unit of nominal")
+    power_factor: float = Field(default=rules.SIGNALS["power_factor"], ge=0.0, le=1.0, description="Facility power factor")
+    maintenance: bool = Field(default=False, description="Facility is in a maintenance window")
+
 class SimulationRequest(BaseModel):
     ac_setpoint: float = Field(..., ge=16.0, le=32.0, description="Target HVAC temperature in Celsius")
     reduction_factor: float = Field(..., ge=0.0, le=1.0, description="Load shedding percentage (0-1)")
     enable_incentives: bool = Field(default=False, description="Apply DISCOM demand response rebates")
+    grid: Optional[GridConditions] = Field(default=None, description="Grid readings tested by policy rules; nominal when omitted")
+    live: bool = Field(default=False, description="Use live telemetry for grid readings, carbon intensity and facility load; an explicit grid wins")
 
 class SimulationResponse(BaseModel):
     projected_kwh: float
@@ -31,73 +123,1526 @@ class SimulationResponse(BaseModel):
     comfort_index: float
     grid_stability_score: float
 
-# --- Physics Constants (Delhi NCR Region) ---
-# Baseline assumes a 50,000 sqft commercial facility
-BASE_LOAD_KWH = 28500.0  
-THERMAL_COEFF = 0.085    # ~8.5% energy delta per degree C (ASHRAE approximation)
-CARBON_INTENSITY = 0.82  # kgCO2/kWh (Grid India average)
-PEAK_TARIFF = 12.50      # INR/kWh
-OFF_PEAK_TARIFF = 8.50   # INR/kWh
+class BatchSimulationRequest(BaseModel):
+    scenarios: List[SimulationRequest] = Field(..., min_length=1, max_length=100_000, description="Scenarios to evaluate in one vectorized pass")
+
+class BatchSimulationResponse(BaseModel):
+    results: List[SimulationResponse]
+
+MAX_SWEEP_POINTS = 1_000_000
+
+class SweepRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(..., gt=0.0)
+
+    def size(self) -> int:
+        # The epsilon keeps `stop` in the grid when float division lands just short of it
+        return int(np.floor((self.stop - self.start) / self.step + 1e-9)) + 1
+
+    def values(self) -> np.ndarray:
+        """Grid points from start to stop inclusive."""
+        return np.minimum(self.start + self.step * np.arange(self.size()), self.stop)
+
+class SweepRequest(BaseModel):
+    ac_setpoint: SweepRange = Field(..., description="Setpoint range in Celsius (16-32)")
+    reduction_factor: SweepRange = Field(..., description="Load shedding range (0-1)")
+    enable_incentives: bool = Field(default=False, description="Apply DISCOM demand response rebates")
+    include_carbon: bool = Field(default=False, description="Add carbon_footprint as a third frontier objective")
+    grid: Optional[GridConditions] = Field(default=None, description="Grid readings tested by policy rules, held for the whole grid")
+    live: bool = Field(default=False, description="Use live telemetry for grid readings, carbon intensity and facility load; an explicit grid wins")
+
+    @model_validator(mode="after")
+    def check_grid(self):
+        for name, rng, low, high in (
+            ("ac_setpoint", self.ac_setpoint, 16.0, 32.0),
+            ("reduction_factor", self.reduction_factor, 0.0, 1.0),
+        ):
+            if not (low <= rng.start <= rng.stop <= high):
+                raise ValueError(f"{name} range must satisfy {low} <= start <= stop <= {high}")
+            # Checked in floats first: a subnormal step makes the point count inf
+            if (rng.stop - rng.start) / rng.step >= MAX_SWEEP_POINTS:
+                raise ValueError(f"{name} step is too small: the range would exceed {MAX_SWEEP_POINTS} points")
+        if self.ac_setpoint.size() * self.reduction_factor.size() > MAX_SWEEP_POINTS:
+            raise ValueError(f"Sweep grid exceeds {MAX_SWEEP_POINTS} points")
+        return self
+
+class SweepPoint(SimulationResponse):
+    ac_setpoint: float
+    reduction_factor: float
+
+class SweepResponse(BaseModel):
+    grid_size: int
+    frontier: List[SweepPoint]
+
+# --- Annual Time-Series Models ---
+
+MAX_SERIES_HOURS = 8784 * 2  # two leap years
+
+Setpoint = confloat(ge=16.0, le=32.0)
+Reduction = confloat(ge=0.0, le=1.0)
+
+class GridSeries(BaseModel):
+    frequency_hz: Union[confloat(gt=0.0), List[confloat(gt=0.0)]] = Field(default=rules.SIGNALS["frequency_hz"], description="Hz, constant or one value per hour")
+    voltage_pu: Union[confloat(ge=0.0), List[confloat(ge=0.0)]] = Field(default=rules.SIGNALS["voltage_pu"], description="Per unit, constant or one value per hour")
+    power_factor: Union[confloat(ge=0.0, le=1.0), List[confloat(ge=0.0, le=1.0)]] = Field(default=rules.SIGNALS["power_factor"], description="Constant or one value per hour")
+    maintenance: Union[bool, List[bool]] = Field(default=False, description="Maintenance window flag, constant or one value per hour")
+
+class AnnualSimulationRequest(BaseModel):
+    timestamps: List[str] = Field(..., min_length=1, max_length=MAX_SERIES_HOURS, description="Hour-start timestamps in local facility time (ISO 8601, no UTC offset)")
+    ac_setpoint: Union[Setpoint, List[Setpoint]] = Field(..., description="Setpoint in Celsius, constant or one value per hour")
+    reduction_factor: Union[Reduction, List[Reduction]] = Field(default=0.0, description="Load shedding (0-1), constant or one value per hour")
+    base_load_kwh: Optional[List[confloat(ge=0.0)]] = Field(default=None, description="Hourly facility load profile; defaults to BASE_LOAD_KWH spread evenly over the day")
+    tariff_inr_per_kwh: Optional[List[confloat(ge=0.0)]] = Field(default=None, description="Hourly tariff; defaults to the blended peak/off-peak rate")
+    tariff_plan: Optional[str] = Field(default=None, description="Named tariff calendar plan (see /tariffs) priced at each hour's start; instead of tariff_inr_per_kwh")
+    enable_incentives: bool = Field(default=False, description="Apply DISCOM demand response rebates")
+    grid: Optional[GridSeries] = Field(default=None, description="Grid readings tested by policy rules; nominal when omitted")
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        hours = len(self.timestamps)
+        for name in ("ac_setpoint", "reduction_factor", "base_load_kwh", "tariff_inr_per_kwh"):
+            value = getattr(self, name)
+            if isinstance(value, list) and len(value) != hours:
+                raise ValueError(f"{name} has {len(value)} values but timestamps has {hours}")
+        if self.tariff_inr_per_kwh is not None and self.tariff_plan is not None:
+            raise ValueError("Give either tariff_inr_per_kwh or tariff_plan, not both")
+        if self.grid is not None:
+            for name, value in self.grid:
+                if isinstance(value, list) and len(value) != hours:
+                    raise ValueError(f"grid.{name} has {len(value)} values but timestamps has {hours}")
+        return self
+
+class HourlySeries(BaseModel):
+    timestamps: List[str]
+    projected_kwh: List[float]
+    cost_estimate: List[float]
+    carbon_footprint: List[float]
+    comfort_index: List[float]
+
+class PeriodRollup(BaseModel):
+    period: str
+    hours: int
+    projected_kwh: float
+    cost_estimate: float
+    carbon_footprint: float
+    mean_comfort_index: float
+    min_comfort_index: float
+
+class AnnualSimulationResponse(BaseModel):
+    hourly: HourlySeries
+    monthly: List[PeriodRollup]
+    annual: PeriodRollup
+
+# --- Policy Rules ---
+
+class RuleCondition(BaseModel):
+    field: Literal[rules.CONDITION_FIELDS]
+    op: Literal[tuple(rules.COMPARISONS)]
+    value: float
+
+class RuleAction(BaseModel):
+    target: Literal[(*rules.INPUT_TARGETS, *rules.OUTPUT_TARGETS)]
+    op: Literal[tuple(rules.ACTIONS)]
+    value: float
+
+class RuleSpec(BaseModel):
+    name: str = Field(..., min_length=1, max_length=64)
+    priority: int = Field(default=0, description="Higher-priority rules act later and win conflicts")
+    when: List[RuleCondition] = Field(default_factory=list, description="All must hold; empty always matches")
+    then: List[RuleAction] = Field(..., min_length=1)
+
+class RuleSet(BaseModel):
+    rules: List[RuleSpec] = Field(..., max_length=256)
+
+RULE_HITS = metrics.REGISTRY.register(metrics.Counter(
+    "gridops_rule_hits_total", "Rows a policy rule fired on, by rule.", ("rule",)))
+
+def _record_hits(hits: dict) -> None:
+    for name, rows in hits.items():
+        if rows:
+            RULE_HITS.labels(name).inc(rows)
+
+def _grid_signals(conditions: List[Optional[GridConditions]]) -> Optional[dict]:
+    """Per-row signal arrays for policy rules; None when every row is nominal."""
+    if all(c is None for c in conditions):
+        return None
+    nominal = GridConditions()
+    return {
+        name: np.fromiter((getattr(c or nominal, name) for c in conditions), dtype=np.float64, count=len(conditions))
+        for name in rules.SIGNALS
+    }
+
+def _live_inputs() -> Tuple[Optional[GridConditions], Dict[str, float]]:
+    """Fresh telemetry as (grid readings for rules, scalar model inputs)."""
+    latest = telemetry_store.latest()
+    readings = {name: latest[name] for name in ("frequency_hz", "voltage_pu", "power_factor") if name in latest}
+    inputs = {}
+    if "carbon_intensity" in latest:
+        inputs["carbon_intensity"] = latest["carbon_intensity"]
+    if "facility_load_kw" in latest:
+        # The model works in daily kWh; hold the current draw for 24 h
+        inputs["base_load"] = latest["facility_load_kw"] * 24.0
+    return (GridConditions(**readings) if readings else None), inputs
+
+def _scenario_inputs(scenarios: List[SimulationRequest]) -> Tuple[dict, Optional[dict]]:
+    """Row-aligned model inputs and rule signals, with live telemetry for rows that ask for it."""
+    n = len(scenarios)
+    arrays = {
+        "ac_setpoint": np.fromiter((s.ac_setpoint for s in scenarios), dtype=np.float64, count=n),
+        "reduction_factor": np.fromiter((s.reduction_factor for s in scenarios), dtype=np.float64, count=n),
+        "enable_incentives": np.fromiter((s.enable_incentives for s in scenarios), dtype=bool, count=n),
+    }
+    grids = [s.grid for s in scenarios]
+    live = np.fromiter((s.live for s in scenarios), dtype=bool, count=n)
+    if live.any():
+        live_grid, inputs = _live_inputs()
+        grids = [grid or (live_grid if s.live else None) for grid, s in zip(grids, scenarios)]
+        defaults = {"carbon_intensity": engine.CARBON_INTENSITY, "base_load": engine.BASE_LOAD_KWH}
+        for name, value in inputs.items():
+            arrays[name] = np.where(live, value, defaults[name])
+    return arrays, _grid_signals(grids)
+
+async def _evaluate(arrays: dict, signals: Optional[dict] = None, observe_stage=None, **kwargs) -> dict:
+    """compute_pool.calculate_batch with the active policy rules applied around it."""
+    pipeline = policy_rules
+    arrays, kwargs, masks = pipeline.apply_inputs(arrays, kwargs, signals)
+    columns = await compute_pool.calculate_batch(arrays, observe_stage=observe_stage, **kwargs)
+    _record_hits(pipeline.hits(masks))
+    return pipeline.apply_outputs(columns, masks)
+
+@app.get("/rules", response_model=RuleSet)
+async def list_rules():
+    """Active rules in the order they run."""
+    return {"rules": policy_rules.specs()}
+
+@app.put("/rules", response_model=RuleSet)
+async def replace_rules(payload: RuleSet):
+    """Replace the whole rule set (in this worker); cached results are invalidated."""
+    global policy_rules
+    try:
+        policy_rules = rules.RulePipeline(spec.model_dump() for spec in payload.rules)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    logger.info("Installed %d policy rules", len(policy_rules), extra={"route": "/rules"})
+    return {"rules": policy_rules.specs()}
 
 @app.get("/health")
 async def health_check():
     """K8s/Docker health probe endpoint."""
     return {"status": "healthy", "service": "optimizer"}
 
-@app.post("/calculate", response_model=SimulationResponse)
-async def calculate_impact(payload: SimulationRequest):
-    try:
-        logger.info(f"Processing simulation for setpoint: {payload.ac_setpoint}C")
-
-        # 1. Thermal Load Calculation
-        # Using simplified Degree-Day method. Baseline assumed at 22C.
-        # Physics: Q = U * A * Delta T
-        delta_t = max(0, payload.ac_setpoint - 22.0)
-        
-        # Non-linear savings curve (diminishing returns > 26C)
-        # Using numpy for efficient calculation
-        thermal_savings_pct = np.tanh(delta_t * THERMAL_COEFF)
-        
-        # 2. Load Shedding Impact
-        shedding_savings = BASE_LOAD_KWH * payload.reduction_factor
-        thermal_savings = BASE_LOAD_KWH * thermal_savings_pct
-        
-        total_savings_kwh = thermal_savings + shedding_savings
-        final_load = max(0, BASE_LOAD_KWH - total_savings_kwh)
-
-        # 3. Financial Modeling
-        # Blended rate assumption (60% peak / 40% off-peak)
-        blended_rate = (PEAK_TARIFF * 0.6) + (OFF_PEAK_TARIFF * 0.4)
-        base_cost = final_load * blended_rate
-        
-        dr_rebate = 5000.0 if payload.enable_incentives else 0.0
-        final_cost = max(0, base_cost - dr_rebate)
-
-        # 4. Comfort Index Calculation (ASHRAE 55 simplified)
-        # 1.0 = Perfect, 0.0 = Uninhabitable
-        comfort_penalty = 0.0
-        
-        if payload.ac_setpoint > 24.0:
-            # Exponential penalty for high temps
-            comfort_penalty += ((payload.ac_setpoint - 24.0) ** 1.5) * 0.08
-            
-        if payload.reduction_factor > 0.15:
-            # Linear penalty for aggressive shedding
-            comfort_penalty += (payload.reduction_factor - 0.15) * 2.5
-            
-        comfort_score = max(0.1, 1.0 - comfort_penalty)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format)."""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss/eviction counters for the /calculate result cache."""
+    return result_cache.stats()
+
+@app.delete("/cache", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_cache():
+    """Drop every cached result (e.g. after recalibrating the model)."""
+    result_cache.clear()
+
+def _is_json(content_type: Optional[str]) -> bool:
+    """FastAPI's rule: no content type, application/json or application/*+json."""
+    if not content_type or content_type.startswith("application/json"):
+        return True
+    message = email.message.Message()
+    message["content-type"] = content_type
+    if message.get_content_maintype() != "application":
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == "json" or subtype.endswith("+json")
+
+def _parse_simulation_request(body: bytes, content_type: Optional[str] = None) -> SimulationRequest:
+    """Validate a /calculate body straight from bytes with pydantic-core.
+
+    Invalid bodies are re-checked the way FastAPI's own body parsing does, so
+    422 responses keep exactly the same shape as before. Like FastAPI, a body
+    whose content type is not JSON is not parsed as JSON.
+    """
+    if not _is_json(content_type):
+        data = body or None
+    else:
+        try:
+            return SimulationRequest.model_validate_json(body)
+        except ValidationError:
+            pass
+        try:
+            data = json.loads(body) if body else None
+        except json.JSONDecodeError as e:
+            raise RequestValidationError(
+                [{"type": "json_invalid", "loc": ("body", e.pos), "msg": "JSON decode error", "input": {}, "ctx": {"error": e.msg}}],
+                body=e.doc,
+            )
+    try:
+        if data is None:
+            raise ValidationError.from_exception_data("SimulationRequest", [{"type": "missing", "loc": (), "input": None}])
+        return SimulationRequest.model_validate(data, from_attributes=True)
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()], body=data)
+
+def _cached_result(payload: SimulationRequest) -> bytes:
+    """orjson-encoded SimulationResponse for one scenario, via the result cache."""
+    key = (float(payload.ac_setpoint), float(payload.reduction_factor), bool(payload.enable_incentives))
+    grid, inputs = payload.grid, {}
+    if payload.live:
+        live_grid, inputs = _live_inputs()
+        grid = grid or live_grid
+    if grid is not None:
+        key += tuple(value for _, value in grid)
+    # Live readings are part of the key, so a new reading is a new entry
+    key += tuple(sorted(inputs.items()))
+    content = result_cache.get(key)
+    if content is None:
+        pipeline = policy_rules
+        if len(pipeline) or inputs:
+            columns, hits = rules.evaluate(
+                pipeline,
+                {"ac_setpoint": np.array([key[0]]), "reduction_factor": np.array([key[1]])},
+                _grid_signals([grid]),
+                enable_incentives=key[2],
+                observe_stage=metrics.observe_stage,
+                **inputs,
+            )
+            _record_hits(hits)
+            content = orjson.dumps(engine.to_rows(columns)[0])
+        else:
+            content = orjson.dumps(engine.calculate(*key[:3], observe_stage=metrics.observe_stage))
+        result_cache.put(key, content)
+    return content
+
+def _describe_errors(e: ValidationError) -> str:
+    """One-line summary of a ValidationError for in-band error messages."""
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+# Documents the JSON body that calculate_impact parses itself
+SIMULATION_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/SimulationRequest"}}},
+    }
+}
+
+@app.post("/calculate", response_model=SimulationResponse, openapi_extra=SIMULATION_REQUEST_BODY)
+async def calculate_impact(request: Request):
+    """Single-scenario hot path.
+
+    Skips FastAPI's body dependency and response_model re-validation: the
+    body is validated once from raw bytes, and the cache holds the
+    orjson-encoded response so repeated inputs skip evaluation and encoding.
+    """
+    payload = _parse_simulation_request(await request.body(), request.headers.get("content-type"))
+    try:
+        logger.info("Processing simulation for setpoint: %sC", payload.ac_setpoint, extra={"route": "/calculate"})
+
+        return Response(content=_cached_result(payload), media_type="application/json")
+
+    except Exception as e:
+        logger.error("Calculation failed: %s", e, exc_info=True, extra={"route": "/calculate"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+@app.post("/calculate/batch", response_model=BatchSimulationResponse)
+async def calculate_impact_batch(payload: BatchSimulationRequest):
+    """Evaluate N scenarios in one request; results keep the input order."""
+    try:
+        scenarios = payload.scenarios
+        logger.info("Processing batch simulation of %d scenarios", len(scenarios), extra={"route": "/calculate/batch"})
+
+        arrays, signals = _scenario_inputs(scenarios)
+        columns = await _evaluate(arrays, signals, observe_stage=metrics.observe_stage)
+
+        return {"results": engine.to_rows(columns)}
+
+    except Exception as e:
+        logger.error("Batch calculation failed: %s", e, exc_info=True, extra={"route": "/calculate/batch"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+@app.post("/calculate/batch/columnar")
+async def calculate_impact_columnar(request: Request):
+    """Binary batch evaluation; the response uses the request's content type.
+
+    See columnar.py for the raw float64 and Arrow IPC layouts.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in columnar.CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be one of: {', '.join(columnar.CONTENT_TYPES)}"
+        )
+
+    try:
+        inputs = columnar.DECODERS[content_type](await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    try:
+        logger.info("Processing columnar batch of %d scenarios", inputs[0].size, extra={"route": "/calculate/batch/columnar"})
+        # The binary layouts carry no grid readings, so rules see nominal signals
+        columns = await _evaluate(
+            dict(zip(("ac_setpoint", "reduction_factor", "enable_incentives"), inputs)),
+            observe_stage=metrics.observe_stage,
+        )
+        return Response(content=columnar.ENCODERS[content_type](columns), media_type=content_type)
+
+    except Exception as e:
+        logger.error("Columnar batch calculation failed: %s", e, exc_info=True, extra={"route": "/calculate/batch/columnar"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+@app.post("/sweep", response_model=SweepResponse)
+async def sweep_parameters(payload: SweepRequest):
+    """Evaluate the setpoint x shedding grid and return its cost/comfort Pareto frontier."""
+    try:
+        setpoints, reductions = payload.ac_setpoint.values(), payload.reduction_factor.values()
+        grid_size = setpoints.size * reductions.size
+        logger.info("Processing parameter sweep over %d grid points", grid_size, extra={"route": "/sweep"})
+
+        # Only the frontier comes back from the pool, so the grid is never pickled
+        grid, inputs = payload.grid, {}
+        if payload.live:
+            live_grid, inputs = _live_inputs()
+            grid = grid or live_grid
+        signals = grid.model_dump() if grid is not None else None
+        args = (setpoints, reductions, payload.enable_incentives, payload.include_carbon, policy_rules, signals, inputs)
+        if grid_size >= OFFLOAD_MIN_ROWS:
+            sweep = await compute_pool.run(sweep_frontier, *args)
+        else:
+            sweep = sweep_frontier(*args)
+        _record_hits(sweep["rule_hits"])
+
+        rows = engine.to_rows(sweep["columns"])
+        for row, setpoint, reduction in zip(rows, sweep["ac_setpoint"].tolist(), sweep["reduction_factor"].tolist()):
+            row["ac_setpoint"] = round(setpoint, 3)
+            row["reduction_factor"] = round(reduction, 4)
+        return {"grid_size": sweep["grid_size"], "frontier": rows}
+
+    except Exception as e:
+        logger.error("Parameter sweep failed: %s", e, exc_info=True, extra={"route": "/sweep"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+def _parse_hours(timestamps: List[str]) -> np.ndarray:
+    """Parse ISO timestamps into datetime64[m] in one NumPy call."""
+    # NumPy silently shifts offset-qualified strings to UTC; refuse them instead
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            return np.array(timestamps, dtype="datetime64[m]")
+        except (ValueError, UserWarning, DeprecationWarning) as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Invalid timestamps: {e}"
+            )
+
+def _rollup(labels: np.ndarray, columns: dict) -> List[dict]:
+    """Sum energy/cost/carbon and summarise comfort per label with bincount."""
+    periods, group, hours = np.unique(labels, return_inverse=True, return_counts=True)
+    totals = {
+        name: np.bincount(group, weights=columns[name], minlength=len(periods))
+        for name in ("projected_kwh", "cost_estimate", "carbon_footprint")
+    }
+    mean_comfort = np.bincount(group, weights=columns["comfort_index"], minlength=len(periods)) / hours
+    min_comfort = np.full(len(periods), np.inf)
+    np.minimum.at(min_comfort, group, columns["comfort_index"])
+
+    return [
+        {
+            "period": str(period),
+            "hours": int(hours[i]),
+            "projected_kwh": round(float(totals["projected_kwh"][i]), 2),
+            "cost_estimate": round(float(totals["cost_estimate"][i]), 2),
+            "carbon_footprint": round(float(totals["carbon_footprint"][i]), 2),
+            "mean_comfort_index": round(float(mean_comfort[i]), 3),
+            "min_comfort_index": round(float(min_comfort[i]), 3),
+        }
+        for i, period in enumerate(periods)
+    ]
+
+@app.post("/simulate/annual", response_model=AnnualSimulationResponse)
+async def simulate_annual(payload: AnnualSimulationRequest):
+    """Hourly time-series run (e.g. a full 8760 h year) with monthly and annual rollups."""
+    hours = _parse_hours(payload.timestamps)
+    if (np.diff(hours) <= np.timedelta64(0, "m")).any():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid timestamps: must be strictly increasing (sorted, no duplicates)"
+        )
+    tariff_plan = _tariff_plan(payload.tariff_plan) if payload.tariff_plan is not None else None
+    try:
+        logger.info("Processing annual simulation over %d hours", hours.size, extra={"route": "/simulate/annual"})
+
+        arrays = {
+            "ac_setpoint": np.broadcast_to(np.asarray(payload.ac_setpoint, dtype=np.float64), hours.shape),
+            "reduction_factor": np.broadcast_to(np.asarray(payload.reduction_factor, dtype=np.float64), hours.shape),
+        }
+        kwargs = {"base_load": engine.BASE_LOAD_KWH / 24.0, "tariff": None}
+        if payload.base_load_kwh is not None:
+            arrays["base_load"] = np.asarray(payload.base_load_kwh, dtype=np.float64)
+            del kwargs["base_load"]
+        if payload.tariff_inr_per_kwh is not None:
+            arrays["tariff"] = np.asarray(payload.tariff_inr_per_kwh, dtype=np.float64)
+            del kwargs["tariff"]
+        elif tariff_plan is not None:
+            arrays["tariff"] = tariff_plan.rates(hours)
+            del kwargs["tariff"]
+
+        signals = None
+        if payload.grid is not None:
+            signals = {name: np.asarray(value, dtype=np.float64) for name, value in payload.grid}
+
+        # The snapshot rebate is daily, so each hour earns 1/24th of it
+        columns = await _evaluate(
+            arrays,
+            signals,
+            enable_incentives=payload.enable_incentives,
+            dr_rebate=engine.DR_REBATE_INR / 24.0,
+            observe_stage=metrics.observe_stage,
+            **kwargs,
+        )
+
+        hourly = {"timestamps": payload.timestamps}
+        for name in ("projected_kwh", "cost_estimate", "carbon_footprint", "comfort_index"):
+            digits = engine.RESPONSE_PRECISION[name]
+            hourly[name] = [round(v, digits) for v in columns[name].tolist()]
+
+        return {
+            "hourly": hourly,
+            "monthly": _rollup(hours.astype("datetime64[M]"), columns),
+            "annual": _rollup(np.zeros(hours.size, dtype=np.int8), columns)[0] | {"period": "total"},
+        }
+
+    except Exception as e:
+        logger.error("Annual simulation failed: %s", e, exc_info=True, extra={"route": "/simulate/annual"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+# --- Streaming NDJSON Pipeline ---
+
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1024"))
+STREAM_MAX_LINE_BYTES = 64 * 1024
+
+def _score_batch(pending: List[tuple]) -> bytes:
+    """Evaluate one micro-batch of (line_no, id, request | error) and encode it as NDJSON."""
+    valid = [(line_no, ref, req) for line_no, ref, req in pending if isinstance(req, SimulationRequest)]
+    results = iter(())
+    if valid:
+        pipeline = policy_rules
+        arrays, signals = _scenario_inputs([r for _, _, r in valid])
+        columns, hits = rules.evaluate(pipeline, arrays, signals, observe_stage=metrics.observe_stage)
+        _record_hits(hits)
+        results = iter(engine.to_rows(columns))
+
+    out = []
+    for line_no, ref, req in pending:
+        row = {"line": line_no}
+        if ref is not None:
+            row["id"] = ref
+        if isinstance(req, SimulationRequest):
+            row.update(next(results))
+        else:
+            row["error"] = req
+        out.append(json.dumps(row))
+    return ("\n".join(out) + "\n").encode()
+
+def _parse_line(line: bytes) -> tuple:
+    """Decode one NDJSON scenario into (id, SimulationRequest) or (id, error message)."""
+    try:
+        obj = json.loads(line)
+        if not isinstance(obj, dict):
+            return None, "Expected a JSON object"
+        return obj.get("id"), SimulationRequest.model_validate(obj)
+    except json.JSONDecodeError as e:
+        return None, f"Invalid JSON: {e.msg}"
+    except UnicodeDecodeError:
+        return None, "Invalid JSON: line is not UTF-8"
+    except ValidationError as e:
+        return obj.get("id"), _describe_errors(e)
+
+async def _stream_results(request: Request) -> AsyncIterator[bytes]:
+    """Pull request chunks lazily and yield one NDJSON block per micro-batch.
+
+    Only the partial trailing line and the current micro-batch are held in
+    memory; a line longer than STREAM_MAX_LINE_BYTES gets an error row and
+    is not buffered. The body is read only as fast as results are sent, so a slow
+    consumer throttles intake through the ASGI send path.
+    """
+    buffer = b""
+    pending: List[tuple] = []
+    line_no = 0
+    scored = 0
+    skipping = False  # discarding the rest of a line already reported as too long
+    too_long = f"Line exceeds {STREAM_MAX_LINE_BYTES} bytes"
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if skipping:
+                skipping = False
+            elif len(line) > STREAM_MAX_LINE_BYTES:
+                pending.append((line_no, None, too_long))
+            elif line.strip():
+                pending.append((line_no, *_parse_line(line)))
+            if len(pending) >= STREAM_BATCH_SIZE:
+                yield _score_batch(pending)
+                scored += len(pending)
+                pending = []
+        if skipping:
+            buffer = b""
+        elif len(buffer) > STREAM_MAX_LINE_BYTES:
+            # Report the line now and drop the rest of it as it arrives
+            pending.append((line_no + 1, None, too_long))
+            buffer, skipping = b"", True
+
+    if buffer.strip() and not skipping:
+        pending.append((line_no + 1, *_parse_line(buffer)))
+    if pending:
+        yield _score_batch(pending)
+        scored += len(pending)
+    logger.info("Streamed %d scenarios", scored, extra={"route": "/calculate/stream"})
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator may still be reading the request.
+
+    Starlette's version listens for client disconnects by draining `receive`,
+    which would swallow the request chunks the iterator is consuming. Here a
+    disconnect surfaces through request.stream() or a failed send instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@app.post("/calculate/stream")
+async def calculate_impact_stream(request: Request):
+    """NDJSON in, NDJSON out: one result line per scenario line, in input order.
+
+    Each output row carries the 1-based input `line` (and the scenario's
+    optional `id`); rows that fail validation get an `error` instead of
+    results so one bad record does not abort a backfill.
+    """
+    return DuplexStreamingResponse(_stream_results(request), media_type="application/x-ndjson")
+
+# --- Live Simulation Channel ---
+
+LIVE_SESSIONS = metrics.REGISTRY.register(metrics.Gauge(
+    "gridops_live_sessions", "Open /ws/simulate sessions."))
+LIVE_UPDATES = metrics.REGISTRY.register(metrics.Counter(
+    "gridops_live_updates_total", "Parameter updates received on /ws/simulate, by outcome.", ("outcome",)))
+
+def _live_reply(message: str) -> str:
+    """Score one live update; the reply echoes the update's `seq`."""
+    try:
+        data = orjson.loads(message)
+    except orjson.JSONDecodeError as e:
+        LIVE_UPDATES.labels("invalid").inc()
+        return orjson.dumps({"seq": None, "error": f"Invalid JSON: {e}"}).decode()
+    seq = data.get("seq") if isinstance(data, dict) else None
+    try:
+        payload = SimulationRequest.model_validate(data)
+    except ValidationError as e:
+        LIVE_UPDATES.labels("invalid").inc()
+        return orjson.dumps({"seq": seq, "error": _describe_errors(e)}).decode()
+    LIVE_UPDATES.labels("computed").inc()
+    return (b'{"seq":' + orjson.dumps(seq) + b',"result":' + _cached_result(payload) + b"}").decode()
+
+@app.websocket("/ws/simulate")
+async def live_simulation(websocket: WebSocket):
+    """Interactive what-if channel: send parameter updates, receive results for the latest one.
+
+    Each text message is a SimulationRequest plus an optional client `seq`.
+    Updates are read as soon as they arrive, but only the newest pending one
+    is scored: anything it replaced before being scored is dropped (counted
+    as "superseded"). A client dragging a slider therefore gets one reply
+    per result the connection can actually deliver, never a backlog of
+    stale ones.
+    """
+    await websocket.accept()
+    LIVE_SESSIONS.inc()
+    latest: Optional[str] = None
+    arrived = asyncio.Event()
+
+    async def receive_updates():
+        nonlocal latest
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if latest is not None:
+                LIVE_UPDATES.labels("superseded").inc()
+            latest = message.get("text") or (message.get("bytes") or b"").decode("utf-8", "replace")
+            arrived.set()
+
+    receiver = asyncio.create_task(receive_updates())
+    try:
+        while True:
+            if not arrived.is_set():
+                if receiver.done():
+                    break
+                waiter = asyncio.ensure_future(arrived.wait())
+                await asyncio.wait({receiver, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                continue
+            arrived.clear()
+            message, latest = latest, None
+            await websocket.send_text(_live_reply(message))
+    except Exception as e:
+        logger.warning("Live session ended: %s", e, extra={"route": "/ws/simulate"})
+    finally:
+        receiver.cancel()
+        LIVE_SESSIONS.dec()
+
+# --- Day-Ahead Schedule ---
+
+class ScheduleRequest(BaseModel):
+    tariff_inr_per_kwh: Optional[List[confloat(ge=0.0)]] = Field(default=None, description="Tariff per step: 24 hourly or 96 quarter-hour values starting at 00:00")
+    tariff_plan: Optional[str] = Field(default=None, description="Named tariff calendar plan priced at each step's start on `date`; instead of tariff_inr_per_kwh")
+    date: Optional[datetime.date] = Field(default=None, description="Day to schedule (local facility time); required with tariff_plan")
+    steps: Literal[schedule.SCHEDULE_STEPS] = Field(default=24, description="Steps per day with tariff_plan")
+    min_comfort_index: float = Field(..., ge=0.1, le=1.0, description="Required mean comfort_index over the day")
+    comfort_floor: float = Field(default=0.1, ge=0.1, le=1.0, description="No single step may drop below this comfort_index")
+    base_load_kwh: Optional[List[confloat(ge=0.0)]] = Field(default=None, description="Facility load per step; defaults to BASE_LOAD_KWH spread evenly over the day")
+    enable_incentives: bool = Field(default=False, description="Apply DISCOM demand response rebates")
+
+    @model_validator(mode="after")
+    def check_steps(self):
+        if (self.tariff_inr_per_kwh is None) == (self.tariff_plan is None):
+            raise ValueError("Give exactly one of tariff_inr_per_kwh or tariff_plan")
+        if self.tariff_plan is not None:
+            if self.date is None:
+                raise ValueError("date is required with tariff_plan")
+            if self.base_load_kwh is not None and len(self.base_load_kwh) != self.steps:
+                raise ValueError(f"base_load_kwh has {len(self.base_load_kwh)} values but steps is {self.steps}")
+            return self
+        steps = len(self.tariff_inr_per_kwh)
+        if steps not in schedule.SCHEDULE_STEPS:
+            raise ValueError(f"tariff_inr_per_kwh must have {' or '.join(map(str, schedule.SCHEDULE_STEPS))} values, got {steps}")
+        if self.base_load_kwh is not None and len(self.base_load_kwh) != steps:
+            raise ValueError(f"base_load_kwh has {len(self.base_load_kwh)} values but tariff_inr_per_kwh has {steps}")
+        return self
+
+class ScheduleStep(SimulationResponse):
+    start: str
+    ac_setpoint: float
+    reduction_factor: float
+    tariff_inr_per_kwh: float
+
+class ScheduleSummary(BaseModel):
+    projected_kwh: float
+    cost_estimate: float
+    carbon_footprint: float
+    mean_comfort_index: float
+    flat_cost_estimate: float
+
+class ScheduleResponse(BaseModel):
+    steps: List[ScheduleStep]
+    total: ScheduleSummary
+
+@app.post("/schedule/day-ahead", response_model=ScheduleResponse)
+async def schedule_day_ahead(payload: ScheduleRequest):
+    """Cheapest setpoint/shedding plan for the day that keeps mean comfort above the budget.
+
+    `total.flat_cost_estimate` is the cost of the best single setting held
+    all day under the same budget, i.e. the saving from shifting load.
+    """
+    tariff = payload.tariff_inr_per_kwh
+    if tariff is None:
+        step_starts = np.datetime64(payload.date, "m") + np.arange(payload.steps) * (24 * 60 // payload.steps)
+        tariff = _tariff_plan(payload.tariff_plan).rates(step_starts).tolist()
+
+    try:
+        steps = len(tariff)
+        logger.info("Optimizing day-ahead schedule over %d steps", steps, extra={"route": "/schedule/day-ahead"})
+
+        args = (tariff, payload.min_comfort_index)
+        plan = schedule.optimize_schedule(
+            *args,
+            base_load=payload.base_load_kwh,
+            enable_incentives=payload.enable_incentives,
+            comfort_floor=payload.comfort_floor,
+        )
+        flat_cost = schedule.flat_schedule_cost(
+            *args, base_load=payload.base_load_kwh, enable_incentives=payload.enable_incentives
+        )
+
+        rows = engine.to_rows({name: plan[name] for name in engine.RESPONSE_PRECISION})
+        minutes_per_step = 24 * 60 // steps
+        for i, (row, setpoint, reduction, rate) in enumerate(zip(
+            rows, plan["ac_setpoint"].tolist(), plan["reduction_factor"].tolist(), tariff
+        )):
+            minute = i * minutes_per_step
+            row.update(
+                start=f"{minute // 60:02d}:{minute % 60:02d}",
+                ac_setpoint=round(setpoint, 3),
+                reduction_factor=round(reduction, 4),
+                tariff_inr_per_kwh=rate,
+            )
+
+        return {
+            "steps": rows,
+            "total": {
+                "projected_kwh": round(float(plan["projected_kwh"].sum()), 2),
+                "cost_estimate": round(float(plan["cost_estimate"].sum()), 2),
+                "carbon_footprint": round(float(plan["carbon_footprint"].sum()), 2),
+                "mean_comfort_index": round(float(plan["comfort_index"].mean()), 3),
+                "flat_cost_estimate": round(flat_cost, 2),
+            },
+        }
+
+    except Exception as e:
+        logger.error("Day-ahead schedule failed: %s", e, exc_info=True, extra={"route": "/schedule/day-ahead"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+# --- Monte Carlo Uncertainty ---
+
+class NormalDistribution(BaseModel):
+    dist: Literal["normal"]
+    mean: float
+    std: float = Field(..., ge=0.0)
+
+class UniformDistribution(BaseModel):
+    dist: Literal["uniform"]
+    low: float
+    high: float
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.low > self.high:
+            raise ValueError("low must be <= high")
+        return self
+
+class TriangularDistribution(BaseModel):
+    dist: Literal["triangular"]
+    low: float
+    mode: float
+    high: float
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if not (self.low <= self.mode <= self.high and self.low < self.high):
+            raise ValueError("triangular requires low <= mode <= high and low < high")
+        return self
+
+Distribution = Annotated[
+    Union[NormalDistribution, UniformDistribution, TriangularDistribution],
+    Field(discriminator="dist"),
+]
+
+class UncertaintyRequest(BaseModel):
+    ac_setpoint: Union[Setpoint, Distribution] = Field(..., description="Setpoint in Celsius, fixed or a distribution (draws clipped to 16-32)")
+    reduction_factor: Union[Reduction, Distribution] = Field(default=0.0, description="Load shedding (0-1), fixed or a distribution")
+    base_load_kwh: Optional[Union[confloat(ge=0.0), Distribution]] = Field(default=None, description="Facility load, e.g. occupancy-driven; defaults to BASE_LOAD_KWH")
+    thermal_coeff: Optional[Union[confloat(ge=0.0), Distribution]] = Field(default=None, description="Energy delta per degree C, e.g. weather-driven; defaults to THERMAL_COEFF")
+    carbon_intensity: Optional[Union[confloat(ge=0.0), Distribution]] = Field(default=None, description="Grid kgCO2/kWh; defaults to CARBON_INTENSITY")
+    tariff_inr_per_kwh: Optional[Union[confloat(ge=0.0), Distribution]] = Field(default=None, description="Tariff; defaults to the blended peak/off-peak rate")
+    enable_incentives: bool = Field(default=False, description="Apply DISCOM demand response rebates")
+    samples: int = Field(default=10_000, ge=1, le=uncertainty.MAX_SAMPLES, description="Number of Monte Carlo draws")
+    seed: Optional[int] = Field(default=None, ge=0, description="Seed for reproducible draws; a random one is chosen and returned if omitted")
+    grid: Optional[GridConditions] = Field(default=None, description="Grid readings for policy rules, held for every draw")
+
+class PercentileBand(BaseModel):
+    p5: float
+    p50: float
+    p95: float
+    mean: float
+
+class UncertaintyResponse(BaseModel):
+    samples: int
+    seed: int
+    projected_kwh: PercentileBand
+    cost_estimate: PercentileBand
+    carbon_footprint: PercentileBand
+    comfort_index: PercentileBand
+
+# Request field -> engine.calculate_batch keyword
+UNCERTAIN_INPUTS = {
+    "ac_setpoint": "ac_setpoint",
+    "reduction_factor": "reduction_factor",
+    "base_load_kwh": "base_load",
+    "thermal_coeff": "thermal_coeff",
+    "carbon_intensity": "carbon_intensity",
+    "tariff_inr_per_kwh": "tariff",
+}
+
+@app.post("/simulate/uncertainty", response_model=UncertaintyResponse)
+async def simulate_uncertainty(payload: UncertaintyRequest):
+    """Seeded Monte Carlo over uncertain inputs; returns P5/P50/P95 bands per output."""
+    try:
+        seed = payload.seed if payload.seed is not None else uncertainty.new_seed()
+        logger.info("Processing Monte Carlo run of %d samples (seed %d)", payload.samples, seed, extra={"route": "/simulate/uncertainty"})
+
+        inputs = {}
+        for field, name in UNCERTAIN_INPUTS.items():
+            value = getattr(payload, field)
+            if value is not None:
+                inputs[name] = value.model_dump() if isinstance(value, BaseModel) else value
+
+        signals = payload.grid.model_dump() if payload.grid is not None else None
+        args = (inputs, payload.samples, seed, payload.enable_incentives, uncertainty.SAMPLE_CHUNK, policy_rules, signals)
+        if payload.samples >= OFFLOAD_MIN_ROWS:
+            bands = await compute_pool.run(uncertainty.monte_carlo, *args)
+        else:
+            bands = uncertainty.monte_carlo(*args)
+        _record_hits(bands.pop("rule_hits"))
+        return {"samples": payload.samples, "seed": seed, **bands}
+
+    except Exception as e:
+        logger.error("Uncertainty simulation failed: %s", e, exc_info=True, extra={"route": "/simulate/uncertainty"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+# --- Facility Portfolio ---
+
+class FacilitySpec(BaseModel):
+    facility_id: str = Field(..., min_length=1, max_length=128)
+    base_load_kwh: float = Field(default_factory=lambda: engine.BASE_LOAD_KWH, ge=0.0, description="Daily facility load in kWh")
+    thermal_coeff: float = Field(default=engine.THERMAL_COEFF, ge=0.0, description="Energy delta per degree C above 22C")
+    carbon_intensity: float = Field(default=engine.CARBON_INTENSITY, ge=0.0, description="Grid kgCO2/kWh at the site")
+    tariff_plan: str = Field(default="blended", description="Named tariff calendar plan (see /tariffs)")
+
+class FacilityUpsertRequest(BaseModel):
+    facilities: List[FacilitySpec] = Field(..., min_length=1, max_length=100_000)
+
+class FacilityUpsertResponse(BaseModel):
+    upserted: int
+    count: int
 
+class FacilityList(BaseModel):
+    count: int
+    facilities: List[FacilitySpec]
+
+class PortfolioRequest(BaseModel):
+    ac_setpoint: float = Field(..., ge=16.0, le=32.0, description="Setpoint applied at every site")
+    reduction_factor: float = Field(..., ge=0.0, le=1.0, description="Load shedding applied at every site")
+    enable_incentives: bool = Field(default=False, description="Apply DISCOM demand response rebates at every site")
+    facility_ids: Optional[List[str]] = Field(default=None, min_length=1, description="Restrict the run to these sites; defaults to the whole registry")
+    grid: Optional[GridConditions] = Field(default=None, description="Grid readings tested by policy rules, shared by every site")
+    at: Optional[datetime.datetime] = Field(default=None, description="Local facility time to price each site's tariff plan at; defaults to each plan's average rate")
+
+    @model_validator(mode="after")
+    def check_at(self):
+        if self.at is not None and self.at.tzinfo is not None:
+            raise ValueError("at is local facility time; drop the UTC offset")
+        return self
+
+class FacilityResult(SimulationResponse):
+    facility_id: str
+
+class PortfolioAggregate(BaseModel):
+    facilities: int
+    projected_kwh: float
+    cost_estimate: float
+    carbon_footprint: float
+    mean_comfort_index: float
+    min_comfort_index: float
+    mean_grid_stability_score: float
+
+class PortfolioResponse(BaseModel):
+    results: List[FacilityResult]
+    aggregate: PortfolioAggregate
+
+def _to_registry(spec: FacilitySpec) -> dict:
+    site = spec.model_dump()
+    site["base_load"] = site.pop("base_load_kwh")
+    return site
+
+def _from_registry(site: dict) -> dict:
+    site["base_load_kwh"] = site.pop("base_load")
+    return site
+
+facility_registry = FacilityRegistry()
+
+# Optional seed file: a JSON array of FacilitySpec objects, loaded by every worker
+if os.getenv("FACILITY_REGISTRY_PATH"):
+    with open(os.environ["FACILITY_REGISTRY_PATH"], "rb") as f:
+        _seed = FacilityUpsertRequest.model_validate({"facilities": orjson.loads(f.read())})
+    facility_registry.upsert(_to_registry(spec) for spec in _seed.facilities)
+
+@app.put("/facilities", response_model=FacilityUpsertResponse)
+async def upsert_facilities(payload: FacilityUpsertRequest):
+    """Add or replace sites by facility_id; returns the new registry size."""
+    try:
+        upserted = facility_registry.upsert((_to_registry(spec) for spec in payload.facilities), plans=tariff_calendar)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return {"upserted": upserted, "count": len(facility_registry)}
+
+@app.get("/facilities", response_model=FacilityList)
+async def list_facilities():
+    sites = facility_registry.all()
+    return {"count": len(sites), "facilities": [_from_registry(site) for site in sites]}
+
+@app.get("/facilities/{facility_id}", response_model=FacilitySpec)
+async def get_facility(facility_id: str):
+    site = facility_registry.get(facility_id)
+    if site is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown facility: {facility_id}")
+    return _from_registry(site)
+
+@app.delete("/facilities/{facility_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_facility(facility_id: str):
+    if not facility_registry.remove(facility_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown facility: {facility_id}")
+
+@app.post("/portfolio/calculate", response_model=PortfolioResponse)
+async def calculate_portfolio(payload: PortfolioRequest):
+    """Apply one policy to every registered site in a single vectorized pass."""
+    if payload.at is None:
+        plan_rate = lambda name: _tariff_plan(name).mean_rate
+    else:
+        at = np.datetime64(payload.at, "m")
+        plan_rate = lambda name: float(_tariff_plan(name).rates(at))
+    try:
+        sites = facility_registry.columns(plan_rate, payload.facility_ids)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown facility: {e.args[0]}")
+    if not sites["facility_id"]:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No facilities registered")
+
+    try:
+        ids = sites.pop("facility_id")
+        logger.info("Processing portfolio run over %d facilities", len(ids), extra={"route": "/portfolio/calculate"})
+
+        columns = await _evaluate(
+            sites,
+            payload.grid.model_dump() if payload.grid is not None else None,
+            ac_setpoint=payload.ac_setpoint,
+            reduction_factor=payload.reduction_factor,
+            enable_incentives=payload.enable_incentives,
+            observe_stage=metrics.observe_stage,
+        )
+
+        rows = engine.to_rows(columns)
+        for row, facility_id in zip(rows, ids):
+            row["facility_id"] = facility_id
         return {
-            "projected_kwh": round(float(final_load), 2),
-            "cost_estimate": round(float(final_cost), 2),
-            "carbon_footprint": round(float(final_load * CARBON_INTENSITY), 2),
-            "comfort_index": round(float(comfort_score), 3),
-            "grid_stability_score": round(0.85 + (payload.reduction_factor * 0.15), 3)
+            "results": rows,
+            "aggregate": {
+                "facilities": len(ids),
+                "projected_kwh": round(float(columns["projected_kwh"].sum()), 2),
+                "cost_estimate": round(float(columns["cost_estimate"].sum()), 2),
+                "carbon_footprint": round(float(columns["carbon_footprint"].sum()), 2),
+                "mean_comfort_index": round(float(columns["comfort_index"].mean()), 3),
+                "min_comfort_index": round(float(columns["comfort_index"].min()), 3),
+                "mean_grid_stability_score": round(float(np.mean(columns["grid_stability_score"])), 3),
+            },
         }
 
     except Exception as e:
-        logger.error(f"Calculation failed: {str(e)}", exc_info=True)
+        logger.error("Portfolio calculation failed: %s", e, exc_info=True, extra={"route": "/portfolio/calculate"})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Optimization engine computation error"
-        )
\ No newline at end of file
+        )
+
+# --- Telemetry Baselines ---
+
+TELEMETRY_DIR = os.getenv("TELEMETRY_DIR", "/data/telemetry")
+
+# Keyed by the history file's inode/size/mtime, so a rewritten file is recomputed
+baseline_cache = ResultCache(max_entries=int(os.getenv("BASELINE_CACHE_ENTRIES", "256")))
+
+class DailyEnergy(BaseModel):
+    days: int
+    mean: Optional[float] = None
+    p10: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+
+class LoadCurve(BaseModel):
+    mean: List[Optional[float]]
+    p10: List[Optional[float]]
+    p50: List[Optional[float]]
+    p90: List[Optional[float]]
+
+class TypicalDay(BaseModel):
+    slot_start: List[str]
+    weekday: LoadCurve
+    weekend: LoadCurve
+
+class BaselineResponse(BaseModel):
+    facility_id: str
+    rows: int
+    start: str
+    end: str
+    interval_minutes: int
+    daily_kwh: DailyEnergy
+    typical_day: TypicalDay
+    applied: bool
+
+def _round_curve(curve: dict) -> dict:
+    """kWh arrays to 2-decimal lists, with null for slots that have no readings."""
+    return {
+        name: [None if np.isnan(v) else round(v, 2) for v in values.tolist()]
+        for name, values in curve.items()
+    }
+
+@app.get("/facilities/{facility_id}/baseline", response_model=BaselineResponse)
+async def facility_baseline(facility_id: str, apply: bool = False):
+    """Typical-day load curves and daily kWh percentiles from the facility's history file.
+
+    With `apply=true` the facility's registered base_load_kwh is set to the
+    median daily energy, replacing the constant default.
+    """
+    try:
+        path = baselines.history_path(TELEMETRY_DIR, facility_id)
+        stamp = baselines.file_stamp(path)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No telemetry history for facility: {facility_id}")
+
+    baseline = baseline_cache.get(stamp)
+    if baseline is None:
+        try:
+            logger.info("Computing telemetry baseline for %s", facility_id, extra={"route": "/facilities/{facility_id}/baseline"})
+            raw = await compute_pool.run(baselines.compute_baseline, path)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unusable history file: {e}")
+        except Exception as e:
+            logger.error("Baseline computation failed: %s", e, exc_info=True, extra={"route": "/facilities/{facility_id}/baseline"})
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Optimization engine computation error"
+            )
+        daily = {name: round(value, 2) if name != "days" else value for name, value in raw["daily_kwh"].items()}
+        baseline = raw | {
+            "daily_kwh": daily,
+            "typical_day": {
+                "slot_start": raw["typical_day"]["slot_start"],
+                "weekday": _round_curve(raw["typical_day"]["weekday"]),
+                "weekend": _round_curve(raw["typical_day"]["weekend"]),
+            },
+        }
+        baseline_cache.put(stamp, baseline)
+
+    applied = False
+    if apply:
+        site = facility_registry.get(facility_id)
+        if site is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown facility: {facility_id}")
+        if baseline["daily_kwh"].get("p50") is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="History has no complete days to derive a base load from")
+        facility_registry.upsert([site | {"base_load": baseline["daily_kwh"]["p50"]}])
+        applied = True
+
+    return {"facility_id": facility_id, **baseline, "applied": applied}
+
+# --- Analytic Sensitivity ---
+
+class JacobianRequest(BaseModel):
+    points: List[SimulationRequest] = Field(..., min_length=1, max_length=100_000, description="Operating points to differentiate at")
+    side: Literal["right", "left"] = Field(default="right", description="One-sided derivative reported at kinks: right = increasing the input, left = decreasing it")
+
+class InputPartials(BaseModel):
+    ac_setpoint: float
+    reduction_factor: float
+
+class JacobianPoint(SimulationResponse):
+    partials: Dict[str, InputPartials] = Field(..., description="d output / d input, keyed by output field")
+    kinks: List[str] = Field(..., description="Inputs whose left and right derivatives differ at this point")
+
+class JacobianResponse(BaseModel):
+    side: Literal["right", "left"]
+    results: List[JacobianPoint]
+
+@app.post("/calculate/jacobian", response_model=JacobianResponse)
+async def calculate_jacobian(payload: JacobianRequest):
+    """Outputs plus their analytic partial derivatives w.r.t. ac_setpoint and reduction_factor.
+
+    Values are rounded as in /calculate; derivatives are returned unrounded.
+    Grid readings, live telemetry and policy rules apply as in /calculate,
+    and the derivatives run through the rule rewrites. See sensitivity.py for the one-sided behaviour at kinks.
+    """
+    try:
+        points = payload.points
+        logger.info("Differentiating %d operating points", len(points), extra={"route": "/calculate/jacobian"})
+
+        arrays, signals = _scenario_inputs(points)
+        out = sensitivity.jacobian_batch(**arrays, side=payload.side, policy=policy_rules, signals=signals)
+        _record_hits(out["rule_hits"])
+
+        rows = engine.to_rows(out["values"])
+        partials = {
+            name: [per_input["ac_setpoint"].tolist(), per_input["reduction_factor"].tolist()]
+            for name, per_input in out["partials"].items()
+        }
+        kinks = [out["kinks"][name].tolist() for name in sensitivity.INPUTS]
+        for i, row in enumerate(rows):
+            row["partials"] = {
+                name: {"ac_setpoint": d_ac[i], "reduction_factor": d_red[i]}
+                for name, (d_ac, d_red) in partials.items()
+            }
+            row["kinks"] = [name for name, flags in zip(sensitivity.INPUTS, kinks) if flags[i]]
+        return {"side": payload.side, "results": rows}
+
+    except Exception as e:
+        logger.error("Jacobian calculation failed: %s", e, exc_info=True, extra={"route": "/calculate/jacobian"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+# --- Tariff Calendar ---
+
+HHMM = r"^\d{2}:\d{2}$"
+
+class TariffBand(BaseModel):
+    days: Literal[tuple(tariffs.DAY_GROUPS)] = Field(..., description="Day group or day name; holidays only take 'all' and 'holiday' bands")
+    start: str = Field(..., pattern=HHMM, description="Band start, HH:MM (inclusive)")
+    end: str = Field(..., pattern=HHMM, description="Band end, HH:MM (exclusive, 24:00 = midnight); before start wraps past midnight")
+    rate: float = Field(..., ge=0.0, description="INR/kWh")
+
+class TariffSeason(BaseModel):
+    name: str = Field(..., min_length=1)
+    months: List[conint(ge=1, le=12)] = Field(..., min_length=1)
+    default_rate: Optional[float] = Field(default=None, ge=0.0, description="Defaults to the plan's default_rate")
+    bands: List[TariffBand] = Field(default_factory=list, description="Later bands override earlier ones")
+
+class TariffPlanSpec(BaseModel):
+    name: str = Field(..., min_length=1, max_length=64)
+    default_rate: float = Field(..., ge=0.0, description="INR/kWh outside every band")
+    bands: List[TariffBand] = Field(default_factory=list, description="Bands for months no season claims; later bands override earlier ones")
+    seasons: List[TariffSeason] = Field(default_factory=list)
+    holidays: List[datetime.date] = Field(default_factory=list)
+
+class TariffPlanList(BaseModel):
+    plans: List[TariffPlanSpec]
+
+class TariffRatesRequest(BaseModel):
+    timestamps: List[str] = Field(..., min_length=1, max_length=MAX_SERIES_HOURS * 4, description="Local facility time (ISO 8601, no UTC offset)")
+
+class TariffRatesResponse(BaseModel):
+    plan: str
+    rates: List[float]
+
+def _compile_plan(spec: TariffPlanSpec) -> dict:
+    return spec.model_dump(mode="json", exclude_none=True)
+
+tariff_calendar = tariffs.TariffCalendar(tariffs.builtin_plans())
+
+# Optional seed file: a JSON array of TariffPlanSpec objects, loaded by every worker
+if os.getenv("TARIFF_PLANS_PATH"):
+    with open(os.environ["TARIFF_PLANS_PATH"], "rb") as f:
+        _seed_plans = TariffPlanList.model_validate({"plans": orjson.loads(f.read())})
+    for _spec in _seed_plans.plans:
+        tariff_calendar.put(_compile_plan(_spec))
+
+def _tariff_plan(name: str) -> tariffs.TariffPlan:
+    plan = tariff_calendar.get(name)
+    if plan is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown tariff plan: {name}")
+    return plan
+
+@app.put("/tariffs", response_model=TariffPlanSpec)
+async def upsert_tariff_plan(payload: TariffPlanSpec):
+    """Add or replace a plan by name; it is compiled to its rate table here."""
+    try:
+        plan = tariff_calendar.put(_compile_plan(payload))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return plan.spec
+
+@app.get("/tariffs", response_model=TariffPlanList)
+async def list_tariff_plans():
+    return {"plans": tariff_calendar.specs()}
+
+@app.get("/tariffs/{name}", response_model=TariffPlanSpec)
+async def get_tariff_plan(name: str):
+    return _tariff_plan(name).spec
+
+@app.delete("/tariffs/{name}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_tariff_plan(name: str):
+    if not tariff_calendar.remove(name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown tariff plan: {name}")
+
+@app.post("/tariffs/{name}/rates", response_model=TariffRatesResponse)
+async def resolve_tariff_rates(name: str, payload: TariffRatesRequest):
+    """Rate in effect at each timestamp under the plan."""
+    plan = _tariff_plan(name)
+    timestamps = _parse_hours(payload.timestamps)
+    return {"plan": plan.name, "rates": plan.rates(timestamps).tolist()}
+
+# --- Live Telemetry ---
+
+class TelemetryReading(BaseModel):
+    signal: Literal[tuple(telemetry.SIGNALS)]
+    value: float = Field(..., description="frequency_hz in Hz, voltage_pu per unit, carbon_intensity in kgCO2/kWh, facility_load_kw in kW")
+    timestamp: Optional[datetime.datetime] = Field(default=None, description="ISO 8601 or Unix seconds; naive times are UTC; defaults to receipt")
+
+class TelemetryIngest(BaseModel):
+    readings: List[TelemetryReading] = Field(..., min_length=1, max_length=10_000)
+
+class TelemetryIngestResponse(BaseModel):
+    accepted: int
+    rejected: Dict[str, int] = Field(..., description="Rejected readings by reason: out_of_range, out_of_order, future")
+
+TELEMETRY_READINGS = metrics.REGISTRY.register(metrics.Counter(
+    "gridops_telemetry_readings_total", "Telemetry readings received, by signal and result.", ("signal", "result")))
+
+def _epoch_seconds(timestamp: Optional[datetime.datetime], now: float) -> float:
+    if timestamp is None:
+        return now
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    return timestamp.timestamp()
+
+@app.post("/telemetry", response_model=TelemetryIngestResponse)
+async def ingest_telemetry(payload: TelemetryIngest):
+    """Store grid and facility readings in this worker's ring buffers."""
+    now = time.time()
+    outcome = telemetry_store.ingest(
+        ((r.signal, _epoch_seconds(r.timestamp, now), r.value) for r in payload.readings), now=now
+    )
+    accepted, rejected = 0, {}
+    for signal, counts in outcome.items():
+        for result, count in counts.items():
+            TELEMETRY_READINGS.labels(signal, result).inc(count)
+            if result == "accepted":
+                accepted += count
+            else:
+                rejected[result] = rejected.get(result, 0) + count
+    if rejected:
+        logger.warning("Rejected %d telemetry readings: %s", sum(rejected.values()), rejected, extra={"route": "/telemetry"})
+    return {"accepted": accepted, "rejected": rejected}
+
+@app.get("/telemetry")
+async def telemetry_summary():
+    """Latest value, age and rolling mean/min/max per signal; `live` marks values simulations will use."""
+    return {"signals": telemetry_store.summary()}
+
+# --- Thermal Network ---
+
+class ThermalZone(BaseModel):
+    name: str = Field(..., min_length=1)
+    capacitance_kwh_per_c: float = Field(..., gt=0.0, description="Thermal mass: kWh to move the zone by 1 C")
+    ua_outdoor_kw_per_c: float = Field(..., ge=0.0, description="Envelope conductance to outdoors")
+    cooling_capacity_kw: float = Field(..., ge=0.0, description="Thermal cooling the zone's HVAC can deliver")
+    internal_gain_kw: float = Field(default=0.0, ge=0.0, description="Occupants, lighting and equipment heat")
+
+class ThermalLink(BaseModel):
+    zones: List[str] = Field(..., min_length=2, max_length=2)
+    ua_kw_per_c: float = Field(..., gt=0.0, description="Conductance between the two zones")
+
+class BuildingSpec(BaseModel):
+    name: str = Field(..., min_length=1, max_length=64)
+    cop: float = Field(default=3.0, gt=0.0, description="Cooling kW delivered per electrical kW")
+    other_load_kw: float = Field(default=0.0, ge=0.0, description="Non-HVAC electrical load, shed by reduction_factor")
+    zones: List[ThermalZone] = Field(..., min_length=1, max_length=256)
+    links: List[ThermalLink] = Field(default_factory=list)
+
+class BuildingList(BaseModel):
+    buildings: List[BuildingSpec]
+
+class ThermalSimulationRequest(BaseModel):
+    outdoor_temp_c: List[confloat(ge=-50.0, le=60.0)] = Field(..., min_length=1, max_length=MAX_SERIES_HOURS * 4, description="Outdoor temperature per step")
+    step_minutes: conint(ge=1, le=60) = Field(default=15)
+    ac_setpoint: Union[Setpoint, List[Setpoint]] = Field(..., description="Setpoint in Celsius, constant or one value per step (e.g. pre-cooling)")
+    reduction_factor: Union[Reduction, List[Reduction]] = Field(default=0.0, description="Load shedding (0-1), constant or one value per step")
+    initial_temp_c: Optional[confloat(ge=-50.0, le=60.0)] = Field(default=None, description="Zone temperatures at the start; defaults to the first setpoint")
+    tariff_inr_per_kwh: Optional[Union[confloat(ge=0.0), List[confloat(ge=0.0)]]] = Field(default=None, description="Constant or one value per step; defaults to the blended rate")
+    tariff_plan: Optional[str] = Field(default=None, description="Named tariff calendar plan priced at each step's start; instead of tariff_inr_per_kwh")
+    start: Optional[datetime.datetime] = Field(default=None, description="Local facility time of the first step; required with tariff_plan")
+    enable_incentives: bool = Field(default=False, description="Apply DISCOM demand response rebates")
+    include_series: bool = Field(default=False, description="Also return per-step energy, cost and zone temperatures")
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        steps = len(self.outdoor_temp_c)
+        for name in ("ac_setpoint", "reduction_factor", "tariff_inr_per_kwh"):
+            value = getattr(self, name)
+            if isinstance(value, list) and len(value) != steps:
+                raise ValueError(f"{name} has {len(value)} values but outdoor_temp_c has {steps}")
+        if self.tariff_inr_per_kwh is not None and self.tariff_plan is not None:
+            raise ValueError("Give either tariff_inr_per_kwh or tariff_plan, not both")
+        if self.tariff_plan is not None and self.start is None:
+            raise ValueError("start is required with tariff_plan")
+        if self.start is not None and self.start.tzinfo is not None:
+            raise ValueError("start is local facility time; drop the UTC offset")
+        return self
+
+class ThermalZoneResult(BaseModel):
+    name: str
+    mean_temp_c: float
+    max_temp_c: float
+    hvac_kwh: float
+    comfort_index: float
+
+class ThermalSeries(BaseModel):
+    projected_kwh: List[float]
+    cost_estimate: List[float]
+    zone_temp_c: Dict[str, List[float]]
+
+class ThermalSimulationResponse(SimulationResponse):
+    steps: int
+    zones: List[ThermalZoneResult]
+    series: Optional[ThermalSeries] = None
+
+building_registry = thermal.BuildingRegistry()
+
+def _building(name: str) -> thermal.Building:
+    building = building_registry.get(name)
+    if building is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown building: {name}")
+    return building
+
+@app.put("/buildings", response_model=BuildingSpec)
+async def upsert_building(payload: BuildingSpec):
+    """Add or replace a building; its RC network is compiled here."""
+    try:
+        building = building_registry.put(payload.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return building.spec
+
+@app.get("/buildings", response_model=BuildingList)
+async def list_buildings():
+    return {"buildings": building_registry.specs()}
+
+@app.get("/buildings/{name}", response_model=BuildingSpec)
+async def get_building(name: str):
+    return _building(name).spec
+
+@app.delete("/buildings/{name}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_building(name: str):
+    if not building_registry.remove(name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown building: {name}")
+
+@app.post("/buildings/{name}/simulate", response_model=ThermalSimulationResponse)
+async def simulate_building(name: str, payload: ThermalSimulationRequest):
+    """Step the building's zone temperatures through time and score the run like /calculate."""
+    building = _building(name)
+    steps = len(payload.outdoor_temp_c)
+    step_hours = payload.step_minutes / 60.0
+    tariff = payload.tariff_inr_per_kwh
+    if payload.tariff_plan is not None:
+        step_starts = np.datetime64(payload.start, "m") + np.arange(steps) * payload.step_minutes
+        tariff = _tariff_plan(payload.tariff_plan).rates(step_starts)
+    try:
+        logger.info("Simulating %d zones over %d steps", len(building.zones), steps, extra={"route": "/buildings/{name}/simulate"})
+
+        # Discretize here so a pool worker receives the cached matrices with the building
+        building.discretize(step_hours)
+        args = (
+            building,
+            np.asarray(payload.outdoor_temp_c, dtype=np.float64),
+            np.asarray(payload.ac_setpoint, dtype=np.float64),
+            np.asarray(payload.reduction_factor, dtype=np.float64),
+            step_hours,
+            payload.initial_temp_c,
+            None if tariff is None else np.asarray(tariff, dtype=np.float64),
+            payload.enable_incentives,
+        )
+        if steps * len(building.zones) >= OFFLOAD_MIN_ROWS:
+            run = await compute_pool.run(thermal.simulate, *args)
+        else:
+            run = thermal.simulate(*args)
+
+        totals = run["totals"]
+        temps = run["temperatures"]
+        response = {field: round(totals[field], digits) for field, digits in engine.RESPONSE_PRECISION.items()}
+        response["steps"] = steps
+        response["zones"] = [
+            {
+                "name": zone,
+                "mean_temp_c": round(float(temps[:, i].mean()), 2),
+                "max_temp_c": round(float(temps[:, i].max()), 2),
+                "hvac_kwh": round(float(run["zone_hvac_kwh"][i]), 2),
+                "comfort_index": round(float(run["zone_comfort"][i]), 3),
+            }
+            for i, zone in enumerate(building.zones)
+        ]
+        if payload.include_series:
+            response["series"] = {
+                "projected_kwh": [round(v, 2) for v in run["step_kwh"].tolist()],
+                "cost_estimate": [round(v, 2) for v in run["step_cost"].tolist()],
+                "zone_temp_c": {zone: [round(v, 2) for v in temps[:, i].tolist()] for i, zone in enumerate(building.zones)},
+            }
+        return response
+
+    except Exception as e:
+        logger.error("Thermal simulation failed: %s", e, exc_info=True, extra={"route": "/buildings/{name}/simulate"})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Optimization engine computation error"
+        )
+
+# --- Startup & Readiness ---
+
+STARTUP_PHASE_SECONDS = metrics.REGISTRY.register(metrics.Gauge(
+    "gridops_startup_phase_seconds", "Wall time of each startup phase in this worker.", ["phase"]))
+READY = metrics.REGISTRY.register(metrics.Gauge(
+    "gridops_ready", "1 once warmup has finished and the worker accepts traffic, 0 while starting."))
+
+# Module-level work (model schemas, routes) ends here
+startup.PROFILE.mark("app")
+
+WARMUP_REQUESTS = (
+    ("/calculate", orjson.dumps({"ac_setpoint": 25.0, "reduction_factor": 0.2, "enable_incentives": True})),
+    ("/calculate/batch", orjson.dumps({"scenarios": [{"ac_setpoint": 25.0, "reduction_factor": 0.2}] * 4})),
+)
+
+async def _warmup_request(path: str, body: bytes) -> None:
+    """One POST through the router (not the metrics middleware), answered in-process."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("warmup", 0), "server": ("warmup", 80),
+    }
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await app.router(scope, receive, send)
+    if response.get("status") != 200:
+        raise RuntimeError(f"Warmup request to {path} returned {response.get('status')}")
+
+@app.on_event("startup")
+async def warmup():
+    """Pay for first-call costs (validators, NumPy ufunc dispatch, orjson, routing) before /ready flips."""
+    startup.PROFILE.mark("server")
+    for path, body in WARMUP_REQUESTS:
+        await _warmup_request(path, body)
+    startup.PROFILE.mark("warmup")
+    startup.PROFILE.ready = True
+    READY.set(1)
+    for phase, seconds in startup.PROFILE.phases.items():
+        STARTUP_PHASE_SECONDS.labels(phase).set(seconds)
+    logger.info("Worker ready: %s", startup.PROFILE.as_dict(), extra={"route": "/ready"})
+
+@app.get("/ready")
+async def readiness_probe():
+    """Readiness, unlike /health (liveness): 503 until this worker's warmup has run."""
+    if not startup.PROFILE.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Warming up")
+    return {"status": "ready", "startup": startup.PROFILE.as_dict()}
@@ -0,0 +1,254 @@
+"""Minimal Prometheus instrumentation (text exposition format 0.0.4).
+
+Recording is a plain attribute/list increment with no locks: request
+handlers run on the event loop thread, and under the GIL a rare lost
+increment from a worker thread is an acceptable trade for a hot path that
+costs a few hundred nanoseconds. Cumulative bucket counts and the text
+rendering are only computed when /metrics is scraped.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.routing import BaseRoute, Match
+
+# Latency buckets in seconds: 10us .. 10s
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Child series for these label values (created on first use)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def sync(self, total: float) -> None:
+        """Mirror a counter maintained elsewhere (e.g. ResultCache.hits) at scrape time."""
+        self._children[()].set(total)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].dec(amount)
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # One slot per bucket plus the +Inf overflow; not cumulative
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            counts = list(child.counts)
+            for bound, count in zip(self.upper_bounds + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._callbacks: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        """Run `callback` before each scrape, e.g. to copy external stats into gauges."""
+        self._callbacks.append(callback)
+
+    def render(self) -> str:
+        for callback in self._callbacks:
+            callback()
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    "gridops_requests_total", "HTTP requests handled by the optimizer.", ("route", "method", "status")))
+ERRORS = REGISTRY.register(Counter(
+    "gridops_request_errors_total", "HTTP requests that ended in a 5xx or an unhandled exception.", ("route",)))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "gridops_requests_in_flight", "HTTP requests currently being processed.", ("route",)))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "gridops_request_duration_seconds", "Wall time from request start to the last response byte.", ("route",)))
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "gridops_model_stage_duration_seconds", "Time spent in each calculate_impact model stage.", ("stage",)))
+
+_stage_children: Dict[str, _HistogramValue] = {}
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Stage hook passed to engine.calculate / engine.calculate_batch."""
+    child = _stage_children.get(stage)
+    if child is None:
+        child = _stage_children[stage] = STAGE_DURATION.labels(stage)
+    child.observe(seconds)
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware recording request counts, errors, in-flight and latency.
+
+    Routes are labelled by their declared path, so /tariffs/tou counts
+    under "/tariffs/{name}"; anything else (404s, probes for random URLs) is
+    folded into "other" to keep label cardinality fixed.
+    """
+
+    def __init__(self, app, routes: Optional[Callable[[], Iterable[BaseRoute]]] = None):
+        self.app = app
+        self._routes = routes
+        self._static: Optional[frozenset] = None
+        self._templated: Tuple[BaseRoute, ...] = ()
+
+    def _route_label(self, scope) -> str:
+        if self._static is None:
+            routes = list(self._routes()) if self._routes else []
+            self._static = frozenset(route.path for route in routes if "{" not in route.path)
+            self._templated = tuple(route for route in routes if "{" in route.path)
+        path = scope["path"]
+        if path in self._static:
+            return path
+        for route in self._templated:
+            # PARTIAL is a path match with the wrong method (a 405), still that route
+            match, _ = route.matches(scope)
+            if match is not Match.NONE:
+                return route.path
+        return "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route_label(scope)
+        in_flight = IN_FLIGHT.labels(route)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            REQUEST_DURATION.labels(route).observe(time.perf_counter() - start)
+            REQUESTS.labels(route, scope["method"], str(status_code)).inc()
+            if status_code >= 500:
+                ERRORS.labels(route).inc()
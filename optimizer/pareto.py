@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+import numpy as np
+
+from rules import RulePipeline, evaluate
+
+
+def pareto_front(objectives: np.ndarray) -> np.ndarray:
+    """Indices of the non-dominated rows of an (n, k) objective matrix.
+
+    Every column is minimised (negate a column to maximise it). Rows with
+    identical objective vectors are collapsed to the first one. Supports
+    k = 2 and k = 3 in O(n log n): both start from a lexicographic sort,
+    the 2-D case then keeps a running minimum, the 3-D case a staircase of
+    the (2nd, 3rd) objectives (Kung et al.). Indices come back ordered by
+    the first objective.
+    """
+    objectives = np.asarray(objectives, dtype=np.float64)
+    if objectives.ndim != 2 or objectives.shape[1] not in (2, 3):
+        raise ValueError("pareto_front expects an (n, 2) or (n, 3) array")
+    if objectives.shape[0] == 0:
+        return np.empty(0, dtype=np.intp)
+
+    # np.lexsort treats the last key as primary
+    order = np.lexsort(objectives.T[::-1])
+    ranked = objectives[order]
+
+    if ranked.shape[1] == 2:
+        second = ranked[:, 1]
+        best_so_far = np.minimum.accumulate(second)
+        keep = np.empty(len(second), dtype=bool)
+        keep[0] = True
+        keep[1:] = second[1:] < best_so_far[:-1]
+        return order[keep]
+
+    # Staircase over (b, c): b strictly increasing, c strictly decreasing
+    stair_b, stair_c = [], []
+    keep = []
+    for idx, (_, b, c) in zip(order.tolist(), ranked.tolist()):
+        pos = bisect_right(stair_b, b)
+        if pos and stair_c[pos - 1] <= c:
+            continue
+        # Drop steps the new point covers in the (b, c) projection
+        start, end = bisect_left(stair_b, b), pos
+        while end < len(stair_b) and stair_c[end] >= c:
+            end += 1
+        stair_b[start:end] = [b]
+        stair_c[start:end] = [c]
+        keep.append(idx)
+    return np.asarray(keep, dtype=np.intp)
+
+
+def sweep_frontier(
+    setpoints: np.ndarray,
+    reductions: np.ndarray,
+    enable_incentives: bool,
+    include_carbon: bool = False,
+    policy: Optional[RulePipeline] = None,
+    signals: Optional[dict] = None,
+    inputs: Optional[dict] = None,
+) -> dict:
+    """Evaluate the setpoint x reduction grid and keep its Pareto frontier.
+
+    Minimises cost and maximises comfort (optionally also minimises carbon).
+    With a rule `policy`, grid points are scored after its overrides, under
+    the given grid `signals`; `inputs` are scalar model inputs (e.g. live
+    carbon_intensity) held for the whole grid. The frontier still reports
+    the requested inputs. Returns the grid size, the frontier's inputs and
+    result columns, and per-rule hit counts; module-level so the compute
+    pool can run it in a child process.
+    """
+    grid_setpoints, grid_reductions = np.meshgrid(setpoints, reductions, indexing="ij")
+    grid_setpoints, grid_reductions = grid_setpoints.ravel(), grid_reductions.ravel()
+    columns, hits = evaluate(
+        policy or RulePipeline(),
+        {"ac_setpoint": grid_setpoints, "reduction_factor": grid_reductions},
+        signals,
+        enable_incentives=enable_incentives,
+        **(inputs or {}),
+    )
+
+    objectives = [columns["cost_estimate"], -columns["comfort_index"]]
+    if include_carbon:
+        objectives.append(columns["carbon_footprint"])
+    front = pareto_front(np.column_stack(objectives))
+
+    return {
+        "grid_size": int(grid_setpoints.size),
+        "ac_setpoint": grid_setpoints[front],
+        "reduction_factor": grid_reductions[front],
+        "columns": {name: values[front] for name, values in columns.items()},
+        "rule_hits": hits,
+    }
@@ -0,0 +1,299 @@
+"""Declarative override rules, compiled to NumPy masks.
+
+Grid-protection and policy features (frequency-emergency shedding, voltage
+trips, carbon-triggered shedding, maintenance shutdowns, power-factor
+penalties, ...) are data, not branches in the model:
+
+    {
+        "name": "frequency-emergency",
+        "priority": 100,
+        "when": [{"field": "frequency_hz", "op": "lt", "value": 49.7}],
+        "then": [{"target": "reduction_factor", "op": "at_least", "value": 0.3}]
+    }
+
+`when` clauses are ANDed (an empty list always matches). A clause may test
+a grid signal (SIGNALS, nominal defaults when the caller has no reading) or
+a model input. Conditions are always evaluated on the inputs as supplied,
+before any rule has rewritten them, so whether a rule fires never depends
+on the order the rules run in.
+
+`then` actions rewrite a model input before evaluation (INPUT_TARGETS) or a
+result column after it (OUTPUT_TARGETS) with one of ACTIONS. Rules run in
+ascending priority, ties in declaration order, so when two rules touch the
+same target the higher-priority rule acts last: its `set` wins and its
+bounds are applied on top. Rewritten values are clipped to the target's
+valid range.
+
+Each rule becomes one boolean mask per call and each action one np.where,
+so batches, sweeps and time series all pay the same vectorized cost with no
+per-row Python branching.
+"""
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import engine
+
+# Grid signals a condition may test, with the nominal reading used when absent
+SIGNALS = {
+    "frequency_hz": 50.0,
+    "voltage_pu": 1.0,
+    "power_factor": 1.0,
+    "maintenance": 0.0,
+}
+
+# Rewritable model inputs and result columns, with the range they are clipped to
+INPUT_TARGETS = {
+    "ac_setpoint": (16.0, 32.0),
+    "reduction_factor": (0.0, 1.0),
+    "base_load": (0.0, np.inf),
+    "tariff": (0.0, np.inf),
+    "dr_rebate": (0.0, np.inf),
+    "thermal_coeff": (0.0, np.inf),
+    "carbon_intensity": (0.0, np.inf),
+}
+OUTPUT_TARGETS = {
+    "projected_kwh": (0.0, np.inf),
+    "cost_estimate": (0.0, np.inf),
+    "carbon_footprint": (0.0, np.inf),
+    "comfort_index": (0.1, 1.0),
+    "grid_stability_score": (0.0, 1.0),
+}
+
+CONDITION_FIELDS = (*SIGNALS, *INPUT_TARGETS, "enable_incentives")
+
+COMPARISONS = {
+    "lt": np.less,
+    "le": np.less_equal,
+    "gt": np.greater,
+    "ge": np.greater_equal,
+    "eq": np.equal,
+    "ne": np.not_equal,
+}
+
+# (current, value) -> rewritten value
+ACTIONS = {
+    "set": lambda current, value: np.full_like(current, value),
+    "at_least": np.maximum,
+    "at_most": np.minimum,
+    "scale": np.multiply,
+    "add": np.add,
+}
+
+
+def _action_slope(op: str, current: np.ndarray, value: float, side: str) -> np.ndarray:
+    """d action(current, value) / d current, one-sided where a bound is exactly met."""
+    if op == "set":
+        return np.zeros_like(current)
+    if op == "scale":
+        return np.full_like(current, value)
+    if op == "add":
+        return np.ones_like(current)
+    # at_least = max(current, value), at_most = min(current, value)
+    free = current > value if op == "at_least" else current < value
+    leaves_bound = "right" if op == "at_least" else "left"
+    return (free | ((current == value) & (side == leaves_bound))).astype(np.float64)
+
+
+def _clip_slope(values: np.ndarray, low: float, high: float, side: str) -> np.ndarray:
+    """d clip(values, low, high) / d values, one-sided on the bounds."""
+    inside = (values > low) & (values < high)
+    if side == "right":
+        inside |= (values == low) & (low < high)
+    else:
+        inside |= (values == high) & (low < high)
+    return inside.astype(np.float64)
+
+
+class Rule(NamedTuple):
+    name: str
+    priority: int
+    when: Tuple[Tuple[str, str, float], ...]
+    then: Tuple[Tuple[str, str, float], ...]
+
+
+def _input_default(name: str) -> Any:
+    """Value calculate_batch uses for an input nobody passed (current module constants)."""
+    return {
+        "base_load": engine.BASE_LOAD_KWH,
+        "tariff": (engine.PEAK_TARIFF * 0.6) + (engine.OFF_PEAK_TARIFF * 0.4),
+        "dr_rebate": engine.DR_REBATE_INR,
+        "thermal_coeff": engine.THERMAL_COEFF,
+        "carbon_intensity": engine.CARBON_INTENSITY,
+        "reduction_factor": 0.0,
+        "enable_incentives": False,
+    }[name]
+
+
+def compile_rule(spec: Mapping[str, Any]) -> Rule:
+    """Validate one rule spec; raises ValueError naming the offending part."""
+    name = spec.get("name")
+    if not name:
+        raise ValueError("Every rule needs a name")
+    when = []
+    for clause in spec.get("when", ()):
+        if clause["field"] not in CONDITION_FIELDS:
+            raise ValueError(f"Rule {name!r}: unknown condition field {clause['field']!r}")
+        if clause["op"] not in COMPARISONS:
+            raise ValueError(f"Rule {name!r}: unknown comparison {clause['op']!r}")
+        when.append((clause["field"], clause["op"], float(clause["value"])))
+    then = []
+    for action in spec.get("then", ()):
+        if action["target"] not in INPUT_TARGETS and action["target"] not in OUTPUT_TARGETS:
+            raise ValueError(f"Rule {name!r}: unknown target {action['target']!r}")
+        if action["op"] not in ACTIONS:
+            raise ValueError(f"Rule {name!r}: unknown action {action['op']!r}")
+        then.append((action["target"], action["op"], float(action["value"])))
+    if not then:
+        raise ValueError(f"Rule {name!r} has no actions")
+    return Rule(str(name), int(spec.get("priority", 0)), tuple(when), tuple(then))
+
+
+class RulePipeline:
+    """An ordered, immutable rule set; cheap to pickle into the compute pool."""
+
+    def __init__(self, specs: Iterable[Mapping[str, Any]] = ()):
+        rules = [compile_rule(spec) for spec in specs]
+        names = [rule.name for rule in rules]
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate rule names: {', '.join(duplicates)}")
+        # sorted() is stable, so equal priorities keep declaration order
+        self.rules: Tuple[Rule, ...] = tuple(sorted(rules, key=lambda rule: rule.priority))
+        self._has_outputs = any(target in OUTPUT_TARGETS for rule in self.rules for target, _, _ in rule.then)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @property
+    def fingerprint(self) -> tuple:
+        """Changes whenever the rule set does (part of the result cache version)."""
+        return self.rules
+
+    def specs(self) -> List[dict]:
+        return [
+            {
+                "name": rule.name,
+                "priority": rule.priority,
+                "when": [{"field": f, "op": op, "value": v} for f, op, v in rule.when],
+                "then": [{"target": t, "op": op, "value": v} for t, op, v in rule.then],
+            }
+            for rule in self.rules
+        ]
+
+    def _masks(self, fields: Dict[str, Any], rows: int) -> List[np.ndarray]:
+        masks = []
+        for rule in self.rules:
+            mask = np.ones(rows, dtype=bool)
+            for field, op, value in rule.when:
+                mask &= COMPARISONS[op](fields[field], value)
+            masks.append(mask)
+        return masks
+
+    def apply_inputs(
+        self,
+        arrays: Dict[str, np.ndarray],
+        kwargs: Dict[str, Any],
+        signals: Optional[Mapping[str, Any]] = None,
+        rows: Optional[int] = None,
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, Any], List[np.ndarray]]:
+        """Rewrite calculate_batch inputs; returns (arrays, kwargs, per-rule masks).
+
+        `arrays` are row-aligned inputs and `kwargs` scalar ones (None means
+        the model default), split as compute_pool.calculate_batch takes them.
+        A targeted input that was a scalar comes back as a full-length array.
+        """
+        if rows is None:
+            rows = len(next(iter(arrays.values())))
+        if not self.rules:
+            return arrays, kwargs, []
+        arrays, kwargs = dict(arrays), dict(kwargs)
+
+        def column(name: str) -> np.ndarray:
+            value = arrays.get(name, kwargs.get(name))
+            if value is None:
+                value = _input_default(name)
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (rows,))
+
+        signals = signals or {}
+        fields = {name: np.broadcast_to(np.asarray(signals.get(name, nominal), dtype=np.float64), (rows,)) for name, nominal in SIGNALS.items()}
+        fields.update((name, column(name)) for name in INPUT_TARGETS)
+        fields["enable_incentives"] = column("enable_incentives")
+        masks = self._masks(fields, rows)
+
+        touched = set()
+        for rule, mask in zip(self.rules, masks):
+            if not mask.any():
+                continue
+            for target, op, value in rule.then:
+                if target in INPUT_TARGETS:
+                    current = arrays[target] if target in touched else column(target)
+                    arrays[target] = np.where(mask, ACTIONS[op](current, value), current)
+                    kwargs.pop(target, None)
+                    touched.add(target)
+        for target in touched:
+            arrays[target] = np.clip(arrays[target], *INPUT_TARGETS[target])
+        return arrays, kwargs, masks
+
+    def apply_outputs(self, columns: Dict[str, np.ndarray], masks: List[np.ndarray]) -> Dict[str, np.ndarray]:
+        """Rewrite result columns with the masks apply_inputs() returned."""
+        if not self._has_outputs:
+            return columns
+        columns = dict(columns)
+        touched = set()
+        for rule, mask in zip(self.rules, masks):
+            if not mask.any():
+                continue
+            for target, op, value in rule.then:
+                if target in OUTPUT_TARGETS:
+                    current = np.broadcast_to(columns[target], mask.shape)
+                    columns[target] = np.where(mask, ACTIONS[op](current, value), current)
+                    touched.add(target)
+        for target in touched:
+            columns[target] = np.clip(columns[target], *OUTPUT_TARGETS[target])
+        return columns
+
+    def _slopes(self, columns: Dict[str, np.ndarray], masks: List[np.ndarray], ranges: Dict[str, tuple], side: str) -> Dict[str, np.ndarray]:
+        """d(rewritten column)/d(column) for every column in `ranges` a firing rule targets."""
+        slopes: Dict[str, np.ndarray] = {}
+        current = dict(columns)
+        for rule, mask in zip(self.rules, masks):
+            if not mask.any():
+                continue
+            for target, op, value in rule.then:
+                if target in ranges:
+                    before = current[target]
+                    slope = slopes.get(target, np.ones(mask.shape))
+                    slopes[target] = np.where(mask, slope * _action_slope(op, before, value, side), slope)
+                    current[target] = np.where(mask, ACTIONS[op](before, value), before)
+        for target, slope in slopes.items():
+            slopes[target] = slope * _clip_slope(current[target], *ranges[target], side)
+        return slopes
+
+    def input_slopes(self, arrays: Dict[str, np.ndarray], masks: List[np.ndarray], side: str = "right") -> Dict[str, np.ndarray]:
+        """Per-row d(rewritten input)/d(input) for the row-aligned `arrays` apply_inputs() was given.
+
+        Conditions count as fixed at each row, so this is the derivative of
+        the branch the rules took there. Inputs no firing rule targets are
+        left out (slope 1).
+        """
+        ranges = {name: INPUT_TARGETS[name] for name in arrays if name in INPUT_TARGETS}
+        return self._slopes({name: np.asarray(arrays[name], dtype=np.float64) for name in ranges}, masks, ranges, side)
+
+    def output_slopes(self, columns: Dict[str, np.ndarray], masks: List[np.ndarray], side: str = "right") -> Dict[str, np.ndarray]:
+        """Per-row d(rewritten result)/d(model result) for the columns apply_outputs() rewrites."""
+        if not self._has_outputs:
+            return {}
+        rows = masks[0].shape
+        return self._slopes({name: np.broadcast_to(columns[name], rows) for name in OUTPUT_TARGETS}, masks, OUTPUT_TARGETS, side)
+
+    def hits(self, masks: List[np.ndarray]) -> Dict[str, int]:
+        """Rows each rule fired on."""
+        return {rule.name: int(np.count_nonzero(mask)) for rule, mask in zip(self.rules, masks)}
+
+
+def evaluate(pipeline: RulePipeline, arrays: Dict[str, np.ndarray], signals=None, **kwargs) -> Tuple[Dict[str, np.ndarray], Dict[str, int]]:
+    """engine.calculate_batch with the pipeline's overrides; returns (columns, hits)."""
+    arrays, kwargs, masks = pipeline.apply_inputs(arrays, kwargs, signals)
+    columns = engine.calculate_batch(**arrays, **kwargs)
+    return pipeline.apply_outputs(columns, masks), pipeline.hits(masks)
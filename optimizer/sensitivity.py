@@ -0,0 +1,156 @@
+"""Analytic partial derivatives of the facility model.
+
+For every operating point, the derivatives of the /calculate outputs with
+respect to ac_setpoint and reduction_factor are computed in closed form
+alongside the values. That replaces the 2N finite-difference calls an
+external optimizer would otherwise make per step.
+
+The model is piecewise smooth. All of its kinks have the form max(0, g):
+the 22C thermal baseline, the 24C and 0.15 comfort thresholds, the
+non-negative load and cost, and the 0.1 comfort floor. Away from a kink,
+the derivative is simply g'. Exactly on a kink (g == 0) the two one-sided
+derivatives differ:
+
+    right (increasing the input):  max(0, g')
+    left  (decreasing the input):  min(0, g')
+
+Both sides are evaluated. `side` picks which one is reported, and `kinks`
+flags the points where the two differ for some output.
+
+With a rule pipeline, the derivatives are those of the model /calculate
+serves: the chain rule runs through each input rewrite (a `set` or a
+binding bound zeroes the slope, `scale` multiplies it) and each output
+rewrite. Rule conditions are held fixed at each point.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+import engine
+from rules import RulePipeline
+
+INPUTS = ("ac_setpoint", "reduction_factor")
+OUTPUTS = tuple(engine.RESPONSE_PRECISION)
+SIDES = ("right", "left")
+
+
+def _relu_slope(g: np.ndarray, dg: np.ndarray, side: str) -> np.ndarray:
+    """One-sided derivative of max(0, g) given the matching one-sided g'."""
+    on_kink = np.maximum(0.0, dg) if side == "right" else np.minimum(0.0, dg)
+    return np.where(g > 0.0, dg, np.where(g < 0.0, 0.0, on_kink))
+
+
+def _partials(
+    ac_setpoint,
+    reduction_factor,
+    enable_incentives,
+    side: str,
+    base_load=None,
+    tariff=None,
+    dr_rebate=None,
+    thermal_coeff=None,
+    carbon_intensity=None,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """{output: {input: d output / d input}} for one side; None inputs take the calculate_batch defaults."""
+    base_load = engine.BASE_LOAD_KWH if base_load is None else base_load
+    tariff = (engine.PEAK_TARIFF * 0.6) + (engine.OFF_PEAK_TARIFF * 0.4) if tariff is None else tariff
+    rebate = np.where(enable_incentives, engine.DR_REBATE_INR if dr_rebate is None else dr_rebate, 0.0)
+    thermal_coeff = engine.THERMAL_COEFF if thermal_coeff is None else thermal_coeff
+    carbon_intensity = engine.CARBON_INTENSITY if carbon_intensity is None else carbon_intensity
+    ones = np.ones_like(ac_setpoint)
+    zeros = np.zeros_like(ac_setpoint)
+
+    # Each input is perturbed on its own, so every chain starts from the
+    # unit vector (d ac/d input, d reduction/d input)
+    out = {name: {} for name in OUTPUTS}
+    for wrt, (d_ac, d_red) in zip(INPUTS, ((ones, zeros), (zeros, ones))):
+        # 1. Thermal: tanh(k * max(0, ac - 22))
+        delta_t = np.maximum(0.0, ac_setpoint - 22.0)
+        d_delta = _relu_slope(ac_setpoint - 22.0, d_ac, side)
+        savings_pct = np.tanh(delta_t * thermal_coeff)
+        d_savings_pct = thermal_coeff * (1.0 - savings_pct ** 2) * d_delta
+
+        # 2. Load: max(0, B * (1 - pct - reduction))
+        load_arg = base_load - base_load * savings_pct - base_load * reduction_factor
+        d_load = _relu_slope(load_arg, -base_load * (d_savings_pct + d_red), side)
+        load = np.maximum(0.0, load_arg)
+
+        # 3. Cost: max(0, load * tariff - rebate)
+        d_cost = _relu_slope(load * tariff - rebate, d_load * tariff, side)
+
+        # 4. Comfort: max(0.1, 1 - 0.08 * max(0, ac - 24)^1.5 - 2.5 * max(0, reduction - 0.15))
+        heat_excess = np.maximum(0.0, ac_setpoint - 24.0)
+        d_heat = 0.12 * np.sqrt(heat_excess) * _relu_slope(ac_setpoint - 24.0, d_ac, side)
+        shed_excess = np.maximum(0.0, reduction_factor - 0.15)
+        d_shed = 2.5 * _relu_slope(reduction_factor - 0.15, d_red, side)
+        penalty = 0.08 * heat_excess ** 1.5 + 2.5 * shed_excess
+        d_comfort = _relu_slope((1.0 - penalty) - 0.1, -(d_heat + d_shed), side)
+
+        out["projected_kwh"][wrt] = d_load
+        out["cost_estimate"][wrt] = d_cost
+        out["carbon_footprint"][wrt] = d_load * carbon_intensity
+        out["comfort_index"][wrt] = d_comfort
+        out["grid_stability_score"][wrt] = 0.15 * d_red
+    return out
+
+
+def _chained(policy: RulePipeline, arrays: dict, rewritten: dict, model: dict, masks, side: str) -> Dict[str, Dict[str, np.ndarray]]:
+    """Partials for one side, through the policy's input and output rewrites."""
+    partials = _partials(
+        rewritten.pop("ac_setpoint"), rewritten.pop("reduction_factor"), rewritten.pop("enable_incentives"), side, **rewritten
+    )
+    input_slopes = policy.input_slopes(arrays, masks, side)
+    output_slopes = policy.output_slopes(model, masks, side)
+    for name, per_input in partials.items():
+        for wrt in INPUTS:
+            per_input[wrt] = per_input[wrt] * input_slopes.get(wrt, 1.0) * output_slopes.get(name, 1.0)
+    return partials
+
+
+def jacobian_batch(
+    ac_setpoint,
+    reduction_factor,
+    enable_incentives=False,
+    side: str = "right",
+    policy: Optional[RulePipeline] = None,
+    signals: Optional[dict] = None,
+    **inputs,
+) -> dict:
+    """Values, one-sided partial derivatives and kink flags for N operating points.
+
+    `inputs` are further calculate_batch inputs (base_load, carbon_intensity,
+    ...), scalars or per-point arrays. With a rule `policy` the model is
+    evaluated under its overrides and the given grid `signals`, as
+    rules.evaluate() does.
+
+    Returns {"values": result columns, "partials": {output: {input: array}},
+    "kinks": {input: bool array}, "rule_hits": {rule: rows}}. A kink flag is
+    set when the left and right derivatives with respect to that input
+    differ for any output.
+    """
+    if side not in SIDES:
+        raise ValueError(f"side must be one of {SIDES}, got {side!r}")
+    ac_setpoint, reduction_factor, enable_incentives = np.broadcast_arrays(
+        np.asarray(ac_setpoint, dtype=np.float64),
+        np.asarray(reduction_factor, dtype=np.float64),
+        np.asarray(enable_incentives, dtype=bool),
+    )
+    policy = policy or RulePipeline()
+    arrays = {"ac_setpoint": ac_setpoint, "reduction_factor": reduction_factor, "enable_incentives": enable_incentives}
+    arrays.update((name, np.asarray(value, dtype=np.float64)) for name, value in inputs.items() if value is not None and np.ndim(value))
+    kwargs = {name: value for name, value in inputs.items() if value is None or not np.ndim(value)}
+    rewritten, rewritten_kwargs, masks = policy.apply_inputs(arrays, kwargs, signals)
+    rewritten = {**rewritten, **rewritten_kwargs}
+    model = engine.calculate_batch(**rewritten)
+    values = policy.apply_outputs(model, masks)
+    right = _chained(policy, arrays, dict(rewritten), model, masks, "right")
+    left = _chained(policy, arrays, dict(rewritten), model, masks, "left")
+
+    kinks = {
+        wrt: np.logical_or.reduce([right[name][wrt] != left[name][wrt] for name in OUTPUTS])
+        for wrt in INPUTS
+    }
+    # Adding 0.0 normalizes the -0.0 left by negated zero slopes
+    chosen = right if side == "right" else left
+    partials = {name: {wrt: d + 0.0 for wrt, d in per_input.items()} for name, per_input in chosen.items()}
+    return {"values": values, "partials": partials, "kinks": kinks, "rule_hits": policy.hits(masks)}
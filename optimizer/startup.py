@@ -0,0 +1,84 @@
+"""Startup profiling and readiness state for the optimizer.
+
+main.py imports this module first, so PROFILE's clock starts before
+FastAPI, Pydantic and NumPy load. main.py then marks each phase as it
+completes:
+
+    imports   module imports (FastAPI, Pydantic, NumPy, engine, ...)
+    app       Pydantic model and route definitions (schema compilation)
+    server    from the end of main.py until the ASGI server runs startup hooks
+    warmup    in-process requests through calculate_impact and the batch path
+
+PROFILE.ready only flips after warmup; the /ready probe reports it. For a
+per-module breakdown of the import phase run
+
+    python startup.py            # slowest modules under `import main`
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)$")
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+
+    def mark(self, phase: str) -> float:
+        """Record the time since the previous mark as `phase`; returns its seconds."""
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+        return self.phases[phase]
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "phases_seconds": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "total_seconds": round(self._last - self.started, 4),
+        }
+
+
+PROFILE = StartupProfile()
+
+
+def import_profile(module: str = "main", cwd: Optional[str] = None) -> dict:
+    """Import `module` in a fresh interpreter under -X importtime.
+
+    Returns the subprocess wall time (interpreter start included) and one
+    (module, self_us, cumulative_us) entry per imported module.
+    """
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - started
+    modules: List[tuple] = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append((match.group(3), int(match.group(1)), int(match.group(2))))
+    return {"wall_seconds": wall, "modules": modules}
+
+
+def main(top: int = 25) -> None:
+    profile = import_profile()
+    # Packages only; submodules are already inside their package's cumulative time
+    top_level = [entry for entry in profile["modules"] if "." not in entry[0]]
+    print(f"python -c 'import main': {profile['wall_seconds'] * 1000:.0f} ms wall\n")
+    print(f"{'module':<40} {'self ms':>9} {'cumulative ms':>14}")
+    for name, self_us, cumulative_us in sorted(top_level, key=lambda e: e[2], reverse=True)[:top]:
+        print(f"{name:<40} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
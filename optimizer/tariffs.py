@@ -0,0 +1,179 @@
+"""Tariff calendar: named time-of-use plans compiled to rate lookup tables.
+
+A plan spec is plain data:
+
+    {
+        "name": "delhi-tou",
+        "default_rate": 8.5,
+        "bands": [{"days": "weekday", "start": "10:00", "end": "22:00", "rate": 12.5}],
+        "seasons": [
+            {"name": "summer", "months": [4, 5, 6, 7, 8, 9], "default_rate": 9.0,
+             "bands": [{"days": "all", "start": "14:00", "end": "18:00", "rate": 14.0}]}
+        ],
+        "holidays": ["2025-01-26", "2025-08-15"]
+    }
+
+Top-level `default_rate`/`bands` apply to every month that no season
+claims; a season without its own default_rate uses the plan's. `days` is
+one of DAY_GROUPS or a day name ("mon" .. "sun"). A band covers
+[start, end); end "24:00" means midnight, and a band whose end is before
+its start wraps past midnight (both parts on the listed days). Later bands
+override earlier ones where they overlap. Holidays only take "all" and
+"holiday" bands, so a plan without holiday bands prices holidays at the
+default rate.
+
+TariffPlan() compiles a spec into one flat float64 table with an entry for
+every (season, day slot, minute) triple. The day slots are Monday..Sunday
+plus one holiday slot, so the table holds 11520 rates per season.
+TariffPlan.rates() maps a whole datetime64 array to table offsets with
+integer arithmetic and one searchsorted for holidays, then reads every
+rate with a single np.take: ~1 ms for a year of hourly timestamps, a few
+tens of ms for a year at minute resolution. Snapshot runs that have no
+timestamp use TariffPlan.mean_rate, the plan's time-weighted average.
+"""
+import re
+import threading
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+import engine
+
+MINUTES_PER_DAY = 1440
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+HOLIDAY_SLOT = len(DAY_NAMES)
+DAY_SLOTS = HOLIDAY_SLOT + 1
+SEASON_SIZE = DAY_SLOTS * MINUTES_PER_DAY
+# Non-leap year
+MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+DAY_GROUPS = {
+    "all": tuple(range(DAY_SLOTS)),
+    "weekday": (0, 1, 2, 3, 4),
+    "weekend": (5, 6),
+    "holiday": (HOLIDAY_SLOT,),
+    **{name: (i,) for i, name in enumerate(DAY_NAMES)},
+}
+
+_CLOCK = re.compile(r"^([01]\d|2[0-4]):([0-5]\d)$")
+
+
+def _minute_of_day(value: str) -> int:
+    match = _CLOCK.match(value)
+    minute = int(match.group(1)) * 60 + int(match.group(2)) if match else -1
+    if not 0 <= minute <= MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time {value!r}; expected HH:MM between 00:00 and 24:00")
+    return minute
+
+
+def _fill_bands(table: np.ndarray, bands: List[Mapping[str, Any]], plan: str) -> None:
+    """Write bands into one season's (DAY_SLOTS, MINUTES_PER_DAY) table, in order."""
+    for band in bands:
+        if band["days"] not in DAY_GROUPS:
+            raise ValueError(f"Plan {plan!r}: unknown days {band['days']!r}; use one of {', '.join(DAY_GROUPS)}")
+        slots = list(DAY_GROUPS[band["days"]])
+        start, end = _minute_of_day(band["start"]), _minute_of_day(band["end"])
+        rate = float(band["rate"])
+        if rate < 0:
+            raise ValueError(f"Plan {plan!r}: rates must be >= 0")
+        if start < end:
+            table[slots, start:end] = rate
+        elif start > end:
+            # Wraps past midnight, e.g. 22:00-06:00
+            table[slots, start:] = rate
+            table[slots, :end] = rate
+        else:
+            raise ValueError(f"Plan {plan!r}: band {band['start']}-{band['end']} is empty")
+
+
+class TariffPlan:
+    """A compiled plan: resolves datetime64 timestamps to INR/kWh."""
+
+    def __init__(self, spec: Mapping[str, Any]):
+        name = spec.get("name")
+        if not name:
+            raise ValueError("Every tariff plan needs a name")
+        self.name = str(name)
+        self.spec = dict(spec)
+
+        default_rate = float(spec["default_rate"])
+        seasons = [{"name": "base", "months": (), "default_rate": default_rate, "bands": spec.get("bands", ())}]
+        seasons.extend(spec.get("seasons", ()))
+
+        # Month (0 = January) -> season index; unclaimed months use the base season
+        self.month_season = np.zeros(12, dtype=np.intp)
+        claimed = set()
+        table = np.empty((len(seasons), DAY_SLOTS, MINUTES_PER_DAY))
+        for index, season in enumerate(seasons):
+            for month in season["months"]:
+                if not 1 <= month <= 12 or month in claimed:
+                    raise ValueError(f"Plan {self.name!r}: month {month} is invalid or in two seasons")
+                claimed.add(month)
+                self.month_season[month - 1] = index
+            table[index] = float(season.get("default_rate", default_rate))
+            _fill_bands(table[index], season.get("bands", ()), self.name)
+        if (table < 0).any():
+            raise ValueError(f"Plan {self.name!r}: rates must be >= 0")
+        self.table = table.ravel()
+        # Ordinary weeks only: holidays are too few to move the average
+        weekly = table[:, :HOLIDAY_SLOT].mean(axis=(1, 2))
+        self.mean_rate = float(weekly[self.month_season] @ MONTH_DAYS / MONTH_DAYS.sum())
+        self.holidays = np.unique(np.array(spec.get("holidays", ()), dtype="datetime64[D]").astype(np.int64))
+
+    def rates(self, timestamps: np.ndarray) -> np.ndarray:
+        """INR/kWh at each timestamp (local facility time, any datetime64 unit)."""
+        minutes = np.asarray(timestamps).astype("datetime64[m]").astype(np.int64)
+        day = minutes // MINUTES_PER_DAY
+        # 1970-01-01 was a Thursday; slot 0 is Monday
+        slot = (day + 3) % 7
+        if self.holidays.size:
+            position = np.searchsorted(self.holidays, day).clip(max=self.holidays.size - 1)
+            slot = np.where(self.holidays[position] == day, HOLIDAY_SLOT, slot)
+        month = np.asarray(timestamps).astype("datetime64[M]").astype(np.int64) % 12
+        offset = self.month_season[month] * SEASON_SIZE + slot * MINUTES_PER_DAY + minutes % MINUTES_PER_DAY
+        return np.take(self.table, offset)
+
+
+def builtin_plans() -> List[dict]:
+    """Plans available without configuration, from the current engine constants."""
+    return [
+        {
+            "name": "tou",
+            "default_rate": engine.OFF_PEAK_TARIFF,
+            "bands": [{"days": "weekday", "start": "10:00", "end": "22:00", "rate": engine.PEAK_TARIFF}],
+        },
+        {
+            "name": "blended",
+            "default_rate": (engine.PEAK_TARIFF * 0.6) + (engine.OFF_PEAK_TARIFF * 0.4),
+        },
+    ]
+
+
+class TariffCalendar:
+    """Named, compiled plans; replacing a plan swaps in a freshly compiled one."""
+
+    def __init__(self, specs=()):
+        self._lock = threading.Lock()
+        self._plans: Dict[str, TariffPlan] = {}
+        for spec in specs:
+            self.put(spec)
+
+    def put(self, spec: Mapping[str, Any]) -> TariffPlan:
+        plan = TariffPlan(spec)
+        with self._lock:
+            self._plans[plan.name] = plan
+        return plan
+
+    def get(self, name: str) -> Optional[TariffPlan]:
+        return self._plans.get(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._plans
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            return self._plans.pop(name, None) is not None
+
+    def specs(self) -> List[dict]:
+        with self._lock:
+            return [plan.spec for plan in self._plans.values()]
@@ -0,0 +1,210 @@
+"""Live grid telemetry held in fixed-size ring buffers.
+
+Every signal gets one SignalBuffer: preallocated timestamp and value arrays
+of `capacity` slots, overwritten oldest-first, so memory is fixed at start
+no matter how long the service runs or how fast readings arrive. The
+latest reading is one array read.
+
+Each buffer also keeps rolling aggregates over a few time windows (by
+default the last 1, 5 and 15 minutes). They are updated as readings arrive
+and expire: a running sum for the mean, plus monotonic deques of sequence
+numbers for min and max. Every reading is added and removed at most once
+per window, so ingest and lookup are amortized O(1). A window never reaches
+further back than the ring does. The running sums are recomputed once per
+`capacity` readings to stop floating-point drift.
+
+Readings must arrive in time order per signal. A reading older than the
+signal's latest one is rejected, not inserted. Windows only move forward,
+so aggregates are for the latest of the query times and reading
+timestamps seen so far. Timestamps are Unix seconds.
+"""
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class Signal(NamedTuple):
+    low: float
+    high: float
+    # Older readings are not used as live model inputs
+    max_age: float
+
+
+SIGNALS = {
+    "frequency_hz": Signal(40.0, 70.0, 60.0),
+    "voltage_pu": Signal(0.0, 2.0, 60.0),
+    "power_factor": Signal(0.0, 1.0, 300.0),
+    "carbon_intensity": Signal(0.0, 5.0, 3600.0),
+    "facility_load_kw": Signal(0.0, math.inf, 900.0),
+}
+
+DEFAULT_CAPACITY = 3600
+DEFAULT_WINDOWS = (60.0, 300.0, 900.0)
+# Readings stamped further ahead of the server clock than this are rejected
+MAX_CLOCK_SKEW = 30.0
+
+
+class _Window:
+    __slots__ = ("span", "start", "total", "mins", "maxs")
+
+    def __init__(self, span: float):
+        self.span = span
+        self.start = 0  # sequence number of the oldest reading inside the window
+        self.total = 0.0
+        self.mins: deque = deque()
+        self.maxs: deque = deque()
+
+
+class SignalBuffer:
+    """Ring buffer for one signal with incrementally maintained window aggregates."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, windows: Sequence[float] = DEFAULT_WINDOWS):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        # array('d') rather than ndarray: per-reading scalar access is several times faster
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.seq = 0  # readings ever appended; the next one goes to slot seq % capacity
+        self.windows = [_Window(float(span)) for span in windows]
+
+    def __len__(self) -> int:
+        return min(self.seq, self.capacity)
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        """(timestamp, value) of the newest reading, or None."""
+        if not self.seq:
+            return None
+        slot = (self.seq - 1) % self.capacity
+        return self.times[slot], self.values[slot]
+
+    def append(self, timestamp: float, value: float) -> bool:
+        """Add one reading; False (and no change) if it is older than the latest."""
+        cap = self.capacity
+        if self.seq and timestamp < self.times[(self.seq - 1) % cap]:
+            return False
+
+        evicted = self.seq - cap
+        for window in self.windows:
+            if evicted >= 0 and window.start <= evicted:
+                self._drop(window)
+
+        seq, slot = self.seq, self.seq % cap
+        self.times[slot] = timestamp
+        self.values[slot] = value
+        for window in self.windows:
+            window.total += value
+            while window.mins and self.values[window.mins[-1] % cap] >= value:
+                window.mins.pop()
+            window.mins.append(seq)
+            while window.maxs and self.values[window.maxs[-1] % cap] <= value:
+                window.maxs.pop()
+            window.maxs.append(seq)
+        self.seq += 1
+
+        if self.seq % cap == 0:
+            for window in self.windows:
+                window.total = float(np.frombuffer(self.values)[np.arange(window.start, self.seq) % cap].sum())
+        self.expire(timestamp)
+        return True
+
+    def _drop(self, window: _Window) -> None:
+        """Move the oldest reading out of `window`."""
+        cap = self.capacity
+        window.total -= self.values[window.start % cap]
+        if window.mins and window.mins[0] == window.start:
+            window.mins.popleft()
+        if window.maxs and window.maxs[0] == window.start:
+            window.maxs.popleft()
+        window.start += 1
+        if window.start == self.seq:
+            window.total = 0.0
+
+    def expire(self, now: float) -> None:
+        """Drop readings at or before `now - span` from every window."""
+        cap = self.capacity
+        for window in self.windows:
+            cutoff = now - window.span
+            while window.start < self.seq and self.times[window.start % cap] <= cutoff:
+                self._drop(window)
+
+    def aggregates(self, now: float) -> Dict[str, dict]:
+        """{span seconds: {count, mean, min, max}} for the windows ending at `now`."""
+        self.expire(now)
+        cap = self.capacity
+        out = {}
+        for window in self.windows:
+            count = self.seq - window.start
+            out[f"{window.span:g}"] = {
+                "count": count,
+                "mean": window.total / count if count else None,
+                "min": self.values[window.mins[0] % cap] if count else None,
+                "max": self.values[window.maxs[0] % cap] if count else None,
+            }
+        return out
+
+
+class TelemetryStore:
+    """One SignalBuffer per SIGNALS entry, safe to share between threads."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, windows: Sequence[float] = DEFAULT_WINDOWS):
+        self._lock = threading.Lock()
+        self.buffers = {name: SignalBuffer(capacity, windows) for name in SIGNALS}
+
+    def ingest(self, readings: Iterable[Tuple[str, float, float]], now: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """Store (signal, timestamp, value) readings.
+
+        Readings are applied in timestamp order, so a batch need not be
+        sorted. Returns {signal: {"accepted": n, <reject reason>: n, ...}}.
+        """
+        now = time.time() if now is None else now
+        outcome: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for name, timestamp, value in sorted(readings, key=lambda reading: reading[1]):
+                signal = SIGNALS.get(name)
+                if signal is None:
+                    reason = "unknown_signal"
+                elif not (math.isfinite(value) and signal.low <= value <= signal.high):
+                    reason = "out_of_range"
+                elif timestamp > now + MAX_CLOCK_SKEW:
+                    reason = "future"
+                elif not self.buffers[name].append(timestamp, value):
+                    reason = "out_of_order"
+                else:
+                    reason = "accepted"
+                counts = outcome.setdefault(name, {})
+                counts[reason] = counts.get(reason, 0) + 1
+        return outcome
+
+    def latest(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Newest value of every signal read within its max_age."""
+        now = time.time() if now is None else now
+        fresh = {}
+        with self._lock:
+            for name, buffer in self.buffers.items():
+                reading = buffer.latest()
+                if reading is not None and now - reading[0] <= SIGNALS[name].max_age:
+                    fresh[name] = reading[1]
+        return fresh
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, dict]:
+        """Latest reading, its age and the window aggregates for every signal."""
+        now = time.time() if now is None else now
+        out = {}
+        with self._lock:
+            for name, buffer in self.buffers.items():
+                reading = buffer.latest()
+                out[name] = {
+                    "value": reading[1] if reading else None,
+                    "timestamp": reading[0] if reading else None,
+                    "age_seconds": round(now - reading[0], 3) if reading else None,
+                    "live": reading is not None and now - reading[0] <= SIGNALS[name].max_age,
+                    "retained": len(buffer),
+                    "windows": buffer.aggregates(now),
+                }
+        return out
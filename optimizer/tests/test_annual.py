@@ -0,0 +1,77 @@
+"""/simulate/annual: hourly series, rollups and timestamp validation."""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import engine
+import main
+
+client = TestClient(main.app)
+
+TOTALS = ("projected_kwh", "cost_estimate", "carbon_footprint")
+
+
+def _hours(start: str, count: int) -> list:
+    stamps = np.datetime64(start, "h") + np.arange(count)
+    return [str(t.astype("datetime64[m]")) for t in stamps]
+
+
+def _annual(**body):
+    return client.post("/simulate/annual", json={"ac_setpoint": 24.0, "reduction_factor": 0.1, **body})
+
+
+@pytest.mark.parametrize("incentives", [False, True])
+def test_flat_day_sums_to_the_daily_snapshot(incentives):
+    result = _annual(timestamps=_hours("2025-03-03T00", 24), enable_incentives=incentives).json()
+    daily = engine.calculate(24.0, 0.1, incentives)
+    for name in TOTALS:
+        assert result["annual"][name] == pytest.approx(daily[name], abs=0.01)
+    assert result["annual"]["mean_comfort_index"] == daily["comfort_index"]
+    assert result["annual"]["hours"] == 24 and result["annual"]["period"] == "total"
+
+
+def test_monthly_and_tou_rollups_add_up_to_the_total():
+    # Late March into April with a varying schedule, priced on the tou plan
+    hours = _hours("2025-03-28T00", 24 * 7)
+    n = len(hours)
+    setpoints = (22.0 + 6.0 * np.sin(np.arange(n) / 5.0) ** 2).round(2).tolist()
+    result = _annual(timestamps=hours, ac_setpoint=setpoints, tariff_plan="tou").json()
+    monthly, annual, hourly = result["monthly"], result["annual"], result["hourly"]
+
+    assert [m["period"] for m in monthly] == ["2025-03", "2025-04"]
+    assert sum(m["hours"] for m in monthly) == annual["hours"] == n
+    for name in TOTALS:
+        assert sum(m[name] for m in monthly) == pytest.approx(annual[name], abs=0.02)
+    assert min(m["min_comfort_index"] for m in monthly) == annual["min_comfort_index"]
+
+    # Peak and off-peak hours partition the year's cost
+    rates = main.tariff_calendar.get("tou").rates(np.array(hours, dtype="datetime64[m]"))
+    peak = rates == engine.PEAK_TARIFF
+    assert peak.any() and (~peak).any()
+    costs = np.array(hourly["cost_estimate"])
+    assert costs[peak].sum() + costs[~peak].sum() == pytest.approx(annual["cost_estimate"], abs=0.01 * n)
+    kwh = np.array(hourly["projected_kwh"])
+    assert costs[peak].sum() / kwh[peak].sum() == pytest.approx(engine.PEAK_TARIFF, rel=1e-3)
+
+
+@pytest.mark.parametrize(
+    "timestamps",
+    [
+        ["2025-03-03T01:00", "2025-03-03T00:00"],
+        ["2025-03-03T00:00", "2025-03-03T00:00", "2025-03-03T01:00"],
+    ],
+    ids=["unsorted", "duplicate"],
+)
+def test_unordered_timestamps_are_rejected(timestamps):
+    response = _annual(timestamps=timestamps)
+    assert response.status_code == 422
+    assert "strictly increasing" in response.text
+
+
+def test_mismatched_and_malformed_inputs_are_rejected():
+    hours = _hours("2025-03-03T00", 24)
+    assert _annual(timestamps=hours, ac_setpoint=[24.0] * 23).status_code == 422
+    assert _annual(timestamps=hours, tariff_inr_per_kwh=[10.0] * 25).status_code == 422
+    assert _annual(timestamps=hours, grid={"frequency_hz": [50.0] * 3}).status_code == 422
+    assert _annual(timestamps=["2025-03-03T00:00+05:30"]).status_code == 422
+    assert _annual(timestamps=["not a time"]).status_code == 422
@@ -0,0 +1,50 @@
+"""Baselines from history files, including gaps and bad readings."""
+import numpy as np
+import pyarrow as pa
+import pytest
+
+import baselines
+
+
+def _write(path, timestamps, kwh, timestamp_type=pa.timestamp("s")):
+    schema = pa.schema([("timestamp", timestamp_type), ("kwh", pa.float64())])
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        writer.write_batch(pa.record_batch([pa.array(timestamps, timestamp_type), pa.array(kwh, pa.float64())], schema=schema))
+
+
+def _two_days():
+    # Monday 2025-03-03 and Tuesday, hourly, 1 kWh per hour
+    stamps = np.datetime64("2025-03-03T00:00", "s") + np.arange(48) * np.timedelta64(1, "h")
+    return stamps, np.ones(48)
+
+
+def test_complete_history(tmp_path):
+    path = tmp_path / "site.arrow"
+    baselines.write_history(str(path), *_two_days())
+    result = baselines.compute_baseline(str(path))
+    assert result["interval_minutes"] == 60
+    assert result["daily_kwh"] == {"days": 2, "mean": 24.0, "p10": 24.0, "p50": 24.0, "p90": 24.0}
+
+
+def test_null_timestamps_and_loads_are_dropped(tmp_path):
+    stamps, kwh = _two_days()
+    path = tmp_path / "site.arrow"
+    _write(path, [None, *stamps.tolist(), None], [5.0, *kwh.tolist(), None])
+    result = baselines.compute_baseline(str(path))
+    assert result["rows"] == 50
+    assert result["start"] == "2025-03-03T00:00"
+    assert result["daily_kwh"]["days"] == 2
+
+
+def test_unparseable_timestamps_raise_value_error(tmp_path):
+    path = tmp_path / "site.arrow"
+    _write(path, ["2025-03-03 00:00", "yesterday"], [1.0, 1.0], pa.string())
+    with pytest.raises(ValueError):
+        baselines.compute_baseline(str(path))
+
+
+def test_all_timestamps_null(tmp_path):
+    path = tmp_path / "site.arrow"
+    _write(path, [None, None, None], [1.0, 1.0, 1.0])
+    with pytest.raises(ValueError, match="at least two valid readings"):
+        baselines.compute_baseline(str(path))
@@ -0,0 +1,70 @@
+"""Result cache: LRU order, TTL expiry and invalidation on model changes."""
+import pytest
+from fastapi.testclient import TestClient
+
+import cache
+import engine
+import main
+from cache import ResultCache
+
+client = TestClient(main.app)
+
+
+def test_lru_evicts_least_recently_used():
+    lru = ResultCache(max_entries=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1  # "b" is now the oldest
+    lru.put("c", 3)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+    lru.put("a", 10)  # replacing refreshes too
+    lru.put("d", 4)
+    assert lru.get("c") is None and lru.get("a") == 10
+    assert lru.stats()["evictions"] == 2
+
+
+def test_zero_entries_disables_caching():
+    off = ResultCache(max_entries=0)
+    off.put("a", 1)
+    assert off.get("a") is None
+
+
+def test_ttl_expiry(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: clock[0])
+    ttl = ResultCache(ttl_seconds=5.0)
+    ttl.put("a", 1)
+    clock[0] = 104.9
+    assert ttl.get("a") == 1
+    clock[0] = 105.0
+    assert ttl.get("a") is None
+    assert ttl.stats()["expirations"] == 1
+
+
+def test_version_change_drops_every_entry():
+    version = [1]
+    versioned = ResultCache(version=lambda: version[0])
+    versioned.put("a", 1)
+    assert versioned.get("a") == 1
+    version[0] = 2
+    assert versioned.get("a") is None
+    assert versioned.stats()["invalidations"] == 1
+
+
+def test_calculate_follows_engine_constant_changes(monkeypatch):
+    body = {"ac_setpoint": 25.0, "reduction_factor": 0.2}
+    before = client.post("/calculate", json=body).json()
+    assert client.post("/calculate", json=body).json() == before
+    monkeypatch.setattr(engine, "BASE_LOAD_KWH", engine.BASE_LOAD_KWH * 2)
+    after = client.post("/calculate", json=body).json()
+    assert after == engine.calculate(25.0, 0.2)
+    assert after["projected_kwh"] == pytest.approx(before["projected_kwh"] * 2, abs=0.02)
+
+
+def test_request_defaults_read_the_current_constant(monkeypatch):
+    monkeypatch.setattr(engine, "BASE_LOAD_KWH", 2400.0)
+    hours = [f"2025-03-03T{h:02d}:00" for h in range(24)]
+    annual = client.post("/simulate/annual", json={"timestamps": hours, "ac_setpoint": 24.0, "reduction_factor": 0.1}).json()
+    assert annual["annual"]["projected_kwh"] == engine.calculate(24.0, 0.1)["projected_kwh"]
+    assert main.FacilitySpec(facility_id="x").base_load_kwh == 2400.0
@@ -0,0 +1,37 @@
+"""/calculate body parsing: same outcomes as FastAPI's own body handling."""
+import pytest
+from fastapi.testclient import TestClient
+
+import engine
+import main
+
+client = TestClient(main.app)
+
+BODY = b'{"ac_setpoint": 24, "reduction_factor": 0.1}'
+
+
+@pytest.mark.parametrize("content_type", [None, "application/json", "application/json; charset=utf-8", "application/vnd.api+json"])
+def test_json_content_types_are_parsed(content_type):
+    headers = {"content-type": content_type} if content_type else {}
+    response = client.post("/calculate", content=BODY, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == engine.calculate(24, 0.1)
+
+
+@pytest.mark.parametrize("content_type", ["text/plain", "application/x-www-form-urlencoded", "multipart/form-data"])
+def test_other_content_types_are_not_parsed_as_json(content_type):
+    response = client.post("/calculate", content=BODY, headers={"content-type": content_type})
+    assert response.status_code == 422
+    error, = response.json()["detail"]
+    assert error["type"] == "model_attributes_type"
+    assert error["loc"] == ["body"]
+    assert error["input"] == BODY.decode()
+
+
+def test_empty_and_malformed_bodies():
+    missing, = client.post("/calculate", content=b"", headers={"content-type": "text/plain"}).json()["detail"]
+    assert missing["type"] == "missing"
+    invalid, = client.post("/calculate", content=b"not json", headers={"content-type": "application/json"}).json()["detail"]
+    assert invalid["type"] == "json_invalid"
+    out_of_range, = client.post("/calculate", json={"ac_setpoint": 99, "reduction_factor": 0.1}).json()["detail"]
+    assert out_of_range["loc"] == ["body", "ac_setpoint"]
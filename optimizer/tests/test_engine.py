@@ -0,0 +1,72 @@
+"""calculate_batch() and the batch endpoints agree with the scalar calculate()."""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import columnar
+import engine
+import main
+
+client = TestClient(main.app)
+
+# Every kink of the model (22 C, 24 C, 15 % shedding, the comfort and cost floors) plus the range ends
+SETPOINTS = [16.0, 21.99, 22.0, 22.01, 23.5, 24.0, 24.01, 26.0, 29.7, 32.0]
+REDUCTIONS = [0.0, 0.1, 0.149, 0.15, 0.151, 0.3, 0.5, 0.99, 1.0]
+
+
+def _grid():
+    ac, red, inc = np.meshgrid(SETPOINTS, REDUCTIONS, [False, True], indexing="ij")
+    return ac.ravel(), red.ravel(), inc.ravel()
+
+
+def test_batch_rows_equal_scalar_results():
+    ac, red, inc = _grid()
+    rows = engine.to_rows(engine.calculate_batch(ac, red, inc))
+    for row, a, r, i in zip(rows, ac.tolist(), red.tolist(), inc.tolist()):
+        assert row == engine.calculate(a, r, i), (a, r, i)
+
+
+def test_scalar_inputs_broadcast():
+    columns = engine.calculate_batch(24.0, np.array([0.0, 0.2, 0.4]), True)
+    assert all(column.shape == (3,) for column in columns.values())
+    assert engine.to_rows(columns)[1] == engine.calculate(24.0, 0.2, True)
+
+
+def test_model_defaults_are_explicit_defaults():
+    ac, red, inc = _grid()
+    defaults = engine.calculate_batch(ac, red, inc)
+    explicit = engine.calculate_batch(
+        ac, red, inc,
+        base_load=engine.BASE_LOAD_KWH,
+        tariff=(engine.PEAK_TARIFF * 0.6) + (engine.OFF_PEAK_TARIFF * 0.4),
+        dr_rebate=engine.DR_REBATE_INR,
+        thermal_coeff=engine.THERMAL_COEFF,
+        carbon_intensity=engine.CARBON_INTENSITY,
+    )
+    for name, column in defaults.items():
+        np.testing.assert_array_equal(np.broadcast_to(column, ac.shape), np.broadcast_to(explicit[name], ac.shape))
+
+
+def test_batch_endpoint_keeps_order():
+    ac, red, inc = _grid()
+    scenarios = [{"ac_setpoint": a, "reduction_factor": r, "enable_incentives": i} for a, r, i in zip(ac.tolist(), red.tolist(), inc.tolist())]
+    response = client.post("/calculate/batch", json={"scenarios": scenarios[::-1]})
+    assert response.status_code == 200
+    expected = [engine.calculate(s["ac_setpoint"], s["reduction_factor"], s["enable_incentives"]) for s in scenarios[::-1]]
+    assert response.json()["results"] == expected
+
+
+def test_columnar_endpoint_is_unrounded_batch():
+    ac, red, inc = _grid()
+    body = np.concatenate([ac, red, inc.astype(np.float64)]).astype("<f8").tobytes()
+    response = client.post("/calculate/batch/columnar", content=body, headers={"content-type": columnar.RAW_F64})
+    assert response.status_code == 200
+    got = np.frombuffer(response.content, dtype="<f8").reshape(len(columnar.OUTPUT_COLUMNS), ac.size)
+    columns = engine.calculate_batch(ac, red, inc)
+    for name, values in zip(columnar.OUTPUT_COLUMNS, got):
+        np.testing.assert_array_equal(values, np.broadcast_to(columns[name], ac.shape))
+
+
+@pytest.mark.parametrize("scenarios", [[], [{"ac_setpoint": 15.9, "reduction_factor": 0.1}], [{"ac_setpoint": 24, "reduction_factor": 1.01}]])
+def test_batch_endpoint_rejects_bad_input(scenarios):
+    assert client.post("/calculate/batch", json={"scenarios": scenarios}).status_code == 422
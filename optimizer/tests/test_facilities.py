@@ -0,0 +1,64 @@
+"""Facility registry and portfolio runs priced through the tariff calendar."""
+import pytest
+from fastapi.testclient import TestClient
+
+import engine
+import main
+import tariffs
+
+client = TestClient(main.app)
+
+BLENDED = (engine.PEAK_TARIFF * 0.6) + (engine.OFF_PEAK_TARIFF * 0.4)
+
+
+@pytest.fixture
+def sites():
+    specs = [
+        {"facility_id": "tf-blended", "tariff_plan": "blended"},
+        {"facility_id": "tf-tou", "tariff_plan": "tou"},
+    ]
+    assert client.put("/facilities", json={"facilities": specs}).status_code == 200
+    yield [spec["facility_id"] for spec in specs]
+    for spec in specs:
+        client.delete(f"/facilities/{spec['facility_id']}")
+
+
+def _portfolio(ids, **extra):
+    return client.post("/portfolio/calculate", json={"ac_setpoint": 24, "reduction_factor": 0.1, "facility_ids": ids, **extra})
+
+
+def test_unknown_plan_is_rejected():
+    response = client.put("/facilities", json={"facilities": [{"facility_id": "tf-x", "tariff_plan": "peak"}]})
+    assert response.status_code == 422
+    assert client.get("/facilities/tf-x").status_code == 404
+
+
+def test_mean_rate_weights_the_calendar():
+    plans = {spec["name"]: tariffs.TariffPlan(spec) for spec in tariffs.builtin_plans()}
+    assert plans["blended"].mean_rate == pytest.approx(BLENDED)
+    peak_share = 5 / 7 * 12 / 24
+    assert plans["tou"].mean_rate == pytest.approx(engine.PEAK_TARIFF * peak_share + engine.OFF_PEAK_TARIFF * (1 - peak_share))
+
+
+def test_portfolio_prices_sites_by_calendar_plan(sites):
+    blended, tou = _portfolio(sites).json()["results"]
+    assert {k: blended[k] for k in engine.calculate(24, 0.1)} == engine.calculate(24, 0.1)
+    plan = main.tariff_calendar.get("tou")
+    expected = engine.calculate_batch(24.0, 0.1, tariff=plan.mean_rate)["cost_estimate"]
+    assert tou["cost_estimate"] == round(float(expected), 2)
+
+    # Wednesday noon is peak, Sunday noon off-peak
+    peak = _portfolio(sites, at="2025-03-05T12:00").json()["results"][1]["cost_estimate"]
+    off_peak = _portfolio(sites, at="2025-03-09T12:00").json()["results"][1]["cost_estimate"]
+    assert peak == round(float(engine.calculate_batch(24.0, 0.1, tariff=engine.PEAK_TARIFF)["cost_estimate"]), 2)
+    assert off_peak == round(float(engine.calculate_batch(24.0, 0.1, tariff=engine.OFF_PEAK_TARIFF)["cost_estimate"]), 2)
+    assert _portfolio(sites, at="2025-03-05T12:00+05:30").status_code == 422
+
+
+def test_deleted_plan_is_reported(sites):
+    client.put("/tariffs", json={"name": "tf-flat", "default_rate": 5.0})
+    client.put("/facilities", json={"facilities": [{"facility_id": sites[0], "tariff_plan": "tf-flat"}]})
+    client.delete("/tariffs/tf-flat")
+    response = _portfolio(sites)
+    assert response.status_code == 404
+    assert "tf-flat" in response.text
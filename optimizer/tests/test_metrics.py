@@ -0,0 +1,29 @@
+"""Route labels on the request metrics."""
+from fastapi.testclient import TestClient
+
+import main
+import metrics
+
+client = TestClient(main.app)
+
+
+def _series(route: str) -> list:
+    return [line for line in metrics.REGISTRY.render().splitlines() if f'route="{route}"' in line]
+
+
+def test_parameterized_routes_are_labelled_by_template():
+    assert client.get("/tariffs/tou").status_code == 200
+    assert client.post("/tariffs/tou/rates", json={"timestamps": ["2025-03-03T12:00"]}).status_code == 200
+    assert client.get("/facilities/no-such-site").status_code == 404
+
+    assert any('route="/tariffs/{name}",method="GET",status="200"' in line for line in _series("/tariffs/{name}"))
+    assert any('method="POST",status="200"' in line for line in _series("/tariffs/{name}/rates"))
+    assert any('status="404"' in line for line in _series("/facilities/{facility_id}"))
+
+
+def test_static_and_unknown_paths():
+    client.get("/health")
+    client.get("/no/such/path")
+    assert any('route="/health",method="GET",status="200"' in line for line in _series("/health"))
+    assert any('status="404"' in line for line in _series("other"))
+    assert not _series("/no/such/path")
@@ -0,0 +1,28 @@
+"""Day-ahead schedule: feasibility and the flat reference it is compared to."""
+import numpy as np
+import pytest
+
+import engine
+import schedule
+
+TOU = [engine.OFF_PEAK_TARIFF] * 10 + [engine.PEAK_TARIFF] * 12 + [engine.OFF_PEAK_TARIFF] * 2
+
+
+def test_reduction_grid_hits_comfort_threshold_exactly():
+    assert 0.15 in schedule.REDUCTION_GRID.tolist()
+
+
+@pytest.mark.parametrize("min_comfort", [0.6, 0.8, 0.95, 1.0])
+def test_plan_meets_budget_and_never_loses_to_flat(min_comfort):
+    plan = schedule.optimize_schedule(TOU, min_comfort)
+    assert plan["comfort_index"].mean() >= min_comfort - 1e-9
+    assert plan["cost_estimate"].sum() <= schedule.flat_schedule_cost(TOU, min_comfort) + 1e-6
+
+
+def test_flat_reference_at_full_comfort_uses_the_threshold_action():
+    # At min_comfort=1.0 no shifting is possible, so the plan is the flat reference
+    flat = schedule.flat_schedule_cost(TOU, 1.0)
+    assert flat == pytest.approx(schedule.optimize_schedule(TOU, 1.0)["cost_estimate"].sum())
+    expected = engine.calculate_batch(24.0, 0.15, base_load=engine.BASE_LOAD_KWH / 24, tariff=np.array(TOU),
+                                      dr_rebate=engine.DR_REBATE_INR / 24)["cost_estimate"].sum()
+    assert flat == pytest.approx(expected)
@@ -0,0 +1,90 @@
+"""Analytic Jacobian and Monte Carlo runs under policy rules."""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import rules
+import sensitivity
+import uncertainty
+
+POLICY = [
+    {"name": "shed-floor", "priority": 1, "when": [], "then": [{"target": "reduction_factor", "op": "at_least", "value": 0.3}]},
+    {
+        "name": "underfrequency",
+        "priority": 2,
+        "when": [{"field": "frequency_hz", "op": "lt", "value": 49.8}],
+        "then": [
+            {"target": "ac_setpoint", "op": "scale", "value": 1.1},
+            {"target": "cost_estimate", "op": "at_most", "value": 30000.0},
+        ],
+    },
+]
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    n = 200
+    return {
+        "ac_setpoint": rng.uniform(18.0, 30.0, n),
+        "reduction_factor": rng.uniform(0.0, 0.6, n),
+        "enable_incentives": rng.random(n) < 0.5,
+        "base_load": rng.uniform(800.0, 1500.0, n),
+    }, {"frequency_hz": np.where(rng.random(n) < 0.5, 49.5, 50.0)}
+
+
+def test_partials_match_finite_differences_through_rules(points):
+    arrays, signals = points
+    policy = rules.RulePipeline(POLICY)
+    out = sensitivity.jacobian_batch(
+        arrays["ac_setpoint"], arrays["reduction_factor"], arrays["enable_incentives"],
+        policy=policy, signals=signals, base_load=arrays["base_load"],
+    )
+    values, hits = rules.evaluate(policy, arrays, signals)
+    assert out["rule_hits"] == hits
+    for name, column in values.items():
+        np.testing.assert_allclose(out["values"][name], column)
+
+    h = 1e-6
+    for wrt in sensitivity.INPUTS:
+        stepped, _ = rules.evaluate(policy, {**arrays, wrt: arrays[wrt] + h}, signals)
+        for name, column in values.items():
+            np.testing.assert_allclose(out["partials"][name][wrt], (stepped[name] - column) / h, rtol=1e-3, atol=1e-3)
+
+
+def test_bound_that_binds_zeroes_the_derivative():
+    policy = rules.RulePipeline(POLICY[:1])
+    out = sensitivity.jacobian_batch([24.0, 24.0, 24.0], [0.1, 0.3, 0.5], policy=policy)
+    d_red = out["partials"]["projected_kwh"]["reduction_factor"]
+    assert d_red[0] == 0.0 and d_red[2] != 0.0
+    # Exactly on the bound: increasing the input leaves it, decreasing does not
+    assert d_red[1] != 0.0 and out["kinks"]["reduction_factor"][1]
+
+
+def test_monte_carlo_applies_rules():
+    inputs = {"ac_setpoint": {"dist": "normal", "mean": 24.0, "std": 2.0}, "reduction_factor": 0.0}
+    plain = uncertainty.monte_carlo(inputs, 5000, 7)
+    floored = uncertainty.monte_carlo(inputs, 5000, 7, policy=rules.RulePipeline(POLICY[:1]))
+    shed = uncertainty.monte_carlo({**inputs, "reduction_factor": 0.3}, 5000, 7)
+    assert plain["rule_hits"] == {}
+    assert floored.pop("rule_hits") == {"shed-floor": 5000}
+    shed.pop("rule_hits")
+    assert floored == shed
+
+
+def test_endpoint_uses_grid_and_live_telemetry():
+    client = TestClient(main.app)
+    readings = [{"signal": "facility_load_kw", "value": 40.0}, {"signal": "carbon_intensity", "value": 0.5}]
+    assert client.post("/telemetry", json={"readings": readings}).json()["accepted"] == 2
+    points = [
+        {"ac_setpoint": 22.0, "reduction_factor": 0.1, "live": True},
+        {"ac_setpoint": 22.0, "reduction_factor": 0.1, "grid": {"frequency_hz": 49.5}},
+    ]
+    results = client.post("/calculate/jacobian", json={"points": points}).json()["results"]
+    for point, result in zip(points, results):
+        expected = client.post("/calculate", json=point).json()
+        assert {name: result[name] for name in expected} == expected
+    live = sensitivity.jacobian_batch([22.0], [0.1], base_load=[960.0], carbon_intensity=[0.5])
+    assert results[0]["partials"]["carbon_footprint"]["ac_setpoint"] == pytest.approx(live["partials"]["carbon_footprint"]["ac_setpoint"][0])
+    assert results[0]["projected_kwh"] != results[1]["projected_kwh"]
@@ -0,0 +1,55 @@
+"""Cold-start budget for the optimizer worker.
+
+Each test starts a fresh interpreter, so nothing is already imported or
+warm. Raise STARTUP_BUDGET_SECONDS on slow CI machines rather than
+deleting the check.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+OPTIMIZER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Interpreter start -> imports -> app definition -> warmup -> ready
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.5"))
+
+# Only loaded by the requests that need them
+LAZY_MODULES = ("pyarrow", "multiprocessing.shared_memory", "concurrent.futures.process", "numpy.random", "pandas")
+
+COLD_START = """
+import asyncio, json, sys
+import main, startup
+asyncio.run(main.app.router.startup())
+lazy = [name for name in {lazy!r} if name in sys.modules]
+# Not stdout: the log listener thread writes there concurrently
+with open(sys.argv[1], "w") as out:
+    json.dump({{"profile": startup.PROFILE.as_dict(), "loaded_lazy": lazy}}, out)
+"""
+
+
+def _cold_start() -> tuple:
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, "startup.json")
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", COLD_START.format(lazy=LAZY_MODULES), report_path],
+            cwd=OPTIMIZER_DIR, capture_output=True, check=True, timeout=60,
+        )
+        wall = time.perf_counter() - started
+        with open(report_path) as f:
+            return wall, json.load(f)
+
+
+def test_cold_start_within_budget():
+    wall, report = _cold_start()
+    assert report["profile"]["ready"]
+    assert set(report["profile"]["phases_seconds"]) == {"imports", "app", "server", "warmup"}
+    assert wall < STARTUP_BUDGET_SECONDS, f"cold start took {wall:.2f}s (budget {STARTUP_BUDGET_SECONDS}s): {report['profile']}"
+
+
+def test_heavy_optional_modules_stay_lazy():
+    _, report = _cold_start()
+    assert report["loaded_lazy"] == []
@@ -0,0 +1,79 @@
+"""NDJSON streaming: one output row per input line, errors in-band."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import engine
+import main
+
+client = TestClient(main.app)
+
+
+def _stream(body: bytes) -> list:
+    response = client.post("/calculate/stream", content=body, headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_rows_match_calculate_and_keep_order():
+    scenarios = [{"id": i, "ac_setpoint": 20 + i, "reduction_factor": i / 10} for i in range(5)]
+    rows = _stream("".join(json.dumps(s) + "\n" for s in scenarios).encode())
+    assert [row["line"] for row in rows] == [1, 2, 3, 4, 5]
+    for row, scenario in zip(rows, scenarios):
+        assert row.pop("id") == scenario["id"]
+        row.pop("line")
+        assert row == engine.calculate(scenario["ac_setpoint"], scenario["reduction_factor"])
+
+
+def test_invalid_lines_get_error_rows():
+    rows = _stream(b'{"ac_setpoint": 24, "reduction_factor": 0.1}\nnot json\n\n{"ac_setpoint": 99, "reduction_factor": 0}\n[1]')
+    assert [row["line"] for row in rows] == [1, 2, 4, 5]
+    assert "projected_kwh" in rows[0]
+    assert rows[1]["error"].startswith("Invalid JSON")
+    assert "ac_setpoint" in rows[2]["error"]
+    assert rows[3]["error"] == "Expected a JSON object"
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_oversized_lines_get_error_rows(trailing_newline):
+    huge = json.dumps({"ac_setpoint": 24, "reduction_factor": 0.1, "pad": "x" * (main.STREAM_MAX_LINE_BYTES + 10)})
+    ok = json.dumps({"ac_setpoint": 24, "reduction_factor": 0.1})
+    body = "\n".join([ok, huge, ok, huge]) + ("\n" if trailing_newline else "")
+    rows = _stream(body.encode())
+    assert [row["line"] for row in rows] == [1, 2, 3, 4]
+    assert "projected_kwh" in rows[0] and "projected_kwh" in rows[2]
+    assert rows[1]["error"] == rows[3]["error"] == f"Line exceeds {main.STREAM_MAX_LINE_BYTES} bytes"
+
+
+def test_oversized_line_across_chunks():
+    ok = json.dumps({"ac_setpoint": 24, "reduction_factor": 0.1}).encode()
+    chunks = [ok + b"\n" + b"{" + b" " * 40_000, b" " * 40_000, b" " * 40_000 + b"}\n" + ok + b"\n"]
+    response = client.post("/calculate/stream", content=iter(chunks), headers={"content-type": "application/x-ndjson"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["line"] for row in rows] == [1, 2, 3]
+    assert "error" in rows[1] and "projected_kwh" in rows[2]
+
+
+def test_empty_body_and_crlf_lines():
+    assert _stream(b"") == []
+    assert _stream(b"\n\r\n  \n") == []
+    rows = _stream(b'{"ac_setpoint": 24, "reduction_factor": 0.1}\r\n{"ac_setpoint": 25, "reduction_factor": 0.2}\r\n')
+    assert [row["line"] for row in rows] == [1, 2]
+    assert all("projected_kwh" in row for row in rows)
+
+
+def test_rows_span_several_batches(monkeypatch):
+    monkeypatch.setattr(main, "STREAM_BATCH_SIZE", 3)
+    scenarios = [{"ac_setpoint": 16 + i % 17, "reduction_factor": (i % 10) / 10} for i in range(10)]
+    rows = _stream("".join(json.dumps(s) + "\n" for s in scenarios).encode())
+    assert [row["line"] for row in rows] == list(range(1, 11))
+    for row, scenario in zip(rows, scenarios):
+        assert {k: row[k] for k in engine.RESPONSE_PRECISION} == engine.calculate(scenario["ac_setpoint"], scenario["reduction_factor"])
+
+
+def test_non_utf8_line_gets_error_row():
+    rows = _stream(b'{"ac_setpoint": 25, "reduction_factor": 0.1}\n\x80\xff\n{"ac_setpoint": 24, "reduction_factor": 0.2}\n')
+    assert [row["line"] for row in rows] == [1, 2, 3]
+    assert "projected_kwh" in rows[0] and "projected_kwh" in rows[2]
+    assert rows[1]["error"] == "Invalid JSON: line is not UTF-8"
@@ -0,0 +1,47 @@
+"""Parameter sweep: grid construction and request validation."""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def _sweep(ac: dict, reduction: dict):
+    return client.post("/sweep", json={"ac_setpoint": ac, "reduction_factor": reduction})
+
+
+def test_grid_includes_stop_despite_float_division():
+    rng = main.SweepRange(start=0.0, stop=0.3, step=0.1)
+    assert rng.size() == 4
+    assert rng.values().tolist()[-1] == 0.3
+
+
+def test_single_point_and_step_larger_than_span():
+    response = _sweep({"start": 24, "stop": 24, "step": 1}, {"start": 0.1, "stop": 0.2, "step": 5})
+    assert response.status_code == 200
+    assert response.json()["grid_size"] == 1
+
+
+@pytest.mark.parametrize("step", [1e-320, 5e-324, 1e-9])
+def test_tiny_step_is_rejected_not_overflowed(step):
+    response = _sweep({"start": 16, "stop": 32, "step": step}, {"start": 0, "stop": 0, "step": 1})
+    assert response.status_code == 422
+    assert "step is too small" in response.text
+
+
+@pytest.mark.parametrize("step", [0, -0.5])
+def test_non_positive_step_is_rejected(step):
+    assert _sweep({"start": 16, "stop": 32, "step": step}, {"start": 0, "stop": 0, "step": 1}).status_code == 422
+
+
+def test_reversed_or_out_of_model_range_is_rejected():
+    assert _sweep({"start": 30, "stop": 20, "step": 1}, {"start": 0, "stop": 0, "step": 1}).status_code == 422
+    assert _sweep({"start": 16, "stop": 32, "step": 1}, {"start": 0, "stop": 1.5, "step": 0.1}).status_code == 422
+
+
+def test_grid_over_point_limit_is_rejected():
+    per_axis = int(main.MAX_SWEEP_POINTS ** 0.5) + 1
+    response = _sweep({"start": 16, "stop": 32, "step": 16 / per_axis}, {"start": 0, "stop": 1, "step": 1 / per_axis})
+    assert response.status_code == 422
+    assert "exceeds" in response.text
@@ -0,0 +1,90 @@
+"""Telemetry ring buffers and their rolling window aggregates."""
+import math
+
+import numpy as np
+import pytest
+
+import telemetry
+
+
+def _window(buffer, span, now):
+    return buffer.aggregates(now)[f"{span:g}"]
+
+
+def test_ring_wraps_past_capacity():
+    buffer = telemetry.SignalBuffer(capacity=4, windows=(1000.0,))
+    for t in range(10):
+        assert buffer.append(float(t), float(t * 10))
+    assert len(buffer) == 4
+    assert buffer.latest() == (9.0, 90.0)
+    # The window cannot reach further back than the ring
+    assert _window(buffer, 1000.0, 9.0) == {"count": 4, "mean": 75.0, "min": 60.0, "max": 90.0}
+
+
+def test_window_edge_is_exclusive():
+    buffer = telemetry.SignalBuffer(windows=(60.0,))
+    buffer.append(100.0, 1.0)
+    buffer.append(130.0, 3.0)
+    assert _window(buffer, 60.0, 159.0)["count"] == 2
+    # A reading exactly span seconds old has expired
+    assert _window(buffer, 60.0, 160.0) == {"count": 1, "mean": 3.0, "min": 3.0, "max": 3.0}
+    assert _window(buffer, 60.0, 190.0) == {"count": 0, "mean": None, "min": None, "max": None}
+
+
+def test_min_max_after_extremes_expire():
+    buffer = telemetry.SignalBuffer(windows=(10.0,))
+    for t, value in enumerate([5.0, 100.0, -50.0, 7.0, 6.0, 8.0]):
+        buffer.append(float(t), value)
+    assert _window(buffer, 10.0, 5.0)["max"] == 100.0
+    assert _window(buffer, 10.0, 5.0)["min"] == -50.0
+    # At t=11.5 readings from t <= 1.5 are gone: 100 has expired, -50 has not
+    window = _window(buffer, 10.0, 11.5)
+    assert (window["min"], window["max"]) == (-50.0, 8.0)
+    window = _window(buffer, 10.0, 12.5)
+    assert (window["min"], window["max"]) == (6.0, 8.0)
+
+
+def test_running_sum_does_not_drift():
+    rng = np.random.default_rng(3)
+    capacity, span = 500, 200.0
+    buffer = telemetry.SignalBuffer(capacity=capacity, windows=(span,))
+    times = np.cumsum(rng.uniform(0.1, 1.0, 20_000))
+    values = rng.normal(0.0, 1e6, times.size) + 1e-3 * rng.random(times.size)
+    for t, v in zip(times.tolist(), values.tolist()):
+        buffer.append(t, v)
+    now = float(times[-1])
+    live = values[max(0, times.size - capacity):]
+    live = live[times[max(0, times.size - capacity):] > now - span]
+    window = _window(buffer, span, now)
+    assert window["count"] == live.size
+    assert window["mean"] == pytest.approx(np.sum(live) / live.size, rel=1e-9, abs=1e-6)
+    assert (window["min"], window["max"]) == (live.min(), live.max())
+
+
+def test_store_counts_rejected_readings():
+    store = telemetry.TelemetryStore(capacity=8)
+    now = 1_000_000.0
+    outcome = store.ingest(
+        [
+            ("frequency_hz", now - 5, 50.0),
+            ("frequency_hz", now - 1, 49.9),
+            ("voltage_pu", now + telemetry.MAX_CLOCK_SKEW + 1, 1.0),
+            ("power_factor", now, 1.5),
+            ("power_factor", now, math.nan),
+            ("humidity", now, 0.4),
+        ],
+        now=now,
+    )
+    assert outcome == {
+        "frequency_hz": {"accepted": 2},
+        "voltage_pu": {"future": 1},
+        "power_factor": {"out_of_range": 2},
+        "humidity": {"unknown_signal": 1},
+    }
+    # Older than the latest stored reading: rejected and nothing changes
+    assert store.ingest([("frequency_hz", now - 3, 48.0)], now=now) == {"frequency_hz": {"out_of_order": 1}}
+    assert store.latest(now=now) == {"frequency_hz": 49.9}
+    # Past max_age the value is kept but no longer live
+    stale = now + telemetry.SIGNALS["frequency_hz"].max_age + 1
+    assert store.latest(now=stale) == {}
+    assert store.summary(now=stale)["frequency_hz"]["live"] is False
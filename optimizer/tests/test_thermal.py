@@ -0,0 +1,111 @@
+"""RC thermal network: exact discretization, thermostat control and the route."""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import engine
+import main
+import thermal
+
+client = TestClient(main.app)
+
+
+def _zone(name, capacitance=100.0, ua=5.0, capacity=200.0, gain=20.0):
+    return {"name": name, "capacitance_kwh_per_c": capacitance, "ua_outdoor_kw_per_c": ua,
+            "cooling_capacity_kw": capacity, "internal_gain_kw": gain}
+
+
+def _expm(m: np.ndarray) -> np.ndarray:
+    """Scaling and squaring with a Taylor series; independent of thermal's eigendecomposition."""
+    squarings = max(0, int(np.ceil(np.log2(max(np.abs(m).sum(axis=1).max(), 1e-12)))) + 4)
+    scaled = m / 2.0 ** squarings
+    result, term = np.eye(len(m)), np.eye(len(m))
+    for k in range(1, 20):
+        term = term @ scaled / k
+        result = result + term
+    for _ in range(squarings):
+        result = result @ result
+    return result
+
+
+@pytest.mark.parametrize("ua", [5.0, 0.0])
+def test_single_zone_matches_closed_form(ua):
+    c, dt = 100.0, 0.25
+    d = thermal.Building({"name": "one", "zones": [_zone("z", capacitance=c, ua=ua)]}).discretize(dt)
+    if ua:
+        decay = np.exp(-ua / c * dt)
+        assert d.ad[0, 0] == pytest.approx(decay)
+        assert d.b_out[0] == pytest.approx(1.0 - decay)
+        assert d.bq[0, 0] == pytest.approx((1.0 - decay) / ua)
+    else:
+        # No path outdoors: the zone integrates heat
+        assert d.ad[0, 0] == pytest.approx(1.0)
+        assert d.b_out[0] == pytest.approx(0.0)
+        assert d.bq[0, 0] == pytest.approx(dt / c)
+
+
+def test_multi_zone_matches_matrix_exponential():
+    spec = {
+        "name": "three",
+        "zones": [_zone("a", 80.0, 4.0), _zone("b", 150.0, 0.0), _zone("c", 40.0, 9.0)],
+        "links": [{"zones": ["a", "b"], "ua_kw_per_c": 12.0}, {"zones": ["b", "c"], "ua_kw_per_c": 3.0}],
+    }
+    building = thermal.Building(spec)
+    capacitance = np.array([80.0, 150.0, 40.0])
+    conductance = np.diag([4.0 + 12.0, 12.0 + 3.0, 9.0 + 3.0])
+    conductance[0, 1] = conductance[1, 0] = -12.0
+    conductance[1, 2] = conductance[2, 1] = -3.0
+    a = -conductance / capacitance[:, None]
+    dt = 0.5
+    # Augmented exponential: its top-right block is the integral of expm(A t) over the step
+    augmented = np.zeros((6, 6))
+    augmented[:3, :3] = a * dt
+    augmented[:3, 3:] = np.eye(3) * dt
+    full = _expm(augmented)
+    ad, integral = full[:3, :3], full[:3, 3:]
+    d = building.discretize(dt)
+    np.testing.assert_allclose(d.ad, ad, atol=1e-12)
+    np.testing.assert_allclose(d.bq, integral / capacitance[None, :], atol=1e-12)
+    np.testing.assert_allclose(d.b_out, d.bq @ np.array([4.0, 0.0, 9.0]), atol=1e-12)
+    assert building.discretize(dt) is d
+
+
+def test_tracks_setpoint_with_enough_capacity():
+    building = thermal.Building({"name": "one", "zones": [_zone("z", capacity=1000.0)]})
+    temps, cooling = building.run(np.full(16, 35.0), 24.0)
+    np.testing.assert_allclose(temps, 24.0, atol=1e-9)
+    # Steady state: cooling removes envelope heat plus internal gains
+    np.testing.assert_allclose(cooling, 5.0 * (35.0 - 24.0) + 20.0, rtol=1e-9)
+
+
+def test_shedding_clips_cooling_to_capacity():
+    building = thermal.Building({"name": "one", "zones": [_zone("z", capacity=80.0)]})
+    temps, cooling = building.run(np.full(32, 35.0), 24.0, reduction_factor=0.5)
+    assert cooling.max() <= 40.0 + 1e-9
+    np.testing.assert_allclose(cooling, 40.0)
+    assert (np.diff(temps[:, 0]) > 0).all()
+    # No cooling below the setpoint
+    _, idle = building.run(np.full(4, 10.0), 24.0, initial_c=18.0)
+    assert (idle == 0.0).all()
+
+
+def test_route_prices_steps_with_tariff_plan():
+    spec = {"name": "tt-hq", "cop": 3.0, "other_load_kw": 100.0, "zones": [_zone("z1"), _zone("z2", 60.0, 3.0)],
+            "links": [{"zones": ["z1", "z2"], "ua_kw_per_c": 8.0}]}
+    assert client.put("/buildings", json=spec).status_code == 200
+    try:
+        # Wednesday 09:00-11:00: four off-peak steps, then four peak steps
+        body = {"outdoor_temp_c": [34.0] * 8, "ac_setpoint": 24.0, "include_series": True}
+        planned = client.post("/buildings/tt-hq/simulate", json={**body, "tariff_plan": "tou", "start": "2025-03-05T09:00"}).json()
+        rates = [engine.OFF_PEAK_TARIFF] * 4 + [engine.PEAK_TARIFF] * 4
+        explicit = client.post("/buildings/tt-hq/simulate", json={**body, "tariff_inr_per_kwh": rates}).json()
+        assert planned == explicit
+        series = planned["series"]
+        for kwh, cost, rate in zip(series["projected_kwh"], series["cost_estimate"], rates):
+            # Both series are rounded to 2 dp, and the rate amplifies the kWh rounding
+            assert cost == pytest.approx(kwh * rate, abs=0.005 * rate + 0.005)
+        assert planned["cost_estimate"] == pytest.approx(sum(series["cost_estimate"]), abs=0.05)
+        assert client.post("/buildings/tt-hq/simulate", json={**body, "tariff_plan": "tou"}).status_code == 422
+        assert client.post("/buildings/tt-hq/simulate", json={**body, "tariff_plan": "nope", "start": "2025-03-05T09:00"}).status_code == 404
+    finally:
+        client.delete("/buildings/tt-hq")
@@ -0,0 +1,45 @@
+"""Monte Carlo bands are reproducible for a seed, however sampling is chunked."""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import uncertainty
+
+client = TestClient(main.app)
+
+BODY = {
+    "ac_setpoint": {"dist": "normal", "mean": 24.0, "std": 1.5},
+    "reduction_factor": {"dist": "uniform", "low": 0.0, "high": 0.4},
+    "base_load_kwh": {"dist": "triangular", "low": 900.0, "mode": 1200.0, "high": 1500.0},
+    "carbon_intensity": 0.7,
+    "samples": 20_000,
+    "seed": 1234,
+}
+
+
+def _run(monkeypatch, chunk, offload_min_rows):
+    monkeypatch.setattr(uncertainty, "SAMPLE_CHUNK", chunk)
+    monkeypatch.setattr(main, "OFFLOAD_MIN_ROWS", offload_min_rows)
+    response = client.post("/simulate/uncertainty", json=BODY)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_seed_gives_same_bands_for_any_chunking(monkeypatch):
+    reference = _run(monkeypatch, uncertainty.SAMPLE_CHUNK, 10**9)
+    assert reference["seed"] == 1234
+    for chunk in (1_000, 7_777, BODY["samples"]):
+        assert _run(monkeypatch, chunk, 10**9) == reference
+
+
+def test_pool_and_inline_runs_agree(monkeypatch):
+    inline = _run(monkeypatch, 4_096, 10**9)
+    pooled = _run(monkeypatch, 4_096, 1)
+    assert pooled == inline
+
+
+def test_different_seeds_differ():
+    first = client.post("/simulate/uncertainty", json=BODY).json()
+    other = client.post("/simulate/uncertainty", json={**BODY, "seed": 4321}).json()
+    assert first["projected_kwh"] != other["projected_kwh"]
+    assert client.post("/simulate/uncertainty", json={k: v for k, v in BODY.items() if k != "seed"}).json()["seed"] >= 0
@@ -0,0 +1,250 @@
+"""Multi-zone RC thermal network, stepped through time.
+
+The snapshot model maps a setpoint straight to energy with
+tanh(delta_t * THERMAL_COEFF). That cannot represent thermal mass,
+pre-cooling, or heat moving between zones. Here a building is a resistor-
+capacitor network instead:
+
+    {
+        "name": "hq",
+        "cop": 3.2,
+        "other_load_kw": 400.0,
+        "zones": [
+            {"name": "floor-1", "capacitance_kwh_per_c": 120.0, "ua_outdoor_kw_per_c": 6.0,
+             "cooling_capacity_kw": 350.0, "internal_gain_kw": 60.0},
+            {"name": "floor-2", ...}
+        ],
+        "links": [{"zones": ["floor-1", "floor-2"], "ua_kw_per_c": 15.0}]
+    }
+
+Zone temperatures T (C) follow C dT/dt = -K T + ua_out * T_out + gains - cooling.
+Here C is the diagonal capacitance matrix (kWh/C) and K is the conductance
+matrix (kW/C): the inter-zone links as a graph Laplacian, plus the outdoor
+conductances on the diagonal. Cooling is held constant over each step
+(zero-order hold), so the exact discrete-time update is
+
+    T[k+1] = Ad T[k] + b_out T_out[k] + Bq (gains - cooling[k])
+
+with Ad = expm(A dt) and Bq = A^-1 (Ad - I) C^-1, where A = -C^-1 K.
+C^-1/2 K C^-1/2 is symmetric, so one eigendecomposition gives the matrix
+exponential and its integral exactly, without SciPy. Each building caches
+the matrices per step length, so the simulation loop is only
+matrix-vector products.
+
+Each zone's thermostat is cooling-only. Every step it applies the
+constant cooling that would bring the zone to its setpoint by the end of
+the step, treating the zone on its own (the diagonal of Bq). That cooling
+is capped at the zone's capacity times (1 - reduction_factor), so shedding
+lets zones drift warm, and a lower setpoint ahead of a shed pre-cools the
+building's thermal mass.
+"""
+import threading
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+import engine
+
+
+class Discretization(NamedTuple):
+    step_hours: float
+    ad: np.ndarray      # (zones, zones) state transition
+    b_out: np.ndarray   # (zones,) response to outdoor temperature
+    bq: np.ndarray      # (zones, zones) response to zone heat input in kW
+    inv_self: np.ndarray  # 1 / diag(bq): kW that moves a zone by 1 C over one step
+
+
+class Building:
+    """A compiled RC network; discretizations are cached per step length."""
+
+    def __init__(self, spec: Mapping[str, Any]):
+        name = spec.get("name")
+        if not name:
+            raise ValueError("Every building needs a name")
+        self.name = str(name)
+        self.spec = dict(spec)
+
+        zones = spec.get("zones") or []
+        if not zones:
+            raise ValueError(f"Building {self.name!r} has no zones")
+        self.zones = [str(zone["name"]) for zone in zones]
+        if len(set(self.zones)) != len(self.zones):
+            raise ValueError(f"Building {self.name!r}: zone names must be unique")
+        index = {zone: i for i, zone in enumerate(self.zones)}
+
+        def column(key: str, default: Optional[float] = None) -> np.ndarray:
+            return np.array([float(zone.get(key, default)) for zone in zones])
+
+        self.capacitance = column("capacitance_kwh_per_c")
+        self.ua_outdoor = column("ua_outdoor_kw_per_c")
+        self.cooling_capacity = column("cooling_capacity_kw")
+        self.internal_gain = column("internal_gain_kw", 0.0)
+        if (self.capacitance <= 0).any():
+            raise ValueError(f"Building {self.name!r}: capacitance_kwh_per_c must be > 0")
+        if (self.ua_outdoor < 0).any() or (self.cooling_capacity < 0).any() or (self.internal_gain < 0).any():
+            raise ValueError(f"Building {self.name!r}: conductances, capacities and gains must be >= 0")
+        self.cop = float(spec.get("cop", 3.0))
+        self.other_load_kw = float(spec.get("other_load_kw", 0.0))
+        if self.cop <= 0 or self.other_load_kw < 0:
+            raise ValueError(f"Building {self.name!r}: cop must be > 0 and other_load_kw >= 0")
+
+        conductance = np.diag(self.ua_outdoor)
+        for link in spec.get("links", ()):
+            a, b = link["zones"]
+            if a not in index or b not in index or a == b:
+                raise ValueError(f"Building {self.name!r}: link {a!r}-{b!r} must join two different known zones")
+            ua = float(link["ua_kw_per_c"])
+            if ua <= 0:
+                raise ValueError(f"Building {self.name!r}: link ua_kw_per_c must be > 0")
+            i, j = index[a], index[b]
+            conductance[i, i] += ua
+            conductance[j, j] += ua
+            conductance[i, j] -= ua
+            conductance[j, i] -= ua
+
+        # Symmetric similarity transform of A = -C^-1 K: K' = C^-1/2 K C^-1/2 = V diag(lam) V^T
+        scale = 1.0 / np.sqrt(self.capacitance)
+        self._eigenvalues, self._eigenvectors = np.linalg.eigh(conductance * np.outer(scale, scale))
+        self._eigenvalues = np.maximum(self._eigenvalues, 0.0)
+        self._lock = threading.Lock()
+        self._discretizations: Dict[float, Discretization] = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def discretize(self, step_hours: float) -> Discretization:
+        """Exact zero-order-hold matrices for `step_hours`, computed once per length."""
+        cached = self._discretizations.get(step_hours)
+        if cached is not None:
+            return cached
+        lam, vectors = self._eigenvalues, self._eigenvectors
+        decay = np.exp(-lam * step_hours)
+        # Integral of exp(-lam t) over the step; a zone group with no path outdoors has lam = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            integral = np.where(lam > 1e-12, (1.0 - decay) / lam, step_hours)
+        sqrt_c = np.sqrt(self.capacitance)
+        # expm(A dt) = C^-1/2 V diag(decay) V^T C^1/2, and likewise for its integral
+        ad = (vectors * decay) @ vectors.T / sqrt_c[:, None] * sqrt_c[None, :]
+        phi = (vectors * integral) @ vectors.T / sqrt_c[:, None] * sqrt_c[None, :]
+        bq = phi / self.capacitance[None, :]
+        discretization = Discretization(step_hours, ad, bq @ self.ua_outdoor, bq, 1.0 / np.diag(bq))
+        with self._lock:
+            self._discretizations[step_hours] = discretization
+        return discretization
+
+    def run(self, outdoor_c, setpoint_c, reduction_factor=0.0, step_hours: float = 0.25, initial_c=None):
+        """Step the network through len(outdoor_c) steps.
+
+        `setpoint_c` and `reduction_factor` are scalars or per-step arrays
+        (setpoints may also be (steps, zones)). Returns end-of-step zone
+        temperatures and mean cooling per step in kW, both (steps, zones).
+        """
+        outdoor_c = np.asarray(outdoor_c, dtype=np.float64)
+        steps, zones = outdoor_c.size, len(self.zones)
+        d = self.discretize(step_hours)
+        setpoint = np.broadcast_to(
+            np.asarray(setpoint_c, dtype=np.float64).reshape(-1, 1) if np.ndim(setpoint_c) == 1 else setpoint_c,
+            (steps, zones),
+        )
+        capacity = np.outer(1.0 - np.broadcast_to(np.asarray(reduction_factor, dtype=np.float64), (steps,)), self.cooling_capacity)
+        # Everything that does not depend on the controller, for every step at once
+        exogenous = np.outer(outdoor_c, d.b_out) + d.bq @ self.internal_gain
+
+        temps = np.empty((steps, zones))
+        cooling = np.empty((steps, zones))
+        state = np.broadcast_to(np.asarray(setpoint[0] if initial_c is None else initial_c, dtype=np.float64), (zones,)).copy()
+        ad, bq, inv_self = d.ad, d.bq, d.inv_self
+        for k in range(steps):
+            free = ad @ state + exogenous[k]
+            q = np.clip((free - setpoint[k]) * inv_self, 0.0, capacity[k])
+            state = free - bq @ q
+            temps[k] = state
+            cooling[k] = q
+        return temps, cooling
+
+
+def simulate(
+    building: Building,
+    outdoor_c,
+    setpoint_c,
+    reduction_factor=0.0,
+    step_hours: float = 0.25,
+    initial_c=None,
+    tariff=None,
+    enable_incentives: bool = False,
+    carbon_intensity=None,
+) -> dict:
+    """Run the building and score it like calculate_batch().
+
+    Electricity per step is cooling / cop plus the non-HVAC load, which is
+    shed by reduction_factor like the cooling capacity. Comfort applies the
+    snapshot model's penalties to each zone's actual temperature, averaged
+    over zones and steps. The DR rebate is daily, as in /simulate/annual,
+    so each step earns its share. Returns unrounded totals (the
+    SimulationResponse fields), per-step kWh and cost, and per-zone arrays;
+    module-level so the compute pool can run it in a child process.
+    """
+    temps, cooling = building.run(outdoor_c, setpoint_c, reduction_factor, step_hours, initial_c)
+    steps = temps.shape[0]
+    reduction = np.broadcast_to(np.asarray(reduction_factor, dtype=np.float64), (steps,))
+    if tariff is None:
+        tariff = (engine.PEAK_TARIFF * 0.6) + (engine.OFF_PEAK_TARIFF * 0.4)
+    if carbon_intensity is None:
+        carbon_intensity = engine.CARBON_INTENSITY
+
+    hvac_kwh = cooling * (step_hours / building.cop)
+    step_kwh = hvac_kwh.sum(axis=1) + building.other_load_kw * (1.0 - reduction) * step_hours
+    rebate = engine.DR_REBATE_INR * step_hours / 24.0 if enable_incentives else 0.0
+    step_cost = np.maximum(0.0, step_kwh * tariff - rebate)
+
+    heat_excess = np.maximum(0.0, temps - 24.0)
+    shed_penalty = np.maximum(0.0, reduction - 0.15) * 2.5
+    comfort = np.maximum(0.1, 1.0 - (heat_excess ** 1.5) * 0.08 - shed_penalty[:, None])
+
+    return {
+        "totals": {
+            "projected_kwh": float(step_kwh.sum()),
+            "cost_estimate": float(step_cost.sum()),
+            "carbon_footprint": float((step_kwh * carbon_intensity).sum()),
+            "comfort_index": float(comfort.mean()),
+            "grid_stability_score": float((0.85 + reduction * 0.15).mean()),
+        },
+        "step_kwh": step_kwh,
+        "step_cost": step_cost,
+        "temperatures": temps,
+        "zone_hvac_kwh": hvac_kwh.sum(axis=0),
+        "zone_comfort": comfort.mean(axis=0),
+    }
+
+
+class BuildingRegistry:
+    """Named, compiled buildings; replacing one drops its cached discretizations."""
+
+    def __init__(self, specs=()):
+        self._lock = threading.Lock()
+        self._buildings: Dict[str, Building] = {}
+        for spec in specs:
+            self.put(spec)
+
+    def put(self, spec: Mapping[str, Any]) -> Building:
+        building = Building(spec)
+        with self._lock:
+            self._buildings[building.name] = building
+        return building
+
+    def get(self, name: str) -> Optional[Building]:
+        return self._buildings.get(name)
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            return self._buildings.pop(name, None) is not None
+
+    def specs(self) -> List[dict]:
+        with self._lock:
+            return [building.spec for building in self._buildings.values()]
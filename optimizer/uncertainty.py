@@ -0,0 +1,119 @@
+"""Monte Carlo uncertainty bands for the facility model.
+
+Each uncertain input is given either as a fixed number or as a distribution
+spec, e.g. {"dist": "normal", "mean": 0.82, "std": 0.05}. Occupancy shows up
+as base_load, weather as thermal_coeff, and grid mix as carbon_intensity.
+
+Samples are drawn and evaluated in chunks of SAMPLE_CHUNK rows, so the
+temporaries inside engine.calculate_batch stay a few MB no matter how many
+samples are requested. Only the four output columns (8 bytes per sample
+each) are kept for the percentiles.
+
+Every uncertain input gets its own child stream from SeedSequence(seed).
+Generator draws concatenate exactly across calls, so a given seed yields the
+same samples, and the same bands, whatever the chunk size.
+
+A rule pipeline, if given, is applied to every draw as rules.evaluate()
+does, under one set of grid signals for the whole run.
+"""
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+import engine
+import rules
+
+SAMPLE_CHUNK = 65_536
+MAX_SAMPLES = 2_000_000
+
+PERCENTILES = (5.0, 50.0, 95.0)
+BAND_COLUMNS = ("projected_kwh", "cost_estimate", "carbon_footprint", "comfort_index")
+
+# Sampled values are clipped into the range the model is defined on
+INPUT_BOUNDS = {
+    "ac_setpoint": (16.0, 32.0),
+    "reduction_factor": (0.0, 1.0),
+    "base_load": (0.0, np.inf),
+    "tariff": (0.0, np.inf),
+    "thermal_coeff": (0.0, np.inf),
+    "carbon_intensity": (0.0, np.inf),
+}
+
+InputSpec = Union[float, Dict[str, float]]
+
+
+def draw(spec: Dict[str, float], rng: "np.random.Generator", size: int) -> np.ndarray:
+    """`size` samples from a {"dist": ..., params} spec."""
+    kind = spec["dist"]
+    if kind == "normal":
+        return rng.normal(spec["mean"], spec["std"], size)
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], size)
+    if kind == "triangular":
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    raise ValueError(f"Unknown distribution: {kind!r}")
+
+
+def monte_carlo(
+    inputs: Dict[str, InputSpec],
+    samples: int,
+    seed: int,
+    enable_incentives: bool = False,
+    chunk_size: int = SAMPLE_CHUNK,
+    policy: Optional[rules.RulePipeline] = None,
+    signals: Optional[Dict[str, float]] = None,
+) -> Dict[str, dict]:
+    """P5/P50/P95 and mean of the BAND_COLUMNS over `samples` model runs.
+
+    `inputs` maps calculate_batch keyword names (see INPUT_BOUNDS) to a
+    fixed value or a distribution spec; inputs left out use the model
+    defaults. The result also holds "rule_hits", the draws each `policy`
+    rule fired on. Module-level and plain-data in/out so the compute pool
+    can run it in a child process.
+    """
+    policy = policy or rules.RulePipeline()
+    hits: Dict[str, int] = {}
+    uncertain = sorted(name for name, spec in inputs.items() if isinstance(spec, dict))
+    fixed = {name: spec for name, spec in inputs.items() if not isinstance(spec, dict)}
+    streams = dict(zip(uncertain, (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(uncertain)))))
+
+    outputs = {name: np.empty(samples) for name in BAND_COLUMNS}
+    for start in range(0, samples, chunk_size):
+        size = min(chunk_size, samples - start)
+        drawn = {
+            name: np.clip(draw(inputs[name], streams[name], size), *INPUT_BOUNDS[name])
+            for name in uncertain
+        }
+        arrays = {
+            name: drawn.pop(name) if name in drawn else np.full(size, fixed.get(name, default))
+            for name, default in (("ac_setpoint", None), ("reduction_factor", 0.0))
+        }
+        arrays["enable_incentives"] = np.full(size, enable_incentives)
+        arrays.update(drawn)
+        columns, chunk_hits = rules.evaluate(
+            policy,
+            arrays,
+            signals,
+            **{name: value for name, value in fixed.items() if name not in ("ac_setpoint", "reduction_factor")},
+        )
+        for name, rows in chunk_hits.items():
+            hits[name] = hits.get(name, 0) + rows
+        for name in BAND_COLUMNS:
+            outputs[name][start:start + size] = columns[name]
+
+    bands: Dict[str, dict] = {"rule_hits": hits}
+    for name, values in outputs.items():
+        p5, p50, p95 = np.percentile(values, PERCENTILES)
+        digits = engine.RESPONSE_PRECISION[name]
+        bands[name] = {
+            "p5": round(float(p5), digits),
+            "p50": round(float(p50), digits),
+            "p95": round(float(p95), digits),
+            "mean": round(float(values.mean()), digits),
+        }
+    return bands
+
+
+def new_seed() -> int:
+    """Fresh 63-bit seed for requests that do not pin one (echoed back so runs can be replayed)."""
+    return int(np.random.SeedSequence().generate_state(1, np.uint64)[0] >> np.uint64(1))
@@ -1,9 +1,13 @@
+import http from 'http';
 import express from 'express';
 import cors from 'cors';
 import helmet from 'helmet';
 import morgan from 'morgan';
 import dotenv from 'dotenv';
 import simulationRoutes from './routes/simulation.routes';
+import { attachLiveSimulation, liveStats } from './routes/simulation.live';
+import { optimizerService } from './services/optimizer.service';
+import { simulationLogBuffer } from './services/simulationLog.service';
 
 dotenv.config();
 
@@ -18,12 +22,32 @@ app.use(morgan('tiny'));
 
 // Health Check
 app.get('/health', (req, res) => {
-  res.json({ status: 'online', service: 'gridops-api', version: '1.0.0' });
+  res.json({
+    status: 'online',
+    service: 'gridops-api',
+    version: '1.0.0',
+    live: liveStats,
+    optimizer: optimizerService.health(),
+    logs: simulationLogBuffer.health()
+  });
 });
 
 // Routes
 app.use('/api/v1/simulation', simulationRoutes);
 
-app.listen(PORT, () => {
+// WebSocket live-simulation channel shares the HTTP server
+const server = http.createServer(app);
+attachLiveSimulation(server);
+
+server.listen(PORT, () => {
   console.log(`🚀 GridOps API running on port ${PORT}`);
-});
\ No newline at end of file
+});
+
+// Flush buffered simulation logs before exiting
+const shutdown = (signal: string) => {
+  console.log(`${signal} received, flushing simulation logs`);
+  server.close();
+  simulationLogBuffer.close().finally(() => process.exit(0));
+};
+process.once('SIGTERM', () => shutdown('SIGTERM'));
+process.once('SIGINT', () => shutdown('SIGINT'));
@@ -0,0 +1,152 @@
+import { Server } from 'http';
+import WebSocket, { WebSocketServer } from 'ws';
+import { z } from 'zod';
+import { SimulationSchema } from './simulation.routes';
+
+// Same parameters as POST /run, plus a client sequence number echoed in replies
+const LiveUpdateSchema = SimulationSchema.extend({
+  seq: z.number().int().optional()
+});
+
+type LiveUpdate = z.infer<typeof LiveUpdateSchema>;
+
+const LIVE_PATH = '/api/v1/simulation/live';
+const HEARTBEAT_MS = 30000;
+
+const optimizerSocketUrl = () =>
+  (process.env.OPTIMIZER_URL || 'http://optimizer:8000').replace(/^http/, 'ws') + '/ws/simulate';
+
+export const liveStats = { sessions: 0, forwarded: 0, superseded: 0 };
+
+/**
+ * One browser session proxied to one optimizer socket.
+ *
+ * At most one update is in flight upstream. Updates that arrive meanwhile
+ * replace each other in `pending`, and when the in-flight reply comes back
+ * it is dropped if a newer update is already waiting. The browser only ever
+ * receives the result for the latest parameters it sent.
+ */
+class LiveSession {
+  private upstream: WebSocket | null = null;
+  private inFlight: LiveUpdate | null = null;
+  private pending: LiveUpdate | null = null;
+
+  constructor(private readonly client: WebSocket) {
+    client.on('message', (data) => this.onClientMessage(data.toString()));
+    client.on('close', () => this.close());
+    client.on('error', () => this.close());
+  }
+
+  private onClientMessage(raw: string) {
+    let update: LiveUpdate;
+    try {
+      update = LiveUpdateSchema.parse(JSON.parse(raw));
+    } catch (error) {
+      const details = error instanceof z.ZodError ? error.errors : 'Invalid JSON';
+      this.reply({ error: 'Invalid parameters', details });
+      return;
+    }
+
+    if (this.inFlight) {
+      if (this.pending) liveStats.superseded++;
+      this.pending = update;
+      return;
+    }
+    this.forward(update);
+  }
+
+  private forward(update: LiveUpdate) {
+    const upstream = this.connectUpstream();
+    const message = JSON.stringify({
+      seq: update.seq,
+      ac_setpoint: update.acTemp,
+      reduction_factor: update.reductionPercent / 100,
+      enable_incentives: update.incentives || false
+    });
+    this.inFlight = update;
+    liveStats.forwarded++;
+    if (upstream.readyState === WebSocket.OPEN) {
+      upstream.send(message);
+    } else {
+      upstream.once('open', () => upstream.send(message));
+    }
+  }
+
+  private connectUpstream(): WebSocket {
+    if (this.upstream && this.upstream.readyState <= WebSocket.OPEN) return this.upstream;
+
+    const upstream = new WebSocket(optimizerSocketUrl());
+    upstream.on('message', (data) => this.onUpstreamMessage(data.toString()));
+    upstream.on('error', (err) => console.error(`Optimizer live channel error: ${err.message}`));
+    upstream.on('close', () => {
+      if (this.upstream !== upstream) return;
+      this.upstream = null;
+      const lost = this.inFlight;
+      this.inFlight = null;
+      if (this.pending) {
+        // The lost update is already stale; send the newest one on a fresh connection
+        if (lost) liveStats.superseded++;
+        const next = this.pending;
+        this.pending = null;
+        this.forward(next);
+      } else if (lost) {
+        this.reply({ seq: lost.seq, error: 'Simulation service currently unavailable' });
+      }
+    });
+    this.upstream = upstream;
+    return upstream;
+  }
+
+  private onUpstreamMessage(raw: string) {
+    this.inFlight = null;
+    if (this.pending) {
+      // A newer update is waiting, so this result is already stale
+      liveStats.superseded++;
+      const next = this.pending;
+      this.pending = null;
+      this.forward(next);
+      return;
+    }
+    if (this.client.readyState === WebSocket.OPEN) this.client.send(raw);
+  }
+
+  private reply(body: object) {
+    if (this.client.readyState === WebSocket.OPEN) this.client.send(JSON.stringify(body));
+  }
+
+  close() {
+    this.pending = null;
+    this.inFlight = null;
+    const upstream = this.upstream;
+    this.upstream = null;
+    upstream?.close();
+  }
+}
+
+export function attachLiveSimulation(server: Server) {
+  const wss = new WebSocketServer({ server, path: LIVE_PATH });
+  const alive = new WeakSet<WebSocket>();
+
+  wss.on('connection', (socket) => {
+    liveStats.sessions++;
+    alive.add(socket);
+    socket.on('pong', () => alive.add(socket));
+    socket.on('close', () => liveStats.sessions--);
+    new LiveSession(socket);
+  });
+
+  // Drop browsers that vanished without closing (sleeping laptops, dead proxies)
+  const heartbeat = setInterval(() => {
+    for (const socket of wss.clients) {
+      if (!alive.has(socket)) {
+        socket.terminate();
+        continue;
+      }
+      alive.delete(socket);
+      socket.ping();
+    }
+  }, HEARTBEAT_MS);
+  wss.on('close', () => clearInterval(heartbeat));
+
+  return wss;
+}
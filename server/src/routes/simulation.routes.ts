@@ -1,13 +1,12 @@
 import { Router, Request, Response } from 'express';
-import { optimizerService } from '../services/optimizer.service';
-import { db } from '../db'; // We will create this next
-import { simulationLogs } from '../db/schema';
+import { optimizerService, OptimizerUnavailableError } from '../services/optimizer.service';
+import { simulationLogBuffer } from '../services/simulationLog.service';
 import { z } from 'zod';
 
 const router = Router();
 
 // Validation schema
-const SimulationSchema = z.object({
+export const SimulationSchema = z.object({
   acTemp: z.number().min(16).max(32),
   reductionPercent: z.number().min(0).max(100),
   incentives: z.boolean().optional()
@@ -23,21 +22,24 @@ router.post('/run', async (req: Request, res: Response) => {
       enable_incentives: payload.incentives || false
     });
 
-    // Async logging (fire and forget)
-    db.insert(simulationLogs).values({
+    // Buffered logging: written in batches off the request path
+    simulationLogBuffer.enqueue({
       user_id: 'demo-user',
       ac_setpoint: payload.acTemp,
       reduction_factor: payload.reductionPercent / 100,
       projected_savings_inr: result.cost_estimate,
       carbon_reduction_kg: result.carbon_footprint,
       comfort_score: result.comfort_index
-    }).then(() => console.log('Simulation logged to DB')).catch(err => console.error('DB Log failed', err));
+    });
 
     res.json(result);
 
   } catch (error) {
     if (error instanceof z.ZodError) {
       res.status(400).json({ error: 'Invalid parameters', details: error.errors });
+    } else if (error instanceof OptimizerUnavailableError) {
+      // Failing fast; tell clients when the circuit will let a probe through
+      res.set('Retry-After', String(error.retryAfterSeconds)).status(503).json({ error: 'Simulation service currently unavailable' });
     } else {
       console.error(error);
       res.status(503).json({ error: 'Simulation service currently unavailable' });
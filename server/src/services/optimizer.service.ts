@@ -1,4 +1,6 @@
-import axios from 'axios';
+import http from 'http';
+import https from 'https';
+import axios, { AxiosInstance } from 'axios';
 
 // Interface matching the Python Pydantic model
 interface SimulationParams {
@@ -15,30 +17,152 @@ interface SimulationResult {
   grid_stability_score: number;
 }
 
+type BreakerState = 'closed' | 'open' | 'half-open';
+
+const envInt = (name: string, fallback: number) => {
+  const value = Number.parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+};
+
+// Sockets kept open to the optimizer, and requests allowed in flight before failing fast
+const MAX_SOCKETS = envInt('OPTIMIZER_MAX_SOCKETS', 64);
+const MAX_IN_FLIGHT = envInt('OPTIMIZER_MAX_IN_FLIGHT', 256);
+const TIMEOUT_MS = envInt('OPTIMIZER_TIMEOUT_MS', 5000);
+// Consecutive failures that open the circuit, and how long it stays open
+const FAILURE_THRESHOLD = envInt('OPTIMIZER_FAILURE_THRESHOLD', 5);
+const OPEN_MS = envInt('OPTIMIZER_CIRCUIT_OPEN_MS', 10000);
+
+/** Raised without touching the network when the optimizer is known to be down or saturated. */
+export class OptimizerUnavailableError extends Error {
+  readonly retryAfterSeconds = Math.ceil(OPEN_MS / 1000);
+
+  constructor(reason: string) {
+    super(`Calculation engine unavailable: ${reason}`);
+    this.name = 'OptimizerUnavailableError';
+  }
+}
+
+/** The optimizer answered with a 4xx: the request was refused, but the service is up. */
+export class OptimizerRequestError extends Error {
+  constructor(readonly status: number) {
+    super(`Calculation engine rejected the request: ${status}`);
+    this.name = 'OptimizerRequestError';
+  }
+}
+
 export class OptimizerService {
   private readonly baseUrl: string;
+  private readonly client: AxiosInstance;
+
+  // Single-flight: identical concurrent requests share one upstream call
+  private readonly inFlight = new Map<string, Promise<SimulationResult>>();
+  private active = 0;
+
+  private state: BreakerState = 'closed';
+  private failures = 0;
+  private openedAt = 0;
+  private probing = false;
+
+  readonly stats = { requests: 0, coalesced: 0, rejected: 0, failures: 0 };
 
   constructor() {
     // Docker networking: 'optimizer' is the service name in docker-compose
     this.baseUrl = process.env.OPTIMIZER_URL || 'http://optimizer:8000';
+    const agentOptions = { keepAlive: true, maxSockets: MAX_SOCKETS, maxFreeSockets: MAX_SOCKETS };
+    this.client = axios.create({
+      baseURL: this.baseUrl,
+      timeout: TIMEOUT_MS,
+      httpAgent: new http.Agent(agentOptions),
+      httpsAgent: new https.Agent(agentOptions)
+    });
   }
 
   async runSimulation(params: SimulationParams): Promise<SimulationResult> {
+    this.stats.requests++;
+    const key = `${params.ac_setpoint}|${params.reduction_factor}|${params.enable_incentives}`;
+    const pending = this.inFlight.get(key);
+    if (pending) {
+      this.stats.coalesced++;
+      return pending;
+    }
+
+    const call = this.guarded(() => this.post(params)).finally(() => this.inFlight.delete(key));
+    this.inFlight.set(key, call);
+    return call;
+  }
+
+  private async post(params: SimulationParams): Promise<SimulationResult> {
     try {
-      const response = await axios.post<SimulationResult>(
-        `${this.baseUrl}/calculate`, 
-        params,
-        { timeout: 5000 }
-      );
+      const response = await this.client.post<SimulationResult>('/calculate', params);
       return response.data;
     } catch (error) {
       if (axios.isAxiosError(error)) {
         console.error(`Optimizer Service Error: ${error.message}`);
-        throw new Error(`Calculation engine unavailable: ${error.code}`);
+        const status = error.response?.status;
+        if (status !== undefined && status < 500) throw new OptimizerRequestError(status);
+        throw new Error(`Calculation engine unavailable: ${error.code || error.response?.status}`);
+      }
+      throw error;
+    }
+  }
+
+  /**
+   * Circuit breaker around an upstream call.
+   *
+   * After FAILURE_THRESHOLD consecutive failures the circuit opens and calls
+   * fail immediately for OPEN_MS. Only outages count as failures: network
+   * errors, timeouts and 5xx replies. A 4xx (OptimizerRequestError) shows
+   * the optimizer is answering, so it counts as a success for the breaker. Then a single probe is let through; its
+   * outcome closes the circuit or re-opens it. Calls beyond MAX_IN_FLIGHT
+   * also fail fast instead of queueing behind a saturated optimizer.
+   */
+  private async guarded<T>(call: () => Promise<T>): Promise<T> {
+    if (this.state === 'open') {
+      if (Date.now() - this.openedAt < OPEN_MS) return this.reject('circuit open');
+      this.state = 'half-open';
+    }
+    if (this.state === 'half-open') {
+      if (this.probing) return this.reject('circuit open');
+      this.probing = true;
+    } else if (this.active >= MAX_IN_FLIGHT) {
+      return this.reject('too many requests in flight');
+    }
+
+    const probe = this.state === 'half-open';
+    this.active++;
+    try {
+      const result = await call();
+      this.failures = 0;
+      if (probe) this.state = 'closed';
+      return result;
+    } catch (error) {
+      if (error instanceof OptimizerRequestError) {
+        this.failures = 0;
+        if (probe) this.state = 'closed';
+        throw error;
+      }
+      this.stats.failures++;
+      this.failures++;
+      if (probe || this.failures >= FAILURE_THRESHOLD) {
+        if (this.state !== 'open') console.error(`Optimizer circuit opened after ${this.failures} failures`);
+        this.state = 'open';
+        this.openedAt = Date.now();
       }
       throw error;
+    } finally {
+      this.active--;
+      if (probe) this.probing = false;
     }
   }
+
+  private reject(reason: string): never {
+    this.stats.rejected++;
+    throw new OptimizerUnavailableError(reason);
+  }
+
+  health() {
+    return { circuit: this.state, active: this.active, ...this.stats };
+  }
 }
 
 export const optimizerService = new OptimizerService();
@@ -0,0 +1,89 @@
+import { db } from '../db';
+import { simulationLogs } from '../db/schema';
+
+type SimulationLogRow = typeof simulationLogs.$inferInsert;
+
+const envInt = (name: string, fallback: number) => {
+  const value = Number.parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+};
+
+// Rows held in memory at most; beyond this new rows are dropped and counted
+const MAX_BUFFERED_ROWS = envInt('LOG_BUFFER_MAX_ROWS', 10000);
+// Rows per multi-row INSERT (8 columns each, well under Postgres' 65535 bind parameters)
+const FLUSH_ROWS = Math.min(envInt('LOG_FLUSH_ROWS', 500), 5000);
+const FLUSH_INTERVAL_MS = envInt('LOG_FLUSH_INTERVAL_MS', 1000);
+
+/**
+ * Bounded write buffer for simulation_logs.
+ *
+ * Rows are flushed as one multi-row INSERT when FLUSH_ROWS are waiting or
+ * every FLUSH_INTERVAL_MS, whichever comes first, with at most one INSERT
+ * in flight. If Postgres falls behind the buffer fills up to
+ * MAX_BUFFERED_ROWS; past that new rows are dropped (and counted) rather
+ * than holding request memory hostage to the database. A failed INSERT puts
+ * its rows back at the front of the buffer as far as capacity allows.
+ */
+export class SimulationLogBuffer {
+  private rows: SimulationLogRow[] = [];
+  private flushing: Promise<void> | null = null;
+  private readonly timer: NodeJS.Timeout;
+  private closed = false;
+
+  readonly stats = { queued: 0, flushed: 0, dropped: 0, failedFlushes: 0 };
+
+  constructor() {
+    this.timer = setInterval(() => void this.flush(), FLUSH_INTERVAL_MS);
+    this.timer.unref();
+  }
+
+  enqueue(row: SimulationLogRow) {
+    if (this.closed || this.rows.length >= MAX_BUFFERED_ROWS) {
+      this.stats.dropped++;
+      return;
+    }
+    // Stamp now: the row may reach the database a little later
+    this.rows.push({ created_at: new Date(), ...row });
+    this.stats.queued++;
+    if (this.rows.length >= FLUSH_ROWS) void this.flush();
+  }
+
+  /** Write everything buffered so far; resolves once the buffer has been drained or an INSERT fails. */
+  async flush(): Promise<void> {
+    if (this.flushing) return this.flushing;
+    this.flushing = this.drain().finally(() => {
+      this.flushing = null;
+    });
+    return this.flushing;
+  }
+
+  private async drain() {
+    while (this.rows.length) {
+      const batch = this.rows.splice(0, FLUSH_ROWS);
+      try {
+        await db.insert(simulationLogs).values(batch);
+        this.stats.flushed += batch.length;
+      } catch (err) {
+        this.stats.failedFlushes++;
+        const keep = Math.max(0, Math.min(batch.length, MAX_BUFFERED_ROWS - this.rows.length));
+        this.rows.unshift(...batch.slice(0, keep));
+        this.stats.dropped += batch.length - keep;
+        console.error(`Simulation log flush failed (${batch.length} rows)`, err);
+        return;
+      }
+    }
+  }
+
+  /** Stop accepting rows and flush what is left (called on shutdown). */
+  async close() {
+    this.closed = true;
+    clearInterval(this.timer);
+    await this.flush();
+  }
+
+  health() {
+    return { buffered: this.rows.length, ...this.stats };
+  }
+}
+
+export const simulationLogBuffer = new SimulationLogBuffer();